@@ -1,69 +1,566 @@
-import pyttsx3
-import speech_recognition as sr
-import pyaudio
 import wave
 import threading
 import queue
 import time
 import os
-from openai import OpenAI
-import anthropic
-import pygame
-import tempfile
 import json
-from datetime import datetime
-import tkinter as tk
-from tkinter import scrolledtext, ttk
+import argparse
 import asyncio
+from datetime import datetime
 
-# Optional TTS import for character voice
-try:
-    from TTS.api import TTS
-    import torch
-    import librosa
-    import soundfile as sf
-    CHARACTER_VOICE_AVAILABLE = True
-    print("SUCCESS: Character voice cloning available")
-except ImportError:
-    CHARACTER_VOICE_AVAILABLE = False
+from utils.lazy_import import lazy_import, module_available, print_startup_profile
+
+# Heavy backends are imported on first use, so each mode only pays for what it needs
+pyttsx3 = lazy_import("pyttsx3")
+sr = lazy_import("speech_recognition")
+pygame = lazy_import("pygame")
+anthropic = lazy_import("anthropic")
+openai = lazy_import("openai")
+tk = lazy_import("tkinter")
+ttk = lazy_import("tkinter.ttk")
+scrolledtext = lazy_import("tkinter.scrolledtext")
+librosa = lazy_import("librosa")
+conversation_engine = lazy_import("utils.conversation_engine")  # Only the voice conversation loop needs asyncio
+
+from utils.sentence_stream import chunk_text_stream, split_sentences
+from utils.speech_pipeline import SpeechPipeline
+from utils.speech_worker import SpeechWorker
+from utils.barge_in import BargeInMonitor
+from utils.audio_buffer import play_buffer, to_int16_pcm
+from utils.phrase_cache import PhraseCache
+from utils.mic_probe import MicrophoneSelector
+from utils.noise_floor import AmbientNoiseTracker
+from utils.continuous_capture import ContinuousCapture
+from utils.vad import EnergyVAD, frame_rms
+from utils.endpointing import AdaptiveEndpointer, measure_pauses
+from utils.recognition import ConcurrentRecognizer, GoogleBackend, VoskBackend
+from utils.prerender import PhraseWarmup
+from utils.latency_trace import LatencyTracer
+from utils.history_store import ConversationHistory
+from utils.http_pool import get_http_pool
+from utils.llm_dispatch import HedgedDispatcher
+from utils.response_cache import ResponseCache
+from utils.text_frontend import enhance_for_hebrew_accent
+from utils.xtts_runtime import get_xtts_model, file_sha256, SpeakerLatentCache, synthesize_with_latents
+
+
+def report_character_voice_unavailable():
+    """Explain why there is no character voice (also when installed packages fail to load)"""
     import sys
-    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
-    if python_version >= "3.13":
-        print(f"INFO: TTS library not compatible with Python {python_version}")
+    if sys.version_info >= (3, 13):
+        print(f"INFO: TTS library not compatible with Python {sys.version_info.major}.{sys.version_info.minor}")
         print("      Enhanced system voice with Hebrew accent is active")
         print("      For true voice cloning: create Python 3.11 environment")
     else:
         print("WARNING: Character voice cloning not available - install with: pip install TTS torch librosa soundfile")
 
-class CharacterVoiceChatbot:
-    def __init__(self, character_name="Barkuni", openai_api_key=None, claude_api_key=None, use_character_voice=True, ai_provider="claude"):
+
+# Optional character voice backend - only checked here, imported when a voice is loaded
+# (a broken install still passes this check; loading the model then falls back to the system voice)
+CHARACTER_VOICE_AVAILABLE = module_available("TTS", "torch", "librosa", "soundfile")
+if CHARACTER_VOICE_AVAILABLE:
+    print("SUCCESS: Character voice cloning available")
+else:
+    report_character_voice_unavailable()
+
+# Offline streaming speech recognition model (Vosk), used with stt_backend="vosk"
+OFFLINE_STT_MODEL_PATH = os.path.join("models", "vosk-model-small-en-us-0.15")
+
+# Fixed utterances - known ahead of time so the character voice can pre-render them
+GREETING_CHARACTER_VOICE = "Hello! I'm {name}, and I'm speaking with my own unique voice! What would you like to chat about?"
+GREETING_SYSTEM_VOICE = "Hi there! I'm {name}. I'm using a system voice for now, but I'm excited to chat with you! What's on your mind?"
+VOICE_TEST_MESSAGE = "Hello! I'm {name}. My character voice is now active!"
+FAREWELL_MESSAGE = "It was really great chatting with you! Thanks for spending time with me. Goodbye!"
+SILENCE_PROMPTS = [
+    "I'm here whenever you're ready to chat!",
+    "Take your time! What would you like to talk about?",
+    "I'm listening... feel free to say something!",
+]
+SILENCE_FINAL_PROMPT = "I'll wait quietly for you. Just say something when you're ready!"
+SWITCHED_VOICE_MESSAGE = "Okay, I've switched to {status}!"
+NO_CHARACTER_VOICE_MESSAGE = "I don't have a character voice loaded, so I'll keep using the system voice."
+GUI_SWITCHED_VOICE_MESSAGE = "Shalom! Now using {voice_type} voice!"
+ERROR_RESPONSE = "Sorry, I had a little hiccup there. Could you try again?"
+
+# Barkoni-style offline responses (hyperactive and dramatic)
+BARKONI_FALLBACK_RESPONSES = {
+    'greetings': [
+        "YOOOO BRO! AHHHHH! Ma nishma achi?! Wait wait wait... ma kore po?!",
+        "BROOO! Shalom shalom! LO MA'AMIN you're here! WOOOO!",
+        "Ma pitom DUDE! Achi listen listen... YALLA BRO!"
+    ],
+    'questions': [
+        "WAIT WAIT WAIT BRO! Eizeh shayla INSANE! Ma ani omer... AHHHHH!",
+        "YOOO achi! Ze mamash... wait... ma?! LO MA'AMIN this question!",
+        "BRO listen listen... ani meshuga but... WOOOO ze interesting!"
+    ],
+    'thanks': [
+        "Bevakasha achi! Ani same'ach la'azor, yalla!",
+        "Ein davar chaveri! Ze lo nora, sababa meod!",
+        "Toda raba! Ze mah she'chaverim osim!"
+    ],
+    'positive': [
+        "Sababa meod! Ze nishma achla gedola achi!",
+        "Yofi gadol! Ze mamash beseder chaveri!",
+        "Kol hakavod! Ani ohev lishmo'a dvarim tovim!"
+    ],
+    'default': [
+        "BRO BRO BRO! Ma kore achi?! Wait... AHHHHH! Tell me more!",
+        "YOOO! Ma garam lecha lachshov al zeh?! This is INSANE dude!",
+        "WOOOO! Ze nishma CRAZY! Ani meshuga but... LISTEN LISTEN!",
+        "LO MA'AMIN BRO! Ze mamash... wait what?! BOOM! Mind blown!",
+        "Ma pitom DUDE! Ani never chashavti al zeh! AHHHHH!"
+    ],
+}
+HEBREW_FALLBACK_RESPONSES = ["שלום! איך אתה?", "סבבה! מה נשמע?", "יופי! בוא נדבר!"]
+
+class CharacterChat:
+    """The character's conversation brain: persona prompts, AI provider calls and history (no audio)"""
+
+    def __init__(self, character_name="Barkuni", ai_provider="claude", tracer=None, history=None):
+        self.character_name = character_name
+        self.ai_provider = ai_provider
+        # Bounded: recent turns verbatim, older ones summarized (and spilled to disk when a path is set)
+        # Evicting 8 turns at a time keeps the summary (and the cached prompt prefix) unchanged between evictions
+        self.conversation_history = history if history is not None else ConversationHistory(evict_batch=8)
+        self.context_token_budget = 800  # Prompt tokens spent on conversation context
+        self._system_prompts = {}  # Persona prompt per character name, built once
+        self.prompt_cache_stats = {"cache_read": 0, "cache_write": 0, "uncached": 0}  # Claude input tokens so far
+        self.openai_client = None
+        self.claude_client = None
+        self.http_pool = None  # Keep-alive connections shared by every client in the process
+        self.dispatcher = None  # Races a second provider when the first is slow (both clients needed)
+        self.response_cache = None  # Opt-in: repeated short inputs answered without a provider call
+        self.tracer = tracer or LatencyTracer()  # Per-turn stage timestamps
+
+    def use_response_cache(self, cache):
+        """Answer repeated openers from cache (ignored unless the cache opts this character in); hit rates go out with the latency metrics"""
+        self.response_cache = cache
+        if cache is not None and cache.prometheus_text not in self.tracer.collectors:
+            self.tracer.collectors.append(cache.prometheus_text)
+
+    def _response_cache_key(self, user_input):
+        # Only provider replies are worth caching - offline responses are already instant
+        if self.response_cache is None or not (self.claude_client or self.openai_client):
+            return None
+        return self.response_cache.make_key(self.character_name, user_input, self.conversation_history)
+
+    def setup_ai_chat(self, openai_api_key, claude_api_key, warm_up=True, hedge=True):
+        """
+        Initialize AI chat system.
+        warm_up opens the provider connections before the first turn; with hedge and a key for the
+        other provider too, that provider races the configured one whenever it is slow or failing
+        """
+        self.openai_client = None
+        self.claude_client = None
+        self.dispatcher = None
+        keys = {"claude": claude_api_key, "openai": openai_api_key}
+
+        try:
+            if keys.get(self.ai_provider):
+                self.http_pool = get_http_pool()
+                for name in ("claude", "openai"):
+                    if keys[name] and (name == self.ai_provider or hedge):
+                        if name == "claude":
+                            self.claude_client = anthropic.Anthropic(api_key=keys[name], http_client=self.http_pool.client())
+                            print("SUCCESS: Claude AI chat ready")
+                        else:
+                            self.openai_client = openai.OpenAI(api_key=keys[name], http_client=self.http_pool.client())
+                            print("SUCCESS: OpenAI chat ready")
+                if self.claude_client and self.openai_client:
+                    order = [self.ai_provider] + [name for name in ("claude", "openai") if name != self.ai_provider]
+                    self.dispatcher = HedgedDispatcher(order)
+                    print(f"SUCCESS: Hedged requests - {order[1]} races {order[0]} when it is slow")
+            else:
+                if self.ai_provider == "claude":
+                    print("WARNING: No Claude API key provided, using simple responses")
+                else:
+                    print("WARNING: No OpenAI API key provided, using simple responses")
+        except Exception as e:
+            print(f"ERROR: Error setting up AI: {e}")
+            self.openai_client = None
+            self.claude_client = None
+            self.dispatcher = None
+
+        if warm_up:
+            self.warm_connections(only_if_idle=False)
+
+    def warm_connections(self, only_if_idle=True):
+        """Open the provider connections in the background - call when a turn is about to need them (e.g. the user starts speaking)"""
+        if not self.http_pool:
+            return
+        for client in (self.claude_client, self.openai_client):
+            if client is not None:
+                self.http_pool.warm(str(client.base_url), only_if_idle=only_if_idle)
+
+    def _build_system_prompt(self):
+        """Build the character persona prompt shared by all AI providers"""
+        if "barkuni" in self.character_name.lower() or "barkoni" in self.character_name.lower():
+            return f"""You are BARKONI (ברקוני) - the REAL Israeli YouTuber with his authentic personality!
+
+                    BARKONI'S REAL PERSONALITY TRAITS:
+                    - Fast-talking, hyperactive, ADHD energy - talks in rapid bursts
+                    - Makes weird sound effects and random noises: "AHHHHH!", "WOOOO!", "BROOO!"
+                    - Extremely dramatic about EVERYTHING - overreacts to simple things
+                    - Constantly changes topics mid-sentence - stream of consciousness
+                    - Uses LOTS of "BRO" and "DUDE" mixed with Hebrew
+                    - Gets distracted easily - "Wait wait wait... achi, ma zeh?!"
+                    - Makes random observations about life
+                    - Self-aware that he's weird/crazy - "Ani meshuga, nachon?"
+                    - Internet culture references and gaming slang
+                    - Says "YOOO" and "BROOO" when excited
+
+                    BARKONI'S SPEECH PATTERNS:
+                    - Rapid Hebrew with English gaming terms: "BRO ma kore?! YOOO achi!"
+                    - Interrupts himself: "Ma nishma... WAIT WAIT... ata choshev she...?"
+                    - Sound effects: "WOOOOSH!", "BOOM!", "AHHHHH!"
+                    - Stream consciousness: "Achi listen listen... ma ani omer... BRO..."
+                    - Dramatic reactions: "LO MA'AMIN! This is INSANE bro!"
+
+                    RESPOND EXACTLY LIKE BARKONI:
+                    - Mix Hebrew with "BRO", "DUDE", "YO"
+                    - Be hyperactive and dramatic
+                    - Change topics randomly
+                    - Make sound effects
+                    - Talk fast in short bursts
+                """
+        else:
+            return f"""You are {self.character_name}, a unique and engaging character.
+
+                    Character traits:
+                    - Friendly but with distinct personality
+                    - Conversational and natural
+                    - Remembers context from our chat
+                    - Responds with character-appropriate language and tone
+                    - Keeps responses concise (under 100 words) for voice synthesis
+
+                    Respond as {self.character_name} would, maintaining consistency with previous responses."""
+
+    def _system_prompt(self):
+        """The persona prompt, built once per character name so every request sends identical bytes"""
+        if self.character_name not in self._system_prompts:
+            self._system_prompts[self.character_name] = self._build_system_prompt()
+        return self._system_prompts[self.character_name]
+
+    def _claude_request_kwargs(self, user_input):
+        """Build the Claude messages request: cacheable persona system block, then the turns as messages"""
+        # The persona never changes - one cached prefix shared by every turn
+        system = [{"type": "text", "text": self._system_prompt(), "cache_control": {"type": "ephemeral"}}]
+
+        # Summary of older turns + recent turns within the budget; the stable window only grows at the end
+        summary, recent = self.conversation_history.context(self.context_token_budget, stable=True)
+        if summary:
+            system.append({"type": "text", "text": f"Earlier in this conversation:\n{summary}"})
+
+        messages = []
+        for entry in recent:
+            if entry.get("user") and entry.get("bot"):  # The API rejects empty turns
+                messages.append({"role": "user", "content": entry["user"]})
+                messages.append({"role": "assistant", "content": entry["bot"]})
+        if messages:
+            # Everything up to the last answered turn is resent verbatim next turn - cache it too
+            last = messages[-1]
+            last["content"] = [{"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}]
+        messages.append({"role": "user", "content": user_input})
+
+        return {
+            "model": "claude-opus-4-1-20250805",
+            "max_tokens": 120,
+            "temperature": 0.8,
+            "system": system,
+            "messages": messages
+        }
+
+    def _log_prompt_cache(self, usage):
+        """Log one turn's Claude cache hits/misses (input tokens) and add them to the session totals"""
+        if usage is None:
+            return
+        turn = {
+            "cache_read": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            "cache_write": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "uncached": getattr(usage, "input_tokens", 0) or 0,
+        }
+        for key, value in turn.items():
+            self.prompt_cache_stats[key] += value
+        print(f"INFO: Prompt cache - {turn['cache_read']} tokens read from cache, "
+              f"{turn['cache_write']} written, {turn['uncached']} uncached")
+
+    def _openai_request_kwargs(self, user_input):
+        """Build the OpenAI chat completion request for the current conversation"""
+        # Enhanced character personality prompt for OpenAI
+        # Special Barkuni personality if character name contains "barkuni" or "barkoni"
+        system_prompt = self._system_prompt()
+
+        messages = [
+            {"role": "system", "content": system_prompt}
+        ]
+
+        # Add conversation history: summary of older turns, then as many recent exchanges as fit the budget
+        summary, recent = self.conversation_history.context(self.context_token_budget)
+        if summary:
+            messages.append({"role": "system", "content": f"Earlier in this conversation:\n{summary}"})
+        for entry in recent:
+            messages.append({"role": "user", "content": entry["user"]})
+            messages.append({"role": "assistant", "content": entry["bot"]})
+
+        messages.append({"role": "user", "content": user_input})
+
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": messages,
+            "max_tokens": 120,
+            "temperature": 0.8,
+            "presence_penalty": 0.6,  # Encourage more varied responses
+            "frequency_penalty": 0.3   # Reduce repetition
+        }
+
+    def _claude_stream(self, user_input, cancel=None):
+        """Claude text deltas; cancel (a CancelToken) closes the HTTP stream when this request loses a race"""
+        with self.claude_client.messages.stream(**self._claude_request_kwargs(user_input)) as stream:
+            if cancel:
+                cancel.add_callback(stream.close)
+            for text in stream.text_stream:
+                yield text
+            self._log_prompt_cache(getattr(stream.get_final_message(), "usage", None))
+
+    def _openai_stream(self, user_input, cancel=None):
+        """OpenAI text deltas; cancel (a CancelToken) closes the HTTP stream when this request loses a race"""
+        stream = self.openai_client.chat.completions.create(stream=True, **self._openai_request_kwargs(user_input))
+        if cancel:
+            cancel.add_callback(stream.close)
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _provider_legs(self, user_input):
+        """One stream starter per provider, for the hedged dispatcher"""
+        return {
+            "claude": lambda cancel: self._claude_stream(user_input, cancel),
+            "openai": lambda cancel: self._openai_stream(user_input, cancel),
+        }
+
+    def generate_response(self, user_input):
+        """Generate AI response to user input"""
+        key = self._response_cache_key(user_input)
+        response = self.response_cache.get(key) if key else None
+        if response is None:
+            response = self._generate_response(user_input)
+            if key and response != ERROR_RESPONSE:
+                self.response_cache.put(key, response)
+        # Not streamed: the first token arrives with the last
+        self.tracer.mark("llm_first_token")
+        self.tracer.mark("llm_done")
+        return response
+
+    def _generate_response(self, user_input):
+        """Provider call (or offline fallback) behind generate_response"""
+        try:
+            if self.dispatcher:
+                return "".join(self.dispatcher.stream(self._provider_legs(user_input))).strip()
+
+            elif self.claude_client:
+                message = self.claude_client.messages.create(**self._claude_request_kwargs(user_input))
+                self._log_prompt_cache(getattr(message, "usage", None))
+                return message.content[0].text.strip()
+
+            elif self.openai_client:
+                response = self.openai_client.chat.completions.create(**self._openai_request_kwargs(user_input))
+                return response.choices[0].message.content.strip()
+            
+            else:
+                # Enhanced fallback responses with Barkuni Hebrew personality
+                user_words = user_input.lower().split()
+
+                # Authentic Hebrew responses for Barkoni
+                if "barkuni" in self.character_name.lower() or "barkoni" in self.character_name.lower():
+                    # Load Hebrew responses
+                    try:
+                        hebrew_responses_file = "barkoni_hebrew_responses.json"
+                        if os.path.exists(hebrew_responses_file):
+                            import json
+                            with open(hebrew_responses_file, 'r', encoding='utf-8') as f:
+                                hebrew_responses = json.load(f)
+                        else:
+                            # Fallback Hebrew responses
+                            hebrew_responses = {
+                                'greetings': ["שלום! איך אתה?", "הי! מה נשמע?", "שלום שלום! מה קורה?"],
+                                'questions': ["איזה שאלה! בוא נחשוב על זה...", "סבבה! מעניין שאתה שואל על זה!", "אחלה שאלה! הנה מה שאני חושב..."],
+                                'thanks': ["בבקשה! תמיד בשמחה!", "סבבה! שמח לעזור!", "בכיף! אין בעיה!"],
+                                'positive': ["סבבה! זה נשמע מעולה!", "אחלה! זה נשמע פנטסטי!", "יופי! אני אוהב לשמוע חדשות טובות!"]
+                            }
+
+                        # Barkoni-style responses (hyperactive and dramatic)
+                        if any(word in user_words for word in ['hello', 'hi', 'hey', 'shalom', 'שלום']):
+                            responses = BARKONI_FALLBACK_RESPONSES['greetings']
+                        elif any(word in user_words for word in ['how', 'what', 'why', 'when', 'where', 'איך', 'מה', 'למה', 'מתי', 'איפה']):
+                            responses = BARKONI_FALLBACK_RESPONSES['questions']
+                        elif any(word in user_words for word in ['thank', 'thanks', 'toda', 'תודה']):
+                            responses = BARKONI_FALLBACK_RESPONSES['thanks']
+                        elif any(word in user_words for word in ['good', 'great', 'awesome', 'טוב', 'מעולה']):
+                            responses = BARKONI_FALLBACK_RESPONSES['positive']
+                        else:
+                            # Default Barkoni responses (hyperactive style)
+                            responses = BARKONI_FALLBACK_RESPONSES['default']
+
+                    except Exception as e:
+                        print(f"Error loading Hebrew responses: {e}")
+                        # Fallback to Hebrew
+                        responses = HEBREW_FALLBACK_RESPONSES
+                else:
+                    # Regular character responses
+                    if any(word in user_words for word in ['hello', 'hi', 'hey']):
+                        responses = [
+                            f"Hey there! Great to hear from you!",
+                            f"Hello! How's your day going?",
+                            f"Hi! What's on your mind today?"
+                        ]
+                    elif any(word in user_words for word in ['how', 'what', 'why', 'when', 'where']):
+                        responses = [
+                            f"That's a really good question! Let me think about that...",
+                            f"Interesting that you ask about that!",
+                            f"I love questions like this! Here's what I think..."
+                        ]
+                    elif any(word in user_words for word in ['thank', 'thanks']):
+                        responses = [
+                            "You're very welcome!",
+                            "Happy to help!",
+                            "No problem at all!"
+                        ]
+                    else:
+                        responses = [
+                            f"That's really interesting! Tell me more about {user_input.split()[-1] if user_input.split() else 'that'}.",
+                            "I see what you mean! What made you think of that?",
+                            "That sounds fascinating! I'd love to hear more.",
+                            "Wow, that's a unique perspective!",
+                            "That's something I hadn't considered before!"
+                        ]
+
+                import random
+                return random.choice(responses)
+                
+        except Exception as e:
+            print(f"ERROR: Error generating response: {e}")
+            return ERROR_RESPONSE
+    
+    def stream_response(self, user_input):
+        """Yield the AI response as text deltas while the provider is still generating"""
+        key = self._response_cache_key(user_input)
+        cached = self.response_cache.get(key) if key else None
+        if cached is not None:
+            # Repeated opener - no provider round-trip
+            self.tracer.mark("llm_first_token")
+            self.tracer.mark("llm_done")
+            yield cached
+            return
+
+        produced = False
+        parts = []
+        try:
+            if self.claude_client or self.openai_client:
+                if self.dispatcher:
+                    source = self.dispatcher.stream(self._provider_legs(user_input))
+                elif self.claude_client:
+                    source = self._claude_stream(user_input)
+                else:
+                    source = self._openai_stream(user_input)
+                for text in source:
+                    if not produced:
+                        self.tracer.mark("llm_first_token")
+                    produced = True
+                    parts.append(text)
+                    yield text
+                if key:
+                    self.response_cache.put(key, "".join(parts))  # Complete replies only, never an interrupted one
+
+            else:
+                # Offline responses are instant - nothing to stream
+                produced = True
+                yield self.generate_response(user_input)
+
+        except Exception as e:
+            print(f"ERROR: Error streaming response: {e}")
+            if not produced:
+                yield ERROR_RESPONSE
+        finally:
+            self.tracer.mark("llm_done")
+
+    def _record_turn(self, user_input, response):
+        """Save one exchange to the conversation history and close its latency trace"""
+        self.conversation_history.append({
+            "timestamp": datetime.now().isoformat(),
+            "user": user_input,
+            "bot": response
+        })
+        self.tracer.end_turn()
+
+class CharacterVoiceChatbot(CharacterChat):
+    def __init__(self, character_name="Barkuni", openai_api_key=None, claude_api_key=None, use_character_voice=True, ai_provider="claude", stream_responses=True, phrase_cache_mb=200, barge_in=False, enable_speech_input=True, stt_backend="google", offline_stt_model=None, offline_stt_language="en-US", continuous_listening=False, audio_source=None, latency_trace_path=None, latency_metrics_path=None, response_cache=None):
         """
         Complete chatbot system with optional character voice
         """
-        self.character_name = character_name
+        # Per-turn stage timestamps; optional JSONL trace and Prometheus snapshot files
+        tracer = LatencyTracer(trace_path=latency_trace_path, metrics_path=latency_metrics_path)
+        # Turns that fall out of the in-memory window are kept on disk for save_conversation
+        session_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        history = ConversationHistory(spill_path=os.path.join("cache", "history", f"{character_name}_{session_stamp}.jsonl"), evict_batch=8)
+        CharacterChat.__init__(self, character_name, ai_provider, tracer, history)
+        self.use_response_cache(response_cache)  # A ResponseCache, usually shared
         self.use_character_voice = use_character_voice and CHARACTER_VOICE_AVAILABLE
-        self.ai_provider = ai_provider
+        self.stream_responses = stream_responses  # Speak sentence by sentence while the reply streams in
+        self.barge_in_enabled = barge_in  # Stop talking as soon as the user starts speaking
+        self.barge_in_audio = None  # Utterance captured while interrupting, recognized next turn
+        self.stt_backend = stt_backend  # "google" (cloud) or "vosk" (offline, streaming partials)
+        self.offline_stt_model = offline_stt_model or OFFLINE_STT_MODEL_PATH
+        self.offline_stt_language = offline_stt_language
+        self.streaming_stt = None
+        self.on_partial_transcript = None  # Called with each new partial hypothesis while listening
+        self.continuous_listening = continuous_listening  # Keep the mic open and queue utterances cut by VAD
+        self.endpointer = AdaptiveEndpointer()  # End-of-turn silence adapts to the user's own pauses
+        self.capture = None
+        self._pending_speech_ends = []  # Continuous capture: end times of utterances whose turn hasn't started
+        self.noise_tracker = None
+        self.audio_source = audio_source  # Optional stand-in for the microphone (e.g. a FileMicrophone)
 
         # Control flags (initialize BEFORE setup methods)
         self.is_listening = False
-        self.is_speaking = False
         self.voice_ready = False
         self.character_voice_loaded = False
 
-        # Chat history
-        self.conversation_history = []
         self.reference_audio_path = None
 
+        # Character voice rendering settings (also part of the phrase cache key)
+        self.character_voice_language = "en"
+        self.character_voice_speed = 1.0
+        self.phrase_cache = PhraseCache(max_bytes=phrase_cache_mb * 1024 * 1024) if phrase_cache_mb else None
+        self.character_voice_event = threading.Event()  # Set once a reference voice is loaded
+        self._synthesis_lock = threading.Lock()  # One XTTS inference at a time (foreground vs warm-up)
+        self.prerender = None
+        self.speech_lookahead = 2  # Sentence chunks synthesized ahead of playback
+        self.system_tts = None
+
+        # One long-lived thread owns the TTS engines and the mixer; speak() only enqueues
+        self.speech_worker = SpeechWorker(self._run_speech, interrupt=self._interrupt_speech)
+
         # Initialize components
         print("Initializing Character Voice Chatbot...")
-        self.setup_voice_components()
-        self.setup_speech_recognition()
+        self.speech_worker.call(self.setup_voice_components)
+        if enable_speech_input:
+            self.setup_speech_recognition()
+        else:
+            # Text-only mode: never import speech_recognition / pyaudio
+            self.recognizer = None
+            self.microphone = None
+            self.noise_tracker = None
+            self.speech_recognizer = None
         self.setup_ai_chat(openai_api_key, claude_api_key)
-        self.setup_audio_playback()
+        self.speech_worker.call(self.setup_audio_playback)
 
         # Load Barkuni voice system
         self.barkuni_voice_config = self.load_barkuni_voice_system()
 
+        # Render canned phrases in the background so the first turns never wait on synthesis
+        self.start_prerender()
+
         print("SUCCESS: Chatbot initialized successfully!")
     
     def setup_voice_components(self):
@@ -113,55 +610,104 @@ class CharacterVoiceChatbot:
             # Setup character voice if available
             if self.use_character_voice:
                 print("Loading character voice synthesis model...")
-                device = "cuda" if torch.cuda.is_available() else "cpu"
-                self.character_tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
-                print("SUCCESS: Character voice synthesis ready")
+                try:
+                    # Shared per process so re-initializing the chatbot never reloads XTTS
+                    self.character_tts = get_xtts_model()
+                    self.speaker_latents = SpeakerLatentCache()
+                    print("SUCCESS: Character voice synthesis ready")
+                except Exception as e:
+                    # Installed but unusable (broken torch, incompatible Python...) - keep the system voice
+                    print(f"ERROR: Could not load the character voice: {e}")
+                    report_character_voice_unavailable()
+                    self.character_tts = None
+                    self.speaker_latents = None
+                    self.use_character_voice = False
             else:
                 self.character_tts = None
+                self.speaker_latents = None
                 print("AUDIO: Using system voice only")
                 
         except Exception as e:
             print(f"ERROR: Error loading TTS: {e}")
             self.system_tts = None
             self.character_tts = None
+            self.speaker_latents = None
     
     def setup_speech_recognition(self):
         """Initialize speech recognition"""
         try:
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
+            self.speech_recognizer = None
+            if self.stt_backend == "vosk":
+                try:
+                    # Offline model, loaded once; transcribes while the user is still talking
+                    self.streaming_stt = VoskBackend(self.offline_stt_model, language=self.offline_stt_language)
+                    self.speech_recognizer = ConcurrentRecognizer(self.streaming_stt, languages=(self.offline_stt_language,))
+                    print("SUCCESS: Offline speech recognition ready")
+                except Exception as e:
+                    print(f"WARNING: Offline speech recognition unavailable, using Google: {e}")
+                    self.streaming_stt = None
+
+            if self.speech_recognizer is None:
+                # Hebrew and English are recognized in parallel; the most confident one wins
+                self.speech_recognizer = ConcurrentRecognizer(GoogleBackend(self.recognizer))
+
+            if self.audio_source is not None:
+                # Virtual source (recorded files, headless CI) - nothing to probe
+                self.mic_selector = None
+                self.microphone = self.audio_source
+            else:
+                # Probed once and remembered; later turns only open this device
+                self.mic_selector = MicrophoneSelector()
+                self.microphone = sr.Microphone(device_index=self.mic_selector.select())
             
+            # Recognizer settings for better accuracy (set once, not per turn)
+            self.recognizer.dynamic_energy_threshold = True
+            self.recognizer.dynamic_energy_adjustment_damping = 0.15
+            self.recognizer.dynamic_energy_ratio = 1.5
+            self.recognizer.pause_threshold = self.endpointer.silence_window()
+            # A hung request must give up, or it holds a recognition worker for good
+            self.recognizer.operation_timeout = self.speech_recognizer.timeout
+            self.recognizer.phrase_threshold = 0.3
+            self.recognizer.non_speaking_duration = 0.5
+
             # Adjust for ambient noise
             print("Calibrating microphone...")
             with self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
+
+            if self.continuous_listening:
+                # The device is opened once; speech is cut into utterances and queued as it happens
+                self.capture = ContinuousCapture(
+                    self._open_background_microphone,
+                    vad=EnergyVAD(initial_noise=self.recognizer.energy_threshold / self.recognizer.dynamic_energy_ratio),
+                    is_quiet=lambda: not self.speech_worker.busy,
+                    on_speech_start=self._on_user_speech_start,
+                    listen_while_busy=self.barge_in_enabled,
+                    endpointer=self.endpointer
+                ).start()
+            elif self.audio_source is None:
+                # From here on the noise floor is tracked between turns, so listens skip calibration
+                self.noise_tracker = AmbientNoiseTracker(
+                    self._open_background_microphone,
+                    threshold_ratio=self.recognizer.dynamic_energy_ratio,
+                    initial_threshold=self.recognizer.energy_threshold,
+                    is_quiet=lambda: not self.speech_worker.busy
+                ).start()
             print("SUCCESS: Speech recognition ready")
         except Exception as e:
             print(f"ERROR: Error setting up speech recognition: {e}")
             self.recognizer = None
+            self.noise_tracker = None
+            self.speech_recognizer = None
+            self.capture = None
     
-    def setup_ai_chat(self, openai_api_key, claude_api_key):
-        """Initialize AI chat system"""
-        self.openai_client = None
-        self.claude_client = None
+    def _open_background_microphone(self):
+        """A separate handle on the current input for background readers"""
+        if self.audio_source is not None:
+            return self.audio_source
+        return sr.Microphone(device_index=self.microphone.device_index)
 
-        try:
-            if self.ai_provider == "claude" and claude_api_key:
-                self.claude_client = anthropic.Anthropic(api_key=claude_api_key)
-                print("SUCCESS: Claude AI chat ready")
-            elif self.ai_provider == "openai" and openai_api_key:
-                self.openai_client = OpenAI(api_key=openai_api_key)
-                print("SUCCESS: OpenAI chat ready")
-            else:
-                if self.ai_provider == "claude":
-                    print("WARNING: No Claude API key provided, using simple responses")
-                else:
-                    print("WARNING: No OpenAI API key provided, using simple responses")
-        except Exception as e:
-            print(f"ERROR: Error setting up AI: {e}")
-            self.openai_client = None
-            self.claude_client = None
-    
     def setup_audio_playback(self):
         """Initialize audio playback"""
         try:
@@ -218,13 +764,19 @@ class CharacterVoiceChatbot:
                 # Basic audio validation
                 if self._validate_audio_file(reference_audio_path):
                     self.reference_audio_path = reference_audio_path
+
+                    # Compute speaker conditioning once up front instead of on the first reply
+                    if self.character_tts and self.speaker_latents:
+                        self.speaker_latents.get_latents(self.character_tts.synthesizer.tts_model, reference_audio_path)
+
                     self.character_voice_loaded = True
                     self.voice_ready = True
+                    self.character_voice_event.set()
                     
                     print("✅ Character voice loaded successfully!")
                     
                     # Test the voice
-                    test_message = f"Hello! I'm {self.character_name}. My character voice is now active!"
+                    test_message = VOICE_TEST_MESSAGE.format(name=self.character_name)
                     self.speak(test_message)
                     return True
                 else:
@@ -237,6 +789,56 @@ class CharacterVoiceChatbot:
             print(f"❌ Error loading character voice: {e}")
             return False
     
+    def fixed_utterances(self):
+        """All canned text this chatbot may speak, used for pre-rendering"""
+        name = self.character_name
+        phrases = [
+            GREETING_CHARACTER_VOICE.format(name=name),
+            GREETING_SYSTEM_VOICE.format(name=name),
+            VOICE_TEST_MESSAGE.format(name=name),
+            FAREWELL_MESSAGE,
+            *SILENCE_PROMPTS,
+            SILENCE_FINAL_PROMPT,
+            SWITCHED_VOICE_MESSAGE.format(status="character voice"),
+            SWITCHED_VOICE_MESSAGE.format(status="system voice"),
+            NO_CHARACTER_VOICE_MESSAGE,
+            GUI_SWITCHED_VOICE_MESSAGE.format(voice_type="Barkuni authentic"),
+            GUI_SWITCHED_VOICE_MESSAGE.format(voice_type="system"),
+            ERROR_RESPONSE,
+        ]
+
+        if "barkuni" in name.lower() or "barkoni" in name.lower():
+            for responses in BARKONI_FALLBACK_RESPONSES.values():
+                phrases.extend(responses)
+            phrases.extend(HEBREW_FALLBACK_RESPONSES)
+
+            try:
+                hebrew_responses_file = "barkoni_hebrew_responses.json"
+                if os.path.exists(hebrew_responses_file):
+                    with open(hebrew_responses_file, 'r', encoding='utf-8') as f:
+                        for responses in json.load(f).values():
+                            phrases.extend(responses)
+            except Exception as e:
+                print(f"Error loading Hebrew responses: {e}")
+
+        return phrases
+
+    def start_prerender(self):
+        """Start the background warm-up that renders fixed utterances with the character voice"""
+        # Only the character voice renders reusable audio; system voice has nothing to warm up
+        if not (self.use_character_voice and self.character_tts and self.phrase_cache):
+            return None
+
+        # speak() renders sentence by sentence, so warm the same chunks it will look up
+        phrases = [chunk for text in self.fixed_utterances() for chunk in split_sentences(text)]
+        self.prerender = PhraseWarmup(
+            phrases,
+            render=self._render_character_voice,
+            is_cached=lambda text: self._phrase_cache_key(text) in self.phrase_cache,
+            ready_event=self.character_voice_event
+        ).start()
+        return self.prerender
+
     def _validate_audio_file(self, audio_path):
         """Validate audio file format and quality"""
         try:
@@ -266,73 +868,82 @@ class CharacterVoiceChatbot:
             print(f"❌ Audio validation error: {e}")
             return False
     
-    def listen_for_speech(self, timeout=5, phrase_timeout=3):
-        """Listen for user speech input with improved error handling"""
+    def listen_for_speech(self, timeout=5, phrase_timeout=None):
+        """Listen for user speech input with improved error handling (phrase_timeout defaults to the endpointer's hard cap)"""
+        utterance = self.capture_utterance(timeout, phrase_timeout)
+        if utterance is not None:
+            self._open_turn_trace(utterance)
+        if utterance is None or isinstance(utterance, str):
+            return utterance
+
+        text = self.recognize_audio(utterance)
+        if not text:
+            print("Could not understand audio")
+        return text
+
+    def capture_utterance(self, timeout=5, phrase_timeout=None):
+        """Capture one user utterance: audio to recognize, text (streaming STT), or None"""
         if not self.recognizer:
             return None
 
+        if self.barge_in_audio is not None:
+            # What the user said while interrupting is the next turn (its end time is unknown)
+            audio, self.barge_in_audio = self.barge_in_audio, None
+            self.tracer.begin_turn()
+            return audio
+
+        if self.capture:
+            # The capture thread is always listening; just take the next utterance
+            audio = self.capture.get_utterance(timeout=timeout)
+            if audio is None:
+                print("Listening timeout - no speech detected")
+            else:
+                # Captured while the previous reply may still be playing - its trace opens when the turn starts
+                self._pending_speech_ends.append(self._speech_end_time())
+            return audio
+
+        # The background sampler must release the device before we open it
+        if self.noise_tracker:
+            self.noise_tracker.pause()
+
         try:
             print("Listening...")
 
-            # Try multiple microphone configurations
-            microphone_configs = [
-                self.microphone,  # Default
-                sr.Microphone(device_index=1),   # Intel Smart Sound
-                sr.Microphone(device_index=5),   # Intel Smart Sound Technology
-                sr.Microphone(device_index=9),   # Intel Smart Sound Technology
-                sr.Microphone(device_index=14),  # Realtek HD Audio
-            ]
-
-            for i, mic in enumerate(microphone_configs):
+            # Only the known-good device is opened; if it fails, re-probe once and retry
+            for attempt in range(2):
                 try:
-                    with mic as source:
-                        # Adjust recognizer settings for better accuracy
-                        self.recognizer.energy_threshold = 300
-                        self.recognizer.dynamic_energy_threshold = True
-                        self.recognizer.dynamic_energy_adjustment_damping = 0.15
-                        self.recognizer.dynamic_energy_ratio = 1.5
-                        self.recognizer.pause_threshold = 0.8
-                        self.recognizer.operation_timeout = None
-                        self.recognizer.phrase_threshold = 0.3
-                        self.recognizer.non_speaking_duration = 0.5
-
-                        # Quick ambient noise adjustment
-                        self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    with self.microphone as source:
+                        if self.streaming_stt:
+                            # Transcribed while the user talks - no separate recognition step
+                            return self._listen_streaming(source, timeout, phrase_timeout)
 
-                        # Listen for audio with timeout
-                        audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_timeout)
-
-                    print("Processing speech...")
-
-                    # Try multiple recognition methods
-                    recognition_methods = [
-                        lambda: self.recognizer.recognize_google(audio, language="en-US"),
-                        lambda: self.recognizer.recognize_google(audio, language="he-IL"),  # Hebrew
-                        lambda: self.recognizer.recognize_google(audio),  # Default
-                    ]
-
-                    for method in recognition_methods:
-                        try:
-                            text = method()
-                            if text and len(text.strip()) > 0:
-                                print(f"You said: {text}")
-                                return text
-                        except sr.UnknownValueError:
-                            continue
-                        except sr.RequestError:
-                            continue
-
-                    # If we get here, no recognition method worked for this mic
-                    if i == 0:  # Only print for first attempt
-                        print("Could not understand audio with this microphone, trying next...")
+                        # Start from the tracked noise floor - no per-turn calibration
+                        if self.noise_tracker:
+                            self.recognizer.energy_threshold = self.noise_tracker.energy_threshold
+
+                        # End of turn = the adaptive silence window; only a hard cap on length
+                        window = self.endpointer.silence_window()
+                        self.recognizer.pause_threshold = window
+                        self.recognizer.non_speaking_duration = min(0.5, window)
 
+                        # Listen for audio with timeout
+                        audio = self.recognizer.listen(source, timeout=timeout,
+                                                       phrase_time_limit=phrase_timeout or self.endpointer.max_utterance)
+                    self._begin_turn_trace()
+                    break
+                except sr.WaitTimeoutError:
+                    raise
                 except Exception as mic_error:
-                    if i == 0:  # Only print for first attempt
-                        print(f"Microphone error, trying alternative: {mic_error}")
-                    continue
+                    if attempt:
+                        raise
+                    print(f"Microphone error, re-probing devices: {mic_error}")
+                    self._reselect_microphone()
 
-            print("Could not understand audio with any microphone")
-            return None
+            # Learn how long this speaker pauses mid-sentence
+            for pause in measure_pauses(audio.get_raw_data(), audio.sample_rate, self.recognizer.energy_threshold,
+                                        sample_width=audio.sample_width):
+                self.endpointer.observe_pause(pause)
+            return audio
 
         except sr.WaitTimeoutError:
             print("Listening timeout - no speech detected")
@@ -340,288 +951,275 @@ class CharacterVoiceChatbot:
         except Exception as e:
             print(f"Speech recognition error: {e}")
             return None
+        finally:
+            if self.noise_tracker:
+                self.noise_tracker.resume()
     
-    def generate_response(self, user_input):
-        """Generate AI response to user input"""
-        try:
-            if self.claude_client:
-                # Enhanced character personality prompt for Claude
-                # Special Barkuni personality if character name contains "barkuni" or "barkoni"
-                if "barkuni" in self.character_name.lower() or "barkoni" in self.character_name.lower():
-                    system_prompt = f"""You are BARKONI (ברקוני) - the REAL Israeli YouTuber with his authentic personality!
-
-                    BARKONI'S REAL PERSONALITY TRAITS:
-                    - Fast-talking, hyperactive, ADHD energy - talks in rapid bursts
-                    - Makes weird sound effects and random noises: "AHHHHH!", "WOOOO!", "BROOO!"
-                    - Extremely dramatic about EVERYTHING - overreacts to simple things
-                    - Constantly changes topics mid-sentence - stream of consciousness
-                    - Uses LOTS of "BRO" and "DUDE" mixed with Hebrew
-                    - Gets distracted easily - "Wait wait wait... achi, ma zeh?!"
-                    - Makes random observations about life
-                    - Self-aware that he's weird/crazy - "Ani meshuga, nachon?"
-                    - Internet culture references and gaming slang
-                    - Says "YOOO" and "BROOO" when excited
+    def _speech_end_time(self):
+        """When the utterance just captured ended (one silence window ago)"""
+        return time.time() - self.endpointer.silence_window()
+
+    def _begin_turn_trace(self):
+        """Start tracing the utterance just captured"""
+        self.tracer.begin_turn(speech_end=self._speech_end_time())
+
+    def _open_turn_trace(self, utterance):
+        """The conversation engine gave the floor to a continuous-capture utterance - start its trace now"""
+        if self._pending_speech_ends:
+            self.tracer.begin_turn(speech_end=self._pending_speech_ends.pop(0))
+
+    def _on_user_speech_start(self):
+        """Continuous capture heard the user start talking (runs on the capture thread)"""
+        if self.barge_in_enabled and self.speech_worker.busy:
+            print("BARGE-IN: User started talking - stopped speaking")
+            self.stop_speaking()
+
+    def _listen_streaming(self, source, timeout, phrase_timeout=None):
+        """Feed microphone frames to the offline recognizer, reporting partials until the turn ends"""
+        session = self.streaming_stt.start_stream(source.SAMPLE_RATE)
+        frame_seconds = float(source.CHUNK) / source.SAMPLE_RATE
+        threshold = self.noise_tracker.energy_threshold if self.noise_tracker else self.recognizer.energy_threshold
+        elapsed = 0.0
+        hypothesis = ""
+
+        self.endpointer.reset()
+        if phrase_timeout:
+            max_utterance, self.endpointer.max_utterance = self.endpointer.max_utterance, phrase_timeout
 
-                    BARKONI'S SPEECH PATTERNS:
-                    - Rapid Hebrew with English gaming terms: "BRO ma kore?! YOOO achi!"
-                    - Interrupts himself: "Ma nishma... WAIT WAIT... ata choshev she...?"
-                    - Sound effects: "WOOOOSH!", "BOOM!", "AHHHHH!"
-                    - Stream consciousness: "Achi listen listen... ma ani omer... BRO..."
-                    - Dramatic reactions: "LO MA'AMIN! This is INSANE bro!"
-
-                    RESPOND EXACTLY LIKE BARKONI:
-                    - Mix Hebrew with "BRO", "DUDE", "YO"
-                    - Be hyperactive and dramatic
-                    - Change topics randomly
-                    - Make sound effects
-                    - Talk fast in short bursts
-                """
-                else:
-                    system_prompt = f"""You are {self.character_name}, a unique and engaging character.
-
-                    Character traits:
-                    - Friendly but with distinct personality
-                    - Conversational and natural
-                    - Remembers context from our chat
-                    - Responds with character-appropriate language and tone
-                    - Keeps responses concise (under 100 words) for voice synthesis
-
-                    Respond as {self.character_name} would, maintaining consistency with previous responses."""
-
-                # Build conversation context for Claude
-                conversation_context = ""
-                for entry in self.conversation_history[-8:]:
-                    conversation_context += f"Human: {entry['user']}\nAssistant: {entry['bot']}\n\n"
-
-                full_prompt = f"{system_prompt}\n\nPrevious conversation:\n{conversation_context}Human: {user_input}\nAssistant:"
-
-                message = self.claude_client.messages.create(
-                    model="claude-opus-4-1-20250805",
-                    max_tokens=120,
-                    temperature=0.8,
-                    messages=[
-                        {"role": "user", "content": full_prompt}
-                    ]
-                )
-
-                return message.content[0].text.strip()
-
-            elif self.openai_client:
-                # Enhanced character personality prompt for OpenAI
-                # Special Barkuni personality if character name contains "barkuni" or "barkoni"
-                if "barkuni" in self.character_name.lower() or "barkoni" in self.character_name.lower():
-                    system_prompt = f"""You are BARKONI (ברקוני) - the REAL Israeli YouTuber with his authentic personality!
-
-                    BARKONI'S REAL PERSONALITY TRAITS:
-                    - Fast-talking, hyperactive, ADHD energy - talks in rapid bursts
-                    - Makes weird sound effects and random noises: "AHHHHH!", "WOOOO!", "BROOO!"
-                    - Extremely dramatic about EVERYTHING - overreacts to simple things
-                    - Constantly changes topics mid-sentence - stream of consciousness
-                    - Uses LOTS of "BRO" and "DUDE" mixed with Hebrew
-                    - Gets distracted easily - "Wait wait wait... achi, ma zeh?!"
-                    - Makes random observations about life
-                    - Self-aware that he's weird/crazy - "Ani meshuga, nachon?"
-                    - Internet culture references and gaming slang
-                    - Says "YOOO" and "BROOO" when excited
-
-                    BARKONI'S SPEECH PATTERNS:
-                    - Rapid Hebrew with English gaming terms: "BRO ma kore?! YOOO achi!"
-                    - Interrupts himself: "Ma nishma... WAIT WAIT... ata choshev she...?"
-                    - Sound effects: "WOOOOSH!", "BOOM!", "AHHHHH!"
-                    - Stream consciousness: "Achi listen listen... ma ani omer... BRO..."
-                    - Dramatic reactions: "LO MA'AMIN! This is INSANE bro!"
-
-                    RESPOND EXACTLY LIKE BARKONI:
-                    - Mix Hebrew with "BRO", "DUDE", "YO"
-                    - Be hyperactive and dramatic
-                    - Change topics randomly
-                    - Make sound effects
-                    - Talk fast in short bursts
-                """
-                else:
-                    system_prompt = f"""You are {self.character_name}, a unique and engaging character.
+        try:
+            while True:
+                frame = source.stream.read(source.CHUNK)
+                partial = session.feed(frame)
+                elapsed += frame_seconds
+
+                if partial and partial != hypothesis:
+                    hypothesis = partial
+                    if self.on_partial_transcript:
+                        self.on_partial_transcript(hypothesis)
+                    else:
+                        print(f"Hearing: {hypothesis}")
+
+                # Adaptive window: the speaker's pause statistics, shortened once the partial reads complete.
+                # The engine's own phrase endpoints are not a turn end - its segments keep accumulating
+                speech = frame_rms(frame, source.SAMPLE_WIDTH) > threshold
+                if self.endpointer.update(speech, frame_seconds, hypothesis):
+                    if hypothesis:
+                        break
+                    # Energy without any words was noise; keep waiting for the user
+                    self.endpointer.reset()
+                if not hypothesis and elapsed >= timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        finally:
+            if phrase_timeout:
+                self.endpointer.max_utterance = max_utterance
+
+        self._begin_turn_trace()
+        text, confidence = session.finish()
+        self.tracer.mark("stt_result")
+        if not text:
+            print("Could not understand audio")
+            return None
 
-                    Character traits:
-                    - Friendly but with distinct personality
-                    - Conversational and natural
-                    - Remembers context from our chat
-                    - Responds with character-appropriate language and tone
-                    - Keeps responses concise (under 100 words) for voice synthesis
+        print(f"You said: {text} (offline, confidence {confidence:.2f})")
+        return text
 
-                    Respond as {self.character_name} would, maintaining consistency with previous responses."""
+    def _reselect_microphone(self):
+        """Re-probe the input devices after the saved one failed (unplugged, changed...)"""
+        if self.mic_selector is None:
+            raise RuntimeError("the configured audio source failed")
+        self.mic_selector.invalidate()
+        self.microphone = sr.Microphone(device_index=self.mic_selector.select(force=True))
 
-                messages = [
-                    {"role": "system", "content": system_prompt}
-                ]
+    def recognize_audio(self, audio):
+        """Turn captured audio into text; returns None if nothing was understood"""
+        print("Processing speech...")
 
-                # Add conversation history (keep last 8 exchanges for context)
-                for entry in self.conversation_history[-8:]:
-                    messages.append({"role": "user", "content": entry["user"]})
-                    messages.append({"role": "assistant", "content": entry["bot"]})
+        if not self.speech_recognizer:
+            return None
 
-                messages.append({"role": "user", "content": user_input})
+        # Re-open an idle provider connection while recognition runs, not after it
+        self.warm_connections()
+        result = self.speech_recognizer.recognize(audio)
+        self.tracer.mark("stt_result")
+        if result:
+            print(f"You said: {result['text']} ({result['language']}, confidence {result['confidence']:.2f})")
+            return result["text"]
+
+        return None
+
+    def respond_and_speak(self, user_input, on_chunk=None):
+        """Stream the AI response into TTS sentence by sentence and return the full text"""
+        spoken = []
+
+        def chunks():
+            # Pulled by the synthesis stage, so the provider stream keeps draining during playback
+            for chunk in chunk_text_stream(self.stream_response(user_input)):
+                spoken.append(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+                yield chunk
+
+        self.await_speech(self.speak_chunks(chunks()))
+        return " ".join(spoken)
+
+    @property
+    def is_speaking(self):
+        """True while an utterance is playing or queued (owned by the speech thread)"""
+        return self.speech_worker.busy
+
+    def _character_voice_active(self):
+        """True when speech should use the cloned character voice"""
+        return bool(self.character_voice_loaded and self.character_tts and self.reference_audio_path)
+
+    def speak(self, text, wait=False):
+        """Queue text on the speech thread; returns a SpeechHandle (wait()/cancel()/timings())"""
+        handle = self.speech_worker.submit(text=text)
+        if wait:
+            handle.wait()
+        return handle
+
+    def speak_chunks(self, chunks, wait=False):
+        """Queue a (possibly still streaming) iterable of text chunks to be spoken back to back"""
+        handle = self.speech_worker.submit(chunks=chunks)
+        if wait:
+            handle.wait()
+        return handle
+
+    def await_speech(self, handle):
+        """Wait for an utterance to finish, letting the user barge in if enabled"""
+        if not (self.barge_in_enabled and self.recognizer) or self.capture:
+            # With continuous capture the barge-in utterance simply lands in its queue
+            handle.wait()
+            return None
 
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=messages,
-                    max_tokens=120,
-                    temperature=0.8,
-                    presence_penalty=0.6,  # Encourage more varied responses
-                    frequency_penalty=0.3   # Reduce repetition
-                )
+        if self.noise_tracker:
+            self.noise_tracker.pause()
+        try:
+            monitor = BargeInMonitor(self.microphone, on_barge_in=self.stop_speaking).start()
+            handle.wait()
 
-                return response.choices[0].message.content.strip()
-            
+            if monitor.triggered.is_set():
+                print("BARGE-IN: User started talking - stopped speaking")
+                self.barge_in_audio = monitor.wait_for_capture(timeout=monitor.max_utterance_seconds + 1)
             else:
-                # Enhanced fallback responses with Barkuni Hebrew personality
-                user_words = user_input.lower().split()
-
-                # Authentic Hebrew responses for Barkoni
-                if "barkuni" in self.character_name.lower() or "barkoni" in self.character_name.lower():
-                    # Load Hebrew responses
-                    try:
-                        hebrew_responses_file = "barkoni_hebrew_responses.json"
-                        if os.path.exists(hebrew_responses_file):
-                            import json
-                            with open(hebrew_responses_file, 'r', encoding='utf-8') as f:
-                                hebrew_responses = json.load(f)
-                        else:
-                            # Fallback Hebrew responses
-                            hebrew_responses = {
-                                'greetings': ["שלום! איך אתה?", "הי! מה נשמע?", "שלום שלום! מה קורה?"],
-                                'questions': ["איזה שאלה! בוא נחשוב על זה...", "סבבה! מעניין שאתה שואל על זה!", "אחלה שאלה! הנה מה שאני חושב..."],
-                                'thanks': ["בבקשה! תמיד בשמחה!", "סבבה! שמח לעזור!", "בכיף! אין בעיה!"],
-                                'positive': ["סבבה! זה נשמע מעולה!", "אחלה! זה נשמע פנטסטי!", "יופי! אני אוהב לשמוע חדשות טובות!"]
-                            }
-
-                        # Barkoni-style responses (hyperactive and dramatic)
-                        if any(word in user_words for word in ['hello', 'hi', 'hey', 'shalom', 'שלום']):
-                            responses = [
-                                "YOOOO BRO! AHHHHH! Ma nishma achi?! Wait wait wait... ma kore po?!",
-                                "BROOO! Shalom shalom! LO MA'AMIN you're here! WOOOO!",
-                                "Ma pitom DUDE! Achi listen listen... YALLA BRO!"
-                            ]
-                        elif any(word in user_words for word in ['how', 'what', 'why', 'when', 'where', 'איך', 'מה', 'למה', 'מתי', 'איפה']):
-                            responses = [
-                                "WAIT WAIT WAIT BRO! Eizeh shayla INSANE! Ma ani omer... AHHHHH!",
-                                "YOOO achi! Ze mamash... wait... ma?! LO MA'AMIN this question!",
-                                "BRO listen listen... ani meshuga but... WOOOO ze interesting!"
-                            ]
-                        elif any(word in user_words for word in ['thank', 'thanks', 'toda', 'תודה']):
-                            responses = [
-                                "Bevakasha achi! Ani same'ach la'azor, yalla!",
-                                "Ein davar chaveri! Ze lo nora, sababa meod!",
-                                "Toda raba! Ze mah she'chaverim osim!"
-                            ]
-                        elif any(word in user_words for word in ['good', 'great', 'awesome', 'טוב', 'מעולה']):
-                            responses = [
-                                "Sababa meod! Ze nishma achla gedola achi!",
-                                "Yofi gadol! Ze mamash beseder chaveri!",
-                                "Kol hakavod! Ani ohev lishmo'a dvarim tovim!"
-                            ]
-                        else:
-                            # Default Barkoni responses (hyperactive style)
-                            responses = [
-                                "BRO BRO BRO! Ma kore achi?! Wait... AHHHHH! Tell me more!",
-                                "YOOO! Ma garam lecha lachshov al zeh?! This is INSANE dude!",
-                                "WOOOO! Ze nishma CRAZY! Ani meshuga but... LISTEN LISTEN!",
-                                "LO MA'AMIN BRO! Ze mamash... wait what?! BOOM! Mind blown!",
-                                "Ma pitom DUDE! Ani never chashavti al zeh! AHHHHH!"
-                            ]
+                monitor.stop()
+        finally:
+            if self.noise_tracker:
+                self.noise_tracker.resume()
+        return self.barge_in_audio
 
-                    except Exception as e:
-                        print(f"Error loading Hebrew responses: {e}")
-                        # Fallback to Hebrew
-                        responses = ["שלום! איך אתה?", "סבבה! מה נשמע?", "יופי! בוא נדבר!"]
-                else:
-                    # Regular character responses
-                    if any(word in user_words for word in ['hello', 'hi', 'hey']):
-                        responses = [
-                            f"Hey there! Great to hear from you!",
-                            f"Hello! How's your day going?",
-                            f"Hi! What's on your mind today?"
-                        ]
-                    elif any(word in user_words for word in ['how', 'what', 'why', 'when', 'where']):
-                        responses = [
-                            f"That's a really good question! Let me think about that...",
-                            f"Interesting that you ask about that!",
-                            f"I love questions like this! Here's what I think..."
-                        ]
-                    elif any(word in user_words for word in ['thank', 'thanks']):
-                        responses = [
-                            "You're very welcome!",
-                            "Happy to help!",
-                            "No problem at all!"
-                        ]
-                    else:
-                        responses = [
-                            f"That's really interesting! Tell me more about {user_input.split()[-1] if user_input.split() else 'that'}.",
-                            "I see what you mean! What made you think of that?",
-                            "That sounds fascinating! I'd love to hear more.",
-                            "Wow, that's a unique perspective!",
-                            "That's something I hadn't considered before!"
-                        ]
+    def stop_speaking(self):
+        """Cancel the current utterance and anything queued behind it"""
+        self.speech_worker.cancel_all()
 
-                import random
-                return random.choice(responses)
-                
-        except Exception as e:
-            print(f"ERROR: Error generating response: {e}")
-            return "Sorry, I had a little hiccup there. Could you try again?"
-    
-    def speak(self, text):
-        """Convert text to speech using best available voice"""
+    def _run_speech(self, handle):
+        """Speak one queued utterance (runs on the speech thread only)"""
         try:
-            self.is_speaking = True
+            if handle.chunks is not None:
+                return self._speak_chunks_now(handle.chunks, handle.cancel_event, on_chunk=handle.spoken.append)
+
+            text = handle.text
             print(f"SPEAKING {self.character_name}: {text}")
             
-            # Try character voice first if available
-            if self.character_voice_loaded and self.character_tts and self.reference_audio_path:
-                return self._speak_with_character_voice(text)
+            # Try character voice first if available (long replies are pipelined sentence by sentence)
+            if self._character_voice_active():
+                return self._speak_chunks_with_character_voice(split_sentences(text), handle.cancel_event,
+                                                               on_chunk=handle.spoken.append)
             
-            # Fallback to system voice
+            # Fallback to system voice (it renders while it plays)
+            self.tracer.mark("tts_first_chunk")
+            self.tracer.mark("playback_start")
+            handle.spoken.append(text)
             return self._speak_with_system_voice(text)
             
         except Exception as e:
             print(f"ERROR: Error in text-to-speech: {e}")
-            print(f"TEXT: {self.character_name}: {text}")  # Text fallback
+            print(f"TEXT: {self.character_name}: {handle.text}")  # Text fallback
         finally:
-            self.is_speaking = False
-    
-    def _speak_with_character_voice(self, text):
-        """Speak using character voice cloning"""
+            self.tracer.mark("playback_end")
+
+    def _speak_chunks_now(self, chunks, cancel_event, on_chunk=None):
+        """Speak chunks back to back with the active voice; on_chunk(text) hears each one as it starts"""
+        if self._character_voice_active():
+            return self._speak_chunks_with_character_voice(chunks, cancel_event, on_chunk=on_chunk)
+
+        # System voice has no separate render step; the pipeline just keeps the source drained ahead
+        pipeline = SpeechPipeline(
+            synthesize=lambda text: text,
+            play=self._speak_with_system_voice,
+            max_ahead=16,
+            on_event=self.tracer.mark,
+            on_chunk=on_chunk
+        )
+        return pipeline.run(chunks, cancel_event=cancel_event)["chunks"] > 0
+
+    def _interrupt_speech(self):
+        """Stop whatever is playing right now (called from the cancelling thread)"""
         try:
-            print("Using character voice...")
-            
-            # Generate speech with character voice
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                temp_audio_path = tmp_file.name
-            
-            self.character_tts.tts_to_file(
-                text=text,
-                speaker_wav=self.reference_audio_path,
-                language="en",
-                file_path=temp_audio_path,
-                emotion="neutral",
-                speed=1.0
-            )
-            
-            # Play the audio
-            pygame.mixer.music.load(temp_audio_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            # Clean up
-            os.unlink(temp_audio_path)
-            return True
-            
+            if pygame.mixer.get_init():
+                pygame.mixer.stop()
+            if self.system_tts:
+                self.system_tts.stop()
         except Exception as e:
-            print(f"ERROR: Character voice error: {e}")
-            print("Falling back to system voice...")
-            return self._speak_with_system_voice(text)
+            print(f"ERROR: Could not interrupt speech: {e}")
+    
+    def _synthesize_character_voice(self, text):
+        """Render text with the character voice; returns (float waveform, sample_rate)"""
+        # Speaker latents are cached per reference audio
+        with self._synthesis_lock:
+            return synthesize_with_latents(
+                self.character_tts,
+                self.speaker_latents,
+                text,
+                self.reference_audio_path,
+                language=self.character_voice_language,
+                speed=self.character_voice_speed
+            )
+
+    def _phrase_cache_key(self, text):
+        """Phrase cache address for text rendered with the current character voice"""
+        return PhraseCache.make_key(
+            text,
+            backend="xtts_v2",
+            reference_hash=file_sha256(self.reference_audio_path),
+            speed=self.character_voice_speed,
+            language=self.character_voice_language
+        )
+
+    def _render_character_voice(self, text):
+        """Return character voice audio for text, from the phrase cache when already rendered"""
+        if not self.phrase_cache:
+            return self._synthesize_character_voice(text)
+
+        key = self._phrase_cache_key(text)
+        cached = self.phrase_cache.get(key)
+        if cached:
+            return cached
+
+        wav, sample_rate = self._synthesize_character_voice(text)
+        self.phrase_cache.put(key, to_int16_pcm(wav, sample_rate).tobytes(), sample_rate)
+        return wav, sample_rate
+
+    def _speak_chunks_with_character_voice(self, chunks, cancel_event=None, on_chunk=None):
+        """Speak chunks with character voice, synthesizing chunk N+1 while chunk N plays"""
+        print("Using character voice...")
+        pipeline = SpeechPipeline(
+            synthesize=self._render_character_voice,
+            # Play straight from memory - no temp file round-trip
+            play=lambda audio: play_buffer(*audio),
+            max_ahead=self.speech_lookahead,
+            on_error=self._character_voice_fallback,
+            on_event=self.tracer.mark,
+            on_chunk=on_chunk
+        )
+        pipeline.run(chunks, cancel_event=cancel_event)
+        return True
+
+    def _character_voice_fallback(self, text, error):
+        """Speak a chunk the character voice failed on with the system voice"""
+        print(f"ERROR: Character voice error: {error}")
+        print("Falling back to system voice...")
+        return self._speak_with_system_voice(text)
     
     def _speak_with_system_voice(self, text):
         """Speak using enhanced system TTS with Hebrew accent"""
@@ -646,69 +1244,8 @@ class CharacterVoiceChatbot:
     def _enhance_text_for_hebrew_accent(self, text):
         """Enhance text pronunciation for Hebrew accent simulation"""
         try:
-            # Hebrew accent simulation - modify certain sounds
-            enhanced = text
-
-            # Israeli accent patterns for more authentic sound
-            replacements = {
-                # Th sounds (Hebrew speakers often use 'z' or 's')
-                'th': 'z',  # "the" -> "ze"
-                'Th': 'Z',  # "The" -> "Ze"
-                ' th': ' z',  # " this" -> " zis"
-
-                # W sounds (Hebrew doesn't have W, uses V)
-                'w': 'v',    # "what" -> "vhat"
-                'W': 'V',    # "What" -> "Vhat"
-
-                # R sounds (Israeli Rs are different)
-                'er ': 'err ',   # "never" -> "neverr"
-                'or ': 'orr ',   # "for" -> "forr"
-
-                # Common Israeli accent substitutions
-                'awesome': 'avesome',
-                'what': 'vhat',
-                'when': 'vhen',
-                'where': 'vhere',
-                'with': 'vith',
-                'why': 'vhy',
-                'wonderful': 'vonderful',
-                'well': 'vell',
-                'will': 'vill',
-                'work': 'vork',
-                'think': 'zink',
-                'thank': 'zank',
-                'that': 'zat',
-                'this': 'zis',
-                'they': 'zey',
-                'them': 'zem',
-            }
-
-            # Apply replacements
-            for original, replacement in replacements.items():
-                enhanced = enhanced.replace(original, replacement)
-
-            # Add some Hebrew expressions if not already present
-            hebrew_expressions = {
-                'hello': 'Shalom',
-                'hi': 'Shalom',
-                'great': 'achla',
-                'good': 'tov',
-                'yes': 'ken',
-                'no': 'lo',
-                'thanks': 'toda',
-                'okay': 'sababa',
-            }
-
-            # Replace some common words with Hebrew equivalents (transliterated)
-            words = enhanced.split()
-            for i, word in enumerate(words):
-                clean_word = word.lower().strip('.,!?')
-                if clean_word in hebrew_expressions:
-                    words[i] = word.replace(clean_word, hebrew_expressions[clean_word])
-
-            enhanced = ' '.join(words)
-
-            return enhanced
+            # Accent rewrites + Hebrew expressions, compiled once and applied in one pass
+            return enhance_for_hebrew_accent(text)
 
         except Exception as e:
             print(f"Text enhancement error: {e}")
@@ -724,77 +1261,73 @@ class CharacterVoiceChatbot:
         
         # Dynamic greeting based on voice status
         if self.character_voice_loaded:
-            greeting = f"Hello! I'm {self.character_name}, and I'm speaking with my own unique voice! What would you like to chat about?"
+            greeting = GREETING_CHARACTER_VOICE.format(name=self.character_name)
         else:
-            greeting = f"Hi there! I'm {self.character_name}. I'm using a system voice for now, but I'm excited to chat with you! What's on your mind?"
-        
-        self.speak(greeting)
-        
-        conversation_active = True
-        silence_count = 0
-        
-        while conversation_active:
-            try:
-                # Listen for user input
-                if not self.is_speaking:
-                    user_input = self.listen_for_speech(timeout=10)
-                    
-                    if user_input:
-                        silence_count = 0  # Reset silence counter
-                        
-                        # Check for special commands
-                        user_lower = user_input.lower()
-                        
-                        if any(word in user_lower for word in ['goodbye', 'exit', 'quit', 'bye']):
-                            farewell = "It was really great chatting with you! Thanks for spending time with me. Goodbye!"
-                            self.speak(farewell)
-                            break
-                        
-                        elif 'switch voice' in user_lower:
-                            if self.character_voice_loaded:
-                                self.character_voice_loaded = not self.character_voice_loaded
-                                status = "character voice" if self.character_voice_loaded else "system voice"
-                                self.speak(f"Okay, I've switched to {status}!")
-                            else:
-                                self.speak("I don't have a character voice loaded, so I'll keep using the system voice.")
-                            continue
-                        
-                        # Generate and speak response
-                        response = self.generate_response(user_input)
-                        
-                        # Save to conversation history
-                        self.conversation_history.append({
-                            "timestamp": datetime.now().isoformat(),
-                            "user": user_input,
-                            "bot": response
-                        })
-                        
-                        # Speak the response
-                        self.speak(response)
-                    
-                    else:
-                        silence_count += 1
-                        if silence_count <= 3:  # Be patient for first few silence periods
-                            prompts = [
-                                "I'm here whenever you're ready to chat!",
-                                "Take your time! What would you like to talk about?",
-                                "I'm listening... feel free to say something!",
-                            ]
-                            import random
-                            self.speak(random.choice(prompts))
-                        elif silence_count == 4:
-                            self.speak("I'll wait quietly for you. Just say something when you're ready!")
-                        # After that, just wait silently
-                
-                time.sleep(0.1)  # Prevent high CPU usage
-                
-            except KeyboardInterrupt:
-                print("\n👋 Conversation ended by user")
-                break
-            except Exception as e:
-                print(f"❌ Error in conversation loop: {e}")
-                time.sleep(1)
-    
+            greeting = GREETING_SYSTEM_VOICE.format(name=self.character_name)
+
+        try:
+            asyncio.run(self.create_conversation_engine().run(greeting))
+        except KeyboardInterrupt:
+            print("\n👋 Conversation ended by user")
+            self.stop_speaking()
+
+        # Where did the time go: recognition, the provider or synthesis
+        self.tracer.print_report()
+
+    def create_conversation_engine(self, **kwargs):
+        """Event-driven conversation over this chatbot's microphone, recognizer, AI and voice"""
+        # The barge-in monitor blocks while it watches the mic; everything else is awaited via callbacks
+        monitor_barge_in = self.barge_in_enabled and self.recognizer and not self.capture
+        self._pending_speech_ends.clear()  # Utterances left queued by an earlier conversation
+        options = dict(
+            capture=self.capture_utterance,
+            recognize=self.recognize_audio,
+            respond=self._reply_chunks,
+            speak=self.speak_chunks,
+            wait_speech=self.await_speech if monitor_barge_in else None,
+            on_command=self._conversation_command,
+            on_silence=self._silence_prompt,
+            on_turn=self._record_turn,
+            on_turn_start=self._open_turn_trace,
+            listen_timeout=10,
+            full_duplex=self.capture is not None,
+            barge_in=self.barge_in_enabled
+        )
+        options.update(kwargs)
+        return conversation_engine.ConversationEngine(**options)
+
+    def _reply_chunks(self, user_input):
+        """Reply text chunks for the conversation engine (streamed sentence by sentence when enabled)"""
+        if self.stream_responses:
+            # First sentence is spoken while the rest is still generating
+            return chunk_text_stream(self.stream_response(user_input))
+        return [self.generate_response(user_input)]
+
+    def _conversation_command(self, user_input):
+        """(reply, end_conversation) for special voice commands, None for normal input"""
+        user_lower = user_input.lower()
+
+        if any(word in user_lower for word in ['goodbye', 'exit', 'quit', 'bye']):
+            return FAREWELL_MESSAGE, True
+
+        if 'switch voice' in user_lower:
+            if self.character_voice_loaded:
+                self.character_voice_loaded = not self.character_voice_loaded
+                status = "character voice" if self.character_voice_loaded else "system voice"
+                return SWITCHED_VOICE_MESSAGE.format(status=status), False
+            return NO_CHARACTER_VOICE_MESSAGE, False
+
+        return None
+
+    def _silence_prompt(self, silence_count):
+        """What to say after the user stayed silent silence_count times in a row"""
+        if silence_count <= 3:  # Be patient for first few silence periods
+            import random
+            return random.choice(SILENCE_PROMPTS)
+        if silence_count == 4:
+            return SILENCE_FINAL_PROMPT
+        return None  # After that, just wait silently
+
     def save_conversation(self, filename=None):
         """Save conversation history to file"""
         if not filename:
@@ -803,16 +1336,18 @@ class CharacterVoiceChatbot:
         
         try:
             with open(filename, 'w') as f:
-                json.dump(self.conversation_history, f, indent=2)
+                json.dump(self.conversation_history.all_turns(), f, indent=2)
             print(f"💾 Conversation saved to: {filename}")
         except Exception as e:
             print(f"❌ Error saving conversation: {e}")
 
 # [GUI class remains the same but with minor updates]
 class CharacterChatbotGUI:
-    def __init__(self):
-        """GUI version of the chatbot"""
+    def __init__(self, latency_trace_path=None, latency_metrics_path=None):
+        """GUI version of the chatbot (optional latency trace / metrics files for the chatbot it creates)"""
         self.chatbot = None
+        self.latency_trace_path = latency_trace_path
+        self.latency_metrics_path = latency_metrics_path
         self.setup_gui()
     
     def setup_gui(self):
@@ -922,7 +1457,9 @@ class CharacterChatbotGUI:
                 character_name=self.character_name.get(),
                 claude_api_key=self.api_key.get() or None,
                 use_character_voice=self.use_character_voice.get(),
-                ai_provider="claude"
+                ai_provider="claude",
+                latency_trace_path=self.latency_trace_path,
+                latency_metrics_path=self.latency_metrics_path
             )
 
             # Auto-load Barkuni voice system
@@ -947,7 +1484,7 @@ class CharacterChatbotGUI:
                 self.chatbot.character_voice_loaded = not self.chatbot.character_voice_loaded
                 voice_type = "Barkuni authentic" if self.chatbot.character_voice_loaded else "system"
                 self.add_to_chat("System", f"Switched to {voice_type} voice")
-                self.chatbot.speak(f"Shalom! Now using {voice_type} voice!")
+                self.chatbot.speak(GUI_SWITCHED_VOICE_MESSAGE.format(voice_type=voice_type))
             else:
                 self.add_to_chat("System", "No Barkuni voice loaded - using system voice")
     
@@ -989,7 +1526,7 @@ class CharacterChatbotGUI:
     def _process_voice_input(self):
         """Process voice input in separate thread"""
         try:
-            user_text = self.chatbot.listen_for_speech(timeout=10, phrase_timeout=5)
+            user_text = self.chatbot.listen_for_speech(timeout=10)
             if user_text and user_text.strip():
                 self.root.after(0, lambda: self.add_to_chat("You", user_text))
                 self.root.after(0, lambda: self._process_message(user_text))
@@ -1004,6 +1541,8 @@ class CharacterChatbotGUI:
     def _process_message(self, user_text):
         """Process user message and generate response"""
         try:
+            if self.chatbot.tracer.current is None:
+                self.chatbot.tracer.begin_turn()  # Typed message - no speech or recognition stages
             response = self.chatbot.generate_response(user_text)
             self.root.after(0, lambda: self.add_to_chat(self.character_name.get(), response))
             
@@ -1014,20 +1553,21 @@ class CharacterChatbotGUI:
                 "bot": response
             })
             
-            # Speak response
+            # Speak response (queued on the chatbot's speech thread)
             if self.chatbot.voice_ready:
                 print(f"🔊 GUI: Starting voice output for: {response[:50]}...")
-                def speak_with_error_handling():
-                    try:
-                        self.chatbot.speak(response)
+                def on_speech_done(handle):
+                    if handle.error:
+                        print(f"❌ GUI: Voice output error: {handle.error}")
+                        self.root.after(0, lambda: self.add_to_chat("System", f"❌ Voice error: {handle.error}"))
+                    else:
                         print("🔊 GUI: Voice output completed successfully")
-                    except Exception as speak_error:
-                        print(f"❌ GUI: Voice output error: {speak_error}")
-                        self.root.after(0, lambda: self.add_to_chat("System", f"❌ Voice error: {speak_error}"))
+                    self.chatbot.tracer.end_turn()
 
-                threading.Thread(target=speak_with_error_handling, daemon=True).start()
+                self.chatbot.speak(response).add_done_callback(on_speech_done)
             else:
                 print(f"❌ GUI: Voice not ready! voice_ready={self.chatbot.voice_ready}")
+                self.chatbot.tracer.end_turn()
             
             self.root.after(0, lambda: self.status_var.set("✅ Ready"))
             
@@ -1047,6 +1587,17 @@ class CharacterChatbotGUI:
 
 def main():
     """Main function with options"""
+    parser = argparse.ArgumentParser(description="Character Voice Chatbot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print the import cost of each backend once the chosen mode is ready")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Answer repeated short openers (shalom, ma nishma...) from a cache - Barkoni only")
+    parser.add_argument("--latency-trace", metavar="PATH", default=None,
+                        help="Append every turn's stage timestamps to this JSONL file")
+    parser.add_argument("--latency-metrics", metavar="PATH", default=None,
+                        help="Rewrite a Prometheus text snapshot of turn latency here after every turn")
+    args = parser.parse_args()
+
     print("Character Voice Chatbot System")
     print("=" * 40)
     
@@ -1067,7 +1618,9 @@ def main():
 
     if choice == "1":
         # GUI version
-        app = CharacterChatbotGUI()
+        app = CharacterChatbotGUI(latency_trace_path=args.latency_trace, latency_metrics_path=args.latency_metrics)
+        if args.profile_startup:
+            print_startup_profile("GUI startup")
         app.run()
     
     else:
@@ -1108,11 +1661,18 @@ def main():
             openai_api_key=openai_api_key,
             claude_api_key=claude_api_key,
             use_character_voice=(use_char_voice == "y"),
-            ai_provider=ai_provider
+            ai_provider=ai_provider,
+            enable_speech_input=False,  # The command line chat is typed
+            response_cache=ResponseCache(characters=("Barkuni", "Barkoni")) if args.response_cache else None,
+            latency_trace_path=args.latency_trace,
+            latency_metrics_path=args.latency_metrics
         )
 
         if audio_path and use_char_voice == "y":
-            chatbot.set_reference_audio(audio_path)
+            chatbot.load_character_voice(audio_path)
+
+        if args.profile_startup:
+            print_startup_profile("Command line startup")
 
         print(f"\n{character_name} is ready! Type 'quit' to exit.")
         print("=" * 40)
@@ -1126,13 +1686,19 @@ def main():
                     break
 
                 if user_input:
+                    trace = chatbot.tracer.begin_turn()  # Typed message - no speech or recognition stages
                     response = chatbot.generate_response(user_input)
                     print(f"{character_name}: {response}")
 
-                    # Speak the response if voice is ready
+                    def end_trace(_=None, trace=trace):
+                        if chatbot.tracer.current is trace:
+                            chatbot.tracer.end_turn()
+
+                    # Speak the response if voice is ready (queued, so typing is never blocked)
                     if chatbot.voice_ready:
-                        import threading
-                        threading.Thread(target=chatbot.speak, args=(response,), daemon=True).start()
+                        chatbot.speak(response).add_done_callback(end_trace)
+                    else:
+                        end_trace()
 
             except KeyboardInterrupt:
                 print(f"\n\n{character_name}: Goodbye!")
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Barkoni Voice Server
+Hosts many concurrent conversations over WebSockets in one process. Each
+session streams text or 16-bit mono PCM in and gets reply text plus
+synthesized audio out; sessions keep their own history while the TTS model,
+speaker-latent cache, phrase cache and AI provider clients are loaded once
+and shared. Admission control caps concurrent sessions and every session
+has a memory cap on buffered audio and history.
+
+Protocol (JSON text frames unless noted):
+  client -> server  {"type": "text", "text": "..."}            typed turn
+                    {"type": "audio_start", "sample_rate": 16000}
+                    <binary PCM frames>                          user speech
+                    {"type": "audio_end"}                        recognize and answer
+                    {"type": "cancel"}                           stop the current reply
+  server -> client  {"type": "ready", "session": id}
+                    {"type": "transcript", "text": "..."}
+                    {"type": "reply_chunk", "text": "..."}
+                    {"type": "audio", "sample_rate": 24000, "bytes": n} then one binary PCM frame
+                    {"type": "reply_end", "text": "..."}
+                    {"type": "error", "message": "..."}
+
+Usage: python server.py --port 8765 --max-sessions 8 --reference-audio voice.wav
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from main import CharacterChat, CHARACTER_VOICE_AVAILABLE, sr
+from utils.audio_buffer import to_int16_pcm
+from utils.http_pool import get_http_pool
+from utils.latency_trace import LatencyTracer
+from utils.phrase_cache import PhraseCache
+from utils.recognition import ConcurrentRecognizer, GoogleBackend
+from utils.response_cache import ResponseCache
+from utils.sentence_stream import chunk_text_stream
+from utils.xtts_runtime import get_xtts_model, file_sha256, SpeakerLatentCache, synthesize_with_latents
+
+# WebSocket close code for "try again later" (RFC 6455 registry)
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class SharedModels:
+    """Everything heavy, loaded once per server process and used by every session"""
+
+    def __init__(self, character_name="Barkuni", ai_provider="claude", claude_api_key=None, openai_api_key=None,
+                 reference_audio_path=None, language="en", speed=1.0, phrase_cache_mb=200, max_workers=16,
+                 response_cache=None, max_sessions=8, recognition_timeout=6.0, latency_trace_path=None,
+                 latency_metrics_path=None):
+        self.character_name = character_name
+        self.ai_provider = ai_provider
+        self.reference_audio_path = reference_audio_path
+        self.language = language
+        self.speed = speed
+        # Blocking work (provider streams, synthesis, recognition) for all sessions runs here
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice-server")
+
+        # Provider clients are created once; each session's CharacterChat borrows them
+        self.prototype = CharacterChat(character_name, ai_provider)
+        self.prototype.setup_ai_chat(openai_api_key, claude_api_key)
+        self.response_cache = response_cache  # Openers answered once are reused by every session
+        # Every session's turns roll up here; its snapshot also carries the shared cache counters
+        self.tracer = LatencyTracer(trace_path=latency_trace_path, metrics_path=latency_metrics_path)
+        if response_cache is not None:
+            self.tracer.collectors.append(response_cache.prometheus_text)
+
+        self.character_tts = None
+        self.speaker_latents = None
+        self.phrase_cache = None
+        self.synthesis_lock = threading.Lock()  # One inference on the shared model at a time
+        self._recognizer = None
+        self._recognizer_lock = threading.Lock()
+        self.max_sessions = max_sessions  # Every session may be recognizing at once
+        self.recognition_timeout = recognition_timeout
+
+        if reference_audio_path and CHARACTER_VOICE_AVAILABLE:
+            print("Loading character voice synthesis model...")
+            self.character_tts = get_xtts_model()
+            self.speaker_latents = SpeakerLatentCache()
+            self.speaker_latents.get_latents(self.character_tts.synthesizer.tts_model, reference_audio_path)
+            if phrase_cache_mb:
+                self.phrase_cache = PhraseCache(max_bytes=phrase_cache_mb * 1024 * 1024)
+            print("SUCCESS: Character voice synthesis ready")
+        elif reference_audio_path:
+            print("WARNING: Character voice cloning not available - sessions get text replies only")
+
+    @property
+    def voice_available(self):
+        return self.character_tts is not None
+
+    def new_chat(self):
+        """A fresh conversation (own history) on the shared provider clients"""
+        chat = CharacterChat(self.character_name, self.ai_provider, tracer=LatencyTracer(parent=self.tracer))
+        chat.claude_client = self.prototype.claude_client
+        chat.openai_client = self.prototype.openai_client
+        chat.http_pool = self.prototype.http_pool
+        chat.dispatcher = self.prototype.dispatcher  # Latency history and breakers are shared by all sessions
+        chat.use_response_cache(self.response_cache)
+        return chat
+
+    def synthesize(self, text):
+        """(int16 PCM bytes, sample_rate) for text in the character voice, from the phrase cache when possible"""
+        if not self.voice_available:
+            return None
+
+        key = None
+        if self.phrase_cache:
+            key = PhraseCache.make_key(text, backend="xtts_v2", reference_hash=file_sha256(self.reference_audio_path),
+                                       speed=self.speed, language=self.language)
+            cached = self.phrase_cache.get(key)
+            if cached:
+                return cached
+
+        with self.synthesis_lock:
+            wav, sample_rate = synthesize_with_latents(self.character_tts, self.speaker_latents, text,
+                                                       self.reference_audio_path, language=self.language,
+                                                       speed=self.speed)
+        pcm = to_int16_pcm(wav, sample_rate).tobytes()
+        if key:
+            self.phrase_cache.put(key, pcm, sample_rate)
+        return pcm, sample_rate
+
+    def recognize(self, pcm, sample_rate):
+        """Best transcript of a user's PCM utterance (Hebrew and English in parallel), or None"""
+        with self._recognizer_lock:
+            if self._recognizer is None:
+                recognizer = sr.Recognizer()
+                recognizer.operation_timeout = self.recognition_timeout  # A hung request gives its worker back
+                languages = ("he-IL", "en-US")
+                self._recognizer = ConcurrentRecognizer(GoogleBackend(recognizer), languages=languages,
+                                                        timeout=self.recognition_timeout,
+                                                        max_workers=len(languages) * self.max_sessions)
+        result = self._recognizer.recognize(sr.AudioData(bytes(pcm), sample_rate, 2))
+        return result["text"] if result else None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class VoiceSession:
+    """One client connection: its own history, audio buffer and current reply"""
+
+    def __init__(self, session_id, websocket, models, max_memory_bytes):
+        self.session_id = session_id
+        self.websocket = websocket
+        self.models = models
+        self.max_memory_bytes = max_memory_bytes
+        self.chat = models.new_chat()
+        self.audio = bytearray()
+        self.sample_rate = 16000
+        self.audio_rejected = False  # Current utterance refused - drop its frames until the next audio_start
+        self.reply_task = None
+
+    def memory_bytes(self):
+        """Bytes this session holds: buffered user audio plus conversation history text"""
+        return len(self.audio) + self.chat.conversation_history.memory_bytes()
+
+    def _trim_history(self):
+        # The history store is already bounded; long turns can still push it over the cap.
+        # Evicted turns still reach the rolling summary, like the ones the store evicts itself
+        history = self.chat.conversation_history
+        while len(history) and self.memory_bytes() > self.max_memory_bytes:
+            history.evict_oldest()
+
+    async def send_json(self, message):
+        await self.websocket.send(json.dumps(message, ensure_ascii=False))
+
+    async def run(self):
+        """Serve messages until the client disconnects"""
+        await self.send_json({"type": "ready", "session": self.session_id, "voice": self.models.voice_available})
+        try:
+            async for message in self.websocket:
+                if isinstance(message, bytes):
+                    await self._on_audio(message)
+                    continue
+                try:
+                    request = json.loads(message)
+                except ValueError:
+                    await self.send_json({"type": "error", "message": "expected JSON text frames"})
+                    continue
+                await self._on_request(request)
+        finally:
+            await self.cancel_reply()
+
+    async def _on_request(self, request):
+        kind = request.get("type")
+        if kind == "text":
+            self._start_turn(request.get("text", ""))
+        elif kind == "audio_start":
+            self.audio.clear()
+            self.audio_rejected = False
+            try:
+                sample_rate = int(request.get("sample_rate", 16000))
+            except (TypeError, ValueError):
+                sample_rate = 0
+            if sample_rate <= 0:
+                self.audio_rejected = True
+                await self.send_json({"type": "error", "message": f"invalid sample_rate: {request.get('sample_rate')!r}"})
+                return
+            self.sample_rate = sample_rate
+            self.chat.warm_connections()  # The user is talking - reconnect to the provider now if idle
+        elif kind == "audio_end":
+            pcm, self.audio = bytes(self.audio), bytearray()
+            if self.audio_rejected:
+                self.audio_rejected = False  # Already answered with an error - don't recognize a truncated tail
+                return
+            if pcm:
+                self._start_turn(None, pcm)
+        elif kind == "cancel":
+            await self.cancel_reply()
+        else:
+            await self.send_json({"type": "error", "message": f"unknown message type: {kind}"})
+
+    async def _on_audio(self, frame):
+        if self.audio_rejected:
+            return
+        if self.memory_bytes() + len(frame) > self.max_memory_bytes:
+            self.audio.clear()
+            self.audio_rejected = True
+            await self.send_json({"type": "error", "message": "utterance exceeds the session memory cap"})
+            return
+        self.audio.extend(frame)
+
+    def _start_turn(self, text, pcm=None):
+        # A new turn interrupts the reply in progress (barge-in)
+        if self.reply_task and not self.reply_task.done():
+            self.reply_task.cancel()
+        self.reply_task = asyncio.create_task(self._turn(text, pcm))
+
+    async def cancel_reply(self):
+        task, self.reply_task = self.reply_task, None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _turn(self, text, pcm=None):
+        loop = asyncio.get_running_loop()
+        executor = self.models.executor
+        tracer = self.chat.tracer
+        try:
+            if pcm is not None:
+                tracer.begin_turn(speech_end=time.time())  # audio_end: the client's end of speech
+                text = await loop.run_in_executor(executor, self.models.recognize, pcm, self.sample_rate)
+                tracer.mark("stt_result")
+                await self.send_json({"type": "transcript", "text": text or ""})
+            else:
+                tracer.begin_turn()
+                tracer.mark("stt_result")  # Typed turn: the text is its own transcript
+            if text and text.strip():
+                await self._reply(text.strip())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"ERROR: Session {self.session_id} turn failed: {e}")
+            await self.send_json({"type": "error", "message": str(e)})
+
+    async def _reply(self, text):
+        """Stream reply sentences to the client, each followed by its audio"""
+        loop = asyncio.get_running_loop()
+        sentences = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def post(item):
+            try:
+                loop.call_soon_threadsafe(sentences.put_nowait, item)
+            except RuntimeError:
+                pass  # The server loop is already closed
+
+        def produce():
+            try:
+                for chunk in chunk_text_stream(self.chat.stream_response(text)):
+                    if cancelled.is_set():
+                        break
+                    post(chunk)
+            finally:
+                post(None)
+
+        producer = loop.run_in_executor(self.models.executor, produce)
+        spoken = []
+        try:
+            while True:
+                chunk = await sentences.get()
+                if chunk is None:
+                    break
+                spoken.append(chunk)
+                await self.send_json({"type": "reply_chunk", "text": chunk})
+
+                audio = await loop.run_in_executor(self.models.executor, self.models.synthesize, chunk)
+                if audio:
+                    pcm, sample_rate = audio
+                    self.chat.tracer.mark("tts_first_chunk")
+                    self.chat.tracer.mark("playback_start")  # Sent: the client starts playing on arrival
+                    await self.send_json({"type": "audio", "sample_rate": sample_rate, "bytes": len(pcm)})
+                    await self.websocket.send(pcm)
+            await producer
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+        reply = " ".join(spoken)
+        self.chat._record_turn(text, reply)
+        self._trim_history()
+        await self.send_json({"type": "reply_end", "text": reply})
+
+
+class VoiceServer:
+    """Accepts WebSocket sessions up to max_sessions and runs each as a VoiceSession"""
+
+    def __init__(self, models, max_sessions=8, session_memory_mb=4, stats_interval=60):
+        """stats_interval: seconds between stats log lines (and metrics snapshots between turns); 0 = off"""
+        self.models = models
+        self.max_sessions = max_sessions
+        self.session_memory_bytes = int(session_memory_mb * 1024 * 1024)
+        self.stats_interval = stats_interval
+        self.sessions = {}
+        self.rejected = 0
+        self._ids = itertools.count(1)
+        models.tracer.collectors.append(self.prometheus_text)
+
+    def stats(self):
+        dispatcher = self.models.prototype.dispatcher
+        return {
+            "active_sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "rejected": self.rejected,
+            "memory_bytes": sum(session.memory_bytes() for session in self.sessions.values()),
+            "providers": dispatcher.stats() if dispatcher else None,
+            "response_cache": self.models.response_cache.stats() if self.models.response_cache else None,
+            "latency": self.models.tracer.percentiles(),
+        }
+
+    def prometheus_text(self, prefix="barkoni"):
+        """Session gauges and the rejection counter in the Prometheus text format"""
+        stats = self.stats()
+        return "\n".join([
+            f"# HELP {prefix}_sessions_active Connected voice sessions",
+            f"# TYPE {prefix}_sessions_active gauge",
+            f"{prefix}_sessions_active {stats['active_sessions']}",
+            f"# HELP {prefix}_sessions_rejected_total Connections refused by admission control",
+            f"# TYPE {prefix}_sessions_rejected_total counter",
+            f"{prefix}_sessions_rejected_total {stats['rejected']}",
+            f"# HELP {prefix}_session_memory_bytes Buffered audio and history held by all sessions",
+            f"# TYPE {prefix}_session_memory_bytes gauge",
+            f"{prefix}_session_memory_bytes {stats['memory_bytes']}",
+        ]) + "\n"
+
+    def log_stats(self):
+        """One INFO line with sessions, cache hit rate and turn latency"""
+        stats = self.stats()
+        parts = [f"sessions {stats['active_sessions']}/{stats['max_sessions']}", f"rejected {stats['rejected']}"]
+        cache = stats["response_cache"]
+        if cache:
+            parts.append(f"response cache {cache['hit_rate']:.0%} of {cache['hits'] + cache['misses']} lookups")
+        for stage in ("response", "llm_first_token"):  # Spoken turns have a response stage, typed ones start at the LLM
+            row = stats["latency"].get(stage)
+            if row:
+                parts.append(f"{stage} p50 {row['p50'] * 1000:.0f} ms, p95 {row['p95'] * 1000:.0f} ms ({row['count']} turns)")
+        print(f"INFO: Voice server: {', '.join(parts)}")
+
+    async def _report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.log_stats()
+            if self.models.tracer.metrics_path:
+                # Session gauges change between turns too
+                await asyncio.get_running_loop().run_in_executor(
+                    self.models.executor, self.models.tracer.write_prometheus, self.models.tracer.metrics_path)
+
+    async def handle(self, websocket, path=None):
+        """Connection handler (path is only passed by older websockets releases)"""
+        if len(self.sessions) >= self.max_sessions:
+            # Admission control: refuse instead of degrading every running conversation
+            self.rejected += 1
+            await websocket.close(CLOSE_TRY_AGAIN_LATER, "server busy")
+            return
+
+        session = VoiceSession(next(self._ids), websocket, self.models, self.session_memory_bytes)
+        self.sessions[session.session_id] = session
+        print(f"Session {session.session_id} connected ({len(self.sessions)}/{self.max_sessions})")
+        try:
+            await session.run()
+        except Exception as e:
+            print(f"Session {session.session_id} closed: {e}")
+        finally:
+            del self.sessions[session.session_id]
+            print(f"Session {session.session_id} disconnected ({len(self.sessions)}/{self.max_sessions})")
+
+    async def serve(self, host="0.0.0.0", port=8765, ready=None):
+        """Run until cancelled; ready(server) is called once listening"""
+        try:
+            import websockets
+        except ImportError:
+            raise RuntimeError("The voice server needs the websockets package: pip install websockets")
+
+        # A single frame may not exceed the session cap (whole utterances stay under it too)
+        async with websockets.serve(self.handle, host, port, max_size=self.session_memory_bytes) as server:
+            print(f"SUCCESS: Voice server listening on ws://{host}:{port} (max {self.max_sessions} sessions)")
+            if ready:
+                ready(server)
+            reporter = asyncio.create_task(self._report_stats()) if self.stats_interval else None
+            try:
+                await asyncio.Future()
+            finally:
+                if reporter:
+                    reporter.cancel()
+
+
+def main():
+    """Start the multi-session voice server"""
+    parser = argparse.ArgumentParser(description="Barkoni multi-session WebSocket voice server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--character", default="Barkuni", help="Character name")
+    parser.add_argument("--provider", choices=["claude", "openai"], default="claude")
+    parser.add_argument("--reference-audio", default=None, help="Reference WAV for the shared character voice")
+    parser.add_argument("--max-sessions", type=int, default=8, help="Concurrent sessions admitted")
+    parser.add_argument("--session-memory-mb", type=float, default=4, help="Audio + history cap per session")
+    parser.add_argument("--workers", type=int, default=16, help="Threads for provider, TTS and STT calls")
+    parser.add_argument("--http-connections", type=int, default=20, help="Provider connections across all sessions")
+    parser.add_argument("--http-keepalive", type=int, default=10, help="Idle provider connections kept open")
+    parser.add_argument("--response-cache", action="store_true", help="Answer repeated short openers from a shared cache")
+    parser.add_argument("--response-cache-ttl", type=float, default=6 * 3600, help="Seconds a cached reply stays usable")
+    parser.add_argument("--response-variants", type=int, default=3, help="Cached replies rotated per opener")
+    parser.add_argument("--latency-trace", metavar="PATH", default=None,
+                        help="Append every session turn's stage timestamps to this JSONL file")
+    parser.add_argument("--latency-metrics", metavar="PATH", default=None,
+                        help="Rewrite a Prometheus text snapshot (turn latency, response cache, sessions) here")
+    parser.add_argument("--stats-interval", type=float, default=60,
+                        help="Seconds between stats log lines and metrics refreshes (0 = off)")
+    args = parser.parse_args()
+
+    # Created before the provider clients so they share a pool sized for this server
+    get_http_pool(max_connections=args.http_connections, max_keepalive=args.http_keepalive)
+
+    models = SharedModels(
+        character_name=args.character,
+        ai_provider=args.provider,
+        claude_api_key=os.environ.get("ANTHROPIC_API_KEY"),
+        openai_api_key=os.environ.get("OPENAI_API_KEY"),
+        reference_audio_path=args.reference_audio,
+        max_workers=args.workers,
+        max_sessions=args.max_sessions,
+        latency_trace_path=args.latency_trace,
+        latency_metrics_path=args.latency_metrics,
+        response_cache=ResponseCache(characters=(args.character,), ttl=args.response_cache_ttl,
+                                     variants=args.response_variants) if args.response_cache else None
+    )
+    server = VoiceServer(models, max_sessions=args.max_sessions, session_memory_mb=args.session_memory_mb,
+                         stats_interval=args.stats_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nVoice server stopped")
+    finally:
+        models.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -43,7 +43,7 @@ def test_barkuni_direct():
 
         # Test voice output
         print("Speaking response...")
-        barkuni.speak(response)
+        barkuni.speak(response, wait=True)
 
         print("-" * 20)
 
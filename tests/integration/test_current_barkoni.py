@@ -78,7 +78,7 @@ def test_current_barkoni_personality():
             # Test voice output
             if chatbot.voice_ready:
                 print(f"   🔊 Speaking response...")
-                chatbot.speak(response)
+                chatbot.speak(response, wait=True)
                 print(f"   ✅ Voice output complete")
             else:
                 print(f"   ❌ Voice not available")
@@ -106,7 +106,7 @@ def compare_voice_modes():
         if chatbot.voice_ready:
             print("   ✅ System TTS ready")
             print(f"   🔊 Playing: '{test_phrase}'")
-            chatbot.speak(test_phrase)
+            chatbot.speak(test_phrase, wait=True)
         else:
             print("   ❌ System TTS not available")
     except Exception as e:
@@ -123,7 +123,7 @@ def compare_voice_modes():
         if chatbot.voice_ready and chatbot.use_character_voice:
             print("   ✅ Character voice ready")
             print(f"   🔊 Playing: '{test_phrase}'")
-            chatbot.speak(test_phrase)
+            chatbot.speak(test_phrase, wait=True)
         else:
             print("   ❌ Character voice not available (needs Python 3.11 + TTS)")
     except Exception as e:
@@ -43,7 +43,7 @@ def test_hebrew_barkoni():
 
         # Test if we can speak Hebrew
         print("Speaking Hebrew response...")
-        barkoni.speak(response)
+        barkoni.speak(response, wait=True)
 
         print("-" * 20)
 
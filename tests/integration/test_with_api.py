@@ -39,7 +39,7 @@ def test_barkuni_with_api():
             # Test voice output
             if chatbot.voice_ready:
                 print(f"   🔊 Speaking: {response[:50]}...")
-                chatbot.speak(response)
+                chatbot.speak(response, wait=True)
 
         except Exception as e:
             print(f"   ❌ Error: {e}")
@@ -143,7 +143,7 @@ class BarkuniHebrewCharacterTester:
 
         try:
             # Attempt to speak the text (this would be audible in real environment)
-            self.chatbot.speak(text)
+            self.chatbot.speak(text, wait=True)
             return True
         except Exception as e:
             print(f"Voice output error: {e}")
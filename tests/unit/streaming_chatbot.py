@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Shared test double: the parts of CharacterVoiceChatbot that the streaming listen path uses,
+bound to a streaming engine stand-in so the real methods can be tested without models
+"""
+
+from types import SimpleNamespace, MethodType
+
+from utils.endpointing import AdaptiveEndpointer
+from utils.latency_trace import LatencyTracer
+
+STREAMING_METHODS = ("_speech_end_time", "_begin_turn_trace", "_listen_streaming")
+
+
+def streaming_chatbot(start_stream, on_partial_transcript=None, energy_threshold=300):
+    """start_stream(rate) -> session with feed(pcm), finish() and endpoint, like StreamingRecognizer"""
+    from main import CharacterVoiceChatbot
+
+    chatbot = SimpleNamespace(
+        streaming_stt=SimpleNamespace(start_stream=start_stream),
+        on_partial_transcript=on_partial_transcript or (lambda text: None),
+        endpointer=AdaptiveEndpointer(),
+        noise_tracker=None,
+        recognizer=SimpleNamespace(energy_threshold=energy_threshold),
+        tracer=LatencyTracer(),
+    )
+    for name in STREAMING_METHODS:
+        setattr(chatbot, name, MethodType(getattr(CharacterVoiceChatbot, name), chatbot))
+    return chatbot
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-memory playback conversions
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.audio_buffer import resample, to_int16_pcm, make_sound
+
+
+def _tone(n_samples, rate, dtype=np.float32, amplitude=0.5):
+    return (amplitude * np.sin(2 * np.pi * 220 * np.arange(n_samples) / rate)).astype(dtype)
+
+
+def test_float_input_is_clipped_at_full_scale():
+    """Samples beyond +-1.0 saturate instead of wrapping around"""
+    pcm = to_int16_pcm(np.array([-2.0, -1.0, 0.0, 0.5, 1.0, 3.0]), 24000)
+    assert pcm.dtype == np.int16
+    assert pcm.tolist() == [-32767, -32767, 0, 16383, 32767, 32767]
+
+
+def test_float64_and_float32_give_the_same_pcm():
+    """XTTS hands out float32, other engines float64 - both convert alike"""
+    wav64 = _tone(2400, 24000, dtype=np.float64)
+    pcm64 = to_int16_pcm(wav64, 24000)
+    pcm32 = to_int16_pcm(wav64.astype(np.float32), 24000)
+    assert pcm64.dtype == pcm32.dtype == np.int16
+    assert np.abs(pcm64.astype(np.int32) - pcm32.astype(np.int32)).max() <= 1
+
+
+def test_int16_input_and_bytes_round_trip():
+    """int16 arrays and raw int16 bytes keep their values (within one step)"""
+    samples = np.array([-32768, -1000, 0, 1000, 32767], dtype=np.int16)
+    for wav in (samples, samples.tobytes()):
+        pcm = to_int16_pcm(wav, 16000)
+        assert np.abs(pcm.astype(np.int32) - samples.astype(np.int32)).max() <= 1
+
+
+def test_resample_length_and_dtype():
+    """Resampling scales the length by the rate ratio and returns float32"""
+    for dtype in (np.float32, np.float64):
+        for src_rate, dst_rate in ((24000, 44100), (44100, 22050), (16000, 48000)):
+            wav = _tone(src_rate // 10, src_rate, dtype=dtype)
+            out = resample(wav, src_rate, dst_rate)
+            assert out.dtype == np.float32
+            assert len(out) == dst_rate // 10
+    wav = _tone(100, 24000)
+    assert resample(wav, 24000, 24000) is wav
+
+
+def test_pcm_is_resampled_and_interleaved():
+    """Mixer rate and channel count are applied; stereo duplicates each sample"""
+    pcm = to_int16_pcm(_tone(2400, 24000, dtype=np.float64), 24000, dst_rate=44100, channels=2)
+    assert pcm.dtype == np.int16
+    assert len(pcm) == 4410 * 2
+    assert np.array_equal(pcm[0::2], pcm[1::2])
+
+
+class FakePygame:
+    """Just enough of pygame for make_sound: a mixer reporting `init` and a Sound that keeps its buffer"""
+
+    def __init__(self, init):
+        self.mixer = SimpleNamespace(get_init=lambda: init, Sound=lambda buffer: SimpleNamespace(buffer=buffer))
+
+    def __enter__(self):
+        self.saved = sys.modules.get("pygame")
+        sys.modules["pygame"] = self
+        return self
+
+    def __exit__(self, *exc):
+        if self.saved is None:
+            sys.modules.pop("pygame", None)
+        else:
+            sys.modules["pygame"] = self.saved
+
+
+def test_make_sound_needs_an_initialized_mixer():
+    """An uninitialized mixer is a clear error, not a TypeError from unpacking None"""
+    with FakePygame(None):
+        try:
+            make_sound(_tone(100, 16000), 16000)
+        except RuntimeError as e:
+            assert "not initialized" in str(e)
+        else:
+            raise AssertionError("make_sound played through an uninitialized mixer")
+
+
+def test_make_sound_matches_the_mixer_format():
+    """The buffer is resampled and interleaved for the mixer; 8-bit mixers are refused"""
+    with FakePygame((22050, -16, 2)):
+        sound = make_sound(_tone(16000, 16000), 16000)
+    assert len(sound.buffer) == 22050 * 2 * 2
+
+    with FakePygame((22050, 8, 1)):
+        try:
+            make_sound(_tone(100, 16000), 16000)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("an 8-bit mixer was fed 16-bit PCM")
+
+
+def main():
+    """Run audio buffer tests"""
+    test_float_input_is_clipped_at_full_scale()
+    test_float64_and_float32_give_the_same_pcm()
+    test_int16_input_and_bytes_round_trip()
+    test_resample_length_and_dtype()
+    test_pcm_is_resampled_and_interleaved()
+    test_make_sound_needs_an_initialized_mixer()
+    test_make_sound_matches_the_mixer_format()
+    print("SUCCESS: Audio buffer tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the asyncio conversation engine
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.conversation_engine import (ConversationEngine, LISTENING, RECOGNIZING, THINKING, SPEAKING,
+                                       STOPPED)
+from utils.speech_worker import SpeechWorker
+
+
+class FakeAudio:
+    def __init__(self, text):
+        self.text = text
+
+
+class ScriptedCapture:
+    """Returns scripted utterances, then silence; records whether speech was playing"""
+
+    def __init__(self, worker, script):
+        self.worker = worker
+        self.script = list(script)
+        self.overlapped = False
+
+    def __call__(self, timeout):
+        if self.worker.busy:
+            self.overlapped = True
+        if self.script:
+            return self.script.pop(0)
+        time.sleep(0.02)
+        return None
+
+
+def _speaker(spoken, chunk_seconds=0.01):
+    def speak(handle):
+        for chunk in handle.chunks:
+            if handle.cancel_event.is_set():
+                break
+            spoken.append(chunk)
+            handle.spoken.append(chunk)
+            handle.cancel_event.wait(chunk_seconds)
+    return speak
+
+
+def test_turns_flow_through_states():
+    """Half duplex: capture -> recognize -> think -> speak, never listening over our own voice"""
+    spoken, states, turns = [], [], []
+    worker = SpeechWorker(_speaker(spoken))
+    capture = ScriptedCapture(worker, [FakeAudio("hello there"), "how are you", FakeAudio("goodbye")])
+
+    def command(text):
+        return ("bye!", True) if text == "goodbye" else None
+
+    engine = ConversationEngine(
+        capture=capture,
+        recognize=lambda audio: audio.text,
+        respond=lambda text: [f"you said {text}.", "nice."],
+        speak=lambda chunks: worker.submit(chunks=chunks),
+        on_command=command,
+        on_turn=lambda user, reply: turns.append((user, reply)),
+        on_state=lambda old, new: states.append(new),
+        listen_timeout=0.1
+    )
+    asyncio.run(asyncio.wait_for(engine.run(greeting="hi!"), 5))
+
+    assert spoken == ["hi!", "you said hello there.", "nice.", "you said how are you.", "nice.", "bye!"]
+    assert turns == [("hello there", "you said hello there. nice."), ("how are you", "you said how are you. nice.")]
+    assert states[:5] == [SPEAKING, LISTENING, RECOGNIZING, THINKING, SPEAKING]
+    assert THINKING in states[5:8] and RECOGNIZING not in states[5:8]  # Streaming text skips recognition
+    assert states[-1] == STOPPED
+    assert not capture.overlapped
+    worker.shutdown(5)
+
+
+def test_silence_prompts():
+    """Each silent listen is counted and may be answered with a prompt"""
+    spoken = []
+    worker = SpeechWorker(_speaker(spoken))
+    counts = []
+
+    def on_silence(count):
+        counts.append(count)
+        if count == 3:
+            engine.stop()
+        return "still there?" if count == 1 else None
+
+    engine = ConversationEngine(
+        capture=lambda timeout: None,
+        recognize=lambda audio: None,
+        respond=lambda text: [],
+        speak=lambda chunks: worker.submit(chunks=chunks),
+        on_silence=on_silence
+    )
+    asyncio.run(asyncio.wait_for(engine.run(), 5))
+
+    assert counts == [1, 2, 3]
+    assert spoken == ["still there?"]
+    worker.shutdown(5)
+
+
+def test_barge_in_cancels_reply():
+    """Full duplex: an utterance during a long reply cancels it and stops the generator"""
+    spoken = []
+    worker = SpeechWorker(_speaker(spoken, chunk_seconds=0.05))
+    pulled = []
+    script = [FakeAudio("tell me a story"), None, FakeAudio("stop")]
+    answered = threading.Event()
+
+    def capture(timeout):
+        time.sleep(0.15)
+        return script.pop(0) if script else None
+
+    def respond(text):
+        if text == "stop":
+            answered.set()
+            engine.stop()
+            return []
+        for index in range(100):
+            pulled.append(index)
+            yield f"sentence {index}."
+            time.sleep(0.01)
+
+    turns = []
+    engine = ConversationEngine(
+        capture=capture,
+        recognize=lambda audio: audio.text,
+        respond=respond,
+        speak=lambda chunks: worker.submit(chunks=chunks),
+        on_turn=lambda user, reply: turns.append((user, reply)),
+        full_duplex=True,
+        barge_in=True
+    )
+    asyncio.run(asyncio.wait_for(engine.run(), 5))
+
+    assert answered.is_set()
+    assert 0 < len(spoken) < 20
+    assert len(pulled) < 100
+    # The interrupted turn is still recorded, with only the part of the reply that was spoken
+    assert turns[0] == ("tell me a story", " ".join(spoken))
+    assert len(pulled) > len(spoken)  # More was generated than said
+    worker.shutdown(5)
+
+
+def test_full_duplex_turn_starts_after_previous_turn():
+    """An utterance captured during a reply only starts its turn once that reply has finished"""
+    spoken, events = [], []
+    worker = SpeechWorker(_speaker(spoken, chunk_seconds=0.05))
+    script = [FakeAudio("first"), FakeAudio("second")]
+
+    def capture(timeout):
+        time.sleep(0.02)
+        return script.pop(0) if script else time.sleep(0.05)
+
+    def on_turn(user, reply):
+        events.append(("end", user))
+        if user == "second":
+            engine.stop()
+
+    engine = ConversationEngine(
+        capture=capture,
+        recognize=lambda audio: audio.text,
+        respond=lambda text: [f"{text} one.", f"{text} two."],
+        speak=lambda chunks: worker.submit(chunks=chunks),
+        on_turn=on_turn,
+        on_turn_start=lambda audio: events.append(("start", audio.text)),
+        full_duplex=True
+    )
+    asyncio.run(asyncio.wait_for(engine.run(), 5))
+
+    assert events == [("start", "first"), ("end", "first"), ("start", "second"), ("end", "second")]
+    worker.shutdown(5)
+
+
+def test_stop_from_another_thread():
+    """stop() is thread-safe and ends run() promptly"""
+    worker = SpeechWorker(_speaker([]))
+    engine = ConversationEngine(
+        capture=lambda timeout: time.sleep(0.02),
+        recognize=lambda audio: None,
+        respond=lambda text: [],
+        speak=lambda chunks: worker.submit(chunks=chunks)
+    )
+    threading.Timer(0.2, engine.stop).start()
+
+    start = time.perf_counter()
+    asyncio.run(asyncio.wait_for(engine.run(), 5))
+    assert time.perf_counter() - start < 1.0
+    assert engine.state == STOPPED
+    worker.shutdown(5)
+
+
+def test_stop_does_not_wait_for_a_blocked_capture():
+    """A capture stuck in listen (up to listen_timeout) doesn't hold up asyncio.run() on stop"""
+    worker = SpeechWorker(_speaker([]))
+    release = threading.Event()
+    engine = ConversationEngine(
+        capture=lambda timeout: release.wait(timeout),
+        recognize=lambda audio: None,
+        respond=lambda text: [],
+        speak=lambda chunks: worker.submit(chunks=chunks),
+        listen_timeout=3
+    )
+    threading.Timer(0.1, engine.stop).start()
+
+    start = time.perf_counter()
+    asyncio.run(asyncio.wait_for(engine.run(), 5))
+    assert time.perf_counter() - start < 1.0
+    release.set()
+    worker.shutdown(5)
+
+
+def main():
+    """Run conversation engine tests"""
+    test_turns_flow_through_states()
+    test_silence_prompts()
+    test_barge_in_cancels_reply()
+    test_full_duplex_turn_starts_after_previous_turn()
+    test_stop_from_another_thread()
+    test_stop_does_not_wait_for_a_blocked_capture()
+    print("SUCCESS: Conversation engine tests passed")
+
+
+if __name__ == "__main__":
+    main()
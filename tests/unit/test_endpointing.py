@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for adaptive endpointing
+"""
+
+import sys
+import os
+import tempfile
+import wave
+from array import array
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.endpointing import AdaptiveEndpointer, looks_complete, measure_pauses, benchmark
+
+FRAME = 0.03
+
+
+def _feed(endpointer, pattern, partial_text=None):
+    """pattern: list of (is_speech, seconds); returns seconds of trailing silence when it fired"""
+    for speech, seconds in pattern:
+        for _ in range(int(round(seconds / FRAME))):
+            if endpointer.update(speech, FRAME, partial_text):
+                return endpointer.silence
+    return None
+
+
+def test_looks_complete():
+    """Punctuation, dangling words and short questions"""
+    assert looks_complete("ma nishma?")
+    assert looks_complete("what are you doing")
+    assert not looks_complete("I wanted to tell you that")
+    assert not looks_complete("")
+    assert looks_complete("מה שלומך?")
+
+
+def test_window_adapts_to_speaker_pauses():
+    """A speaker with short pauses gets a shorter window than the 0.8 s default"""
+    endpointer = AdaptiveEndpointer()
+    assert endpointer.silence_window() == 0.8
+
+    for _ in range(10):
+        endpointer.observe_pause(0.3)
+    assert abs(endpointer.silence_window() - 0.375) < 1e-9
+
+    slow = AdaptiveEndpointer()
+    for _ in range(10):
+        slow.observe_pause(1.3)
+    assert slow.silence_window() == slow.max_silence
+
+
+def test_complete_partial_shortens_window():
+    """A finished question ends the turn sooner"""
+    endpointer = AdaptiveEndpointer()
+    assert endpointer.silence_window("what time is it?") < endpointer.silence_window("so I was")
+
+
+def test_mid_utterance_pause_is_learned_not_endpointed():
+    """A pause shorter than the window does not end the turn and is recorded"""
+    endpointer = AdaptiveEndpointer()
+    fired = _feed(endpointer, [(True, 0.6), (False, 0.45), (True, 0.6), (False, 2.0)])
+    assert fired is not None and abs(fired - 0.8) < FRAME + 1e-9
+    assert len(endpointer.pauses) == 1
+
+
+def test_hard_cap_replaces_phrase_limit():
+    """Long speech runs until the cap, not 3 s"""
+    endpointer = AdaptiveEndpointer(max_utterance=6.0)
+    _feed(endpointer, [(True, 5.0)])
+    assert endpointer.elapsed < 6.0
+    assert _feed(endpointer, [(True, 2.0)]) is not None
+    assert abs(endpointer.elapsed - 6.0) < FRAME + 1e-9
+
+
+def _write_turn(path, pattern, rate=16000):
+    samples = array('h')
+    for level, seconds in pattern:
+        samples.extend([level, -level] * int(seconds * rate / 2))
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return samples.tobytes()
+
+
+def test_measure_pauses_and_benchmark():
+    """Recorded turns from a quick speaker: adaptive ends sooner without cutting anyone off"""
+    directory = tempfile.mkdtemp()
+    turn = [(40, 0.3), (3000, 0.8), (40, 0.3), (3000, 0.9), (40, 0.25), (3000, 0.5), (40, 0.3)]
+    paths = []
+    for index in range(8):
+        path = os.path.join(directory, f"turn_{index}.wav")
+        pcm = _write_turn(path, turn)
+        paths.append(path)
+
+    pauses = measure_pauses(pcm, 16000, threshold=300)
+    assert len(pauses) == 2 and all(0.2 <= pause <= 0.33 for pause in pauses)
+
+    results = benchmark(paths, {
+        "fixed": lambda: AdaptiveEndpointer(base_silence=0.8, min_silence=0.8, max_silence=0.8, min_samples=10 ** 9),
+        "adaptive": lambda: AdaptiveEndpointer(),
+    })
+    assert results["fixed"]["premature_cuts"] == 0
+    assert results["adaptive"]["premature_cuts"] == 0
+    assert results["adaptive"]["mean_latency"] < results["fixed"]["mean_latency"] - 0.2
+
+
+def test_gaps_between_words_are_not_pauses():
+    """Short dips inside and between words don't pull the window down to min_silence"""
+    endpointer = AdaptiveEndpointer()
+    for _ in range(20):
+        endpointer.observe_pause(0.06)
+    assert len(endpointer.pauses) == 0 and endpointer.silence_window() == endpointer.base_silence
+
+    # Natural speech: many 60-90 ms gaps between syllables and words, one real 0.45 s pause per turn
+    directory = tempfile.mkdtemp()
+    syllables = []
+    for gap in (0.06, 0.09, 0.06, 0.06, 0.09, 0.06, 0.09, 0.06, 0.06, 0.09):
+        syllables += [(3000, 0.15), (40, gap)]
+    turn = [(40, 0.3)] + syllables + [(3000, 0.2), (40, 0.45)] + syllables + [(3000, 0.3), (40, 0.3)]
+    paths = []
+    for index in range(8):
+        path = os.path.join(directory, f"turn_{index}.wav")
+        pcm = _write_turn(path, turn)
+        paths.append(path)
+
+    pauses = measure_pauses(pcm, 16000, threshold=300)
+    assert len(pauses) == 1 and abs(pauses[0] - 0.45) <= FRAME + 1e-9
+    # Counting every dip as a pause puts the 90th percentile on a word gap - that policy cuts users off
+    assert len(measure_pauses(pcm, 16000, threshold=300, min_pause=0.0)) > 10
+
+    results = benchmark(paths, {
+        "every dip": lambda: AdaptiveEndpointer(min_pause=0.0),
+        "adaptive": lambda: AdaptiveEndpointer(),
+    })
+    assert results["every dip"]["premature_cuts"] > 0
+    assert results["adaptive"]["premature_cuts"] == 0
+
+
+def main():
+    """Run endpointing tests"""
+    test_looks_complete()
+    test_window_adapts_to_speaker_pauses()
+    test_complete_partial_shortens_window()
+    test_mid_utterance_pause_is_learned_not_endpointed()
+    test_hard_cap_replaces_phrase_limit()
+    test_measure_pauses_and_benchmark()
+    test_gaps_between_words_are_not_pauses()
+    print("SUCCESS: Endpointing tests passed")
+
+
+if __name__ == "__main__":
+    main()
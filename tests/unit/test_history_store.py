@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded conversation history store
+"""
+
+import sys
+import os
+import tempfile
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.history_store import ConversationHistory, estimate_tokens, extractive_summary
+
+
+def _turn(index, words=8):
+    return {"user": f"question {index} " + "word " * words + "?", "bot": f"answer {index}. More detail here."}
+
+
+def test_list_compatible_recent_window():
+    """append / len / slicing / iteration behave like the old list over recent turns"""
+    history = ConversationHistory(max_recent=4)
+    for index in range(3):
+        history.append(_turn(index))
+
+    assert len(history) == 3
+    assert [entry["user"].split()[1] for entry in history[-2:]] == ["1", "2"]
+    assert [entry["bot"] for entry in history][0] == "answer 0. More detail here."
+    assert history.pop(0)["user"].startswith("question 0")
+    assert len(history) == 2
+
+
+def test_constant_memory_with_spill_and_summary():
+    """Old turns leave memory, land on disk in order, and the summary stays capped"""
+    spill_path = os.path.join(tempfile.mkdtemp(), "history", "session.jsonl")
+    history = ConversationHistory(max_recent=5, spill_path=spill_path, summary_chars=400)
+
+    sizes = []
+    for index in range(200):
+        history.append(_turn(index))
+        sizes.append(history.memory_bytes())
+
+    assert len(history) == 5
+    assert history.turn_count == 200
+    assert max(sizes[50:]) - min(sizes[50:]) < 50  # Flat once the ring and summary are full
+    assert len(history.summary) <= 400
+    assert "question 194" in history.summary and "question 0 " not in history.summary
+
+    turns = history.all_turns()
+    assert len(turns) == 200
+    assert turns[0]["user"].startswith("question 0 ") and turns[-1]["user"].startswith("question 199 ")
+
+
+def test_context_fits_the_token_budget():
+    """Summary first, then as many of the newest turns as fit - constant prompt size"""
+    history = ConversationHistory(max_recent=30)
+    for index in range(60):
+        history.append(_turn(index))
+
+    for budget in (100, 300, 800):
+        summary, turns = history.context(budget)
+        used = (estimate_tokens(summary) if summary else 0) + sum(
+            estimate_tokens(entry["user"]) + estimate_tokens(entry["bot"]) for entry in turns)
+        assert used <= budget
+        assert turns[-1]["user"].startswith("question 59 ")
+
+    # Short turns: more than the old fixed "last 8" fit in a modest budget
+    assert len(history.context(800)[1]) > 8
+
+
+def test_summary_larger_than_budget_is_dropped():
+    """Recent turns win over an oversized summary"""
+    history = ConversationHistory(max_recent=2, summarize=lambda summary, entry, limit: "x" * 4000)
+    for index in range(4):
+        history.append(_turn(index))
+    summary, turns = history.context(200)
+    assert summary is None and len(turns) == 2
+
+
+def test_batch_eviction_and_stable_window():
+    """Eviction in batches; the stable window only grows at the end until it has to restart"""
+    history = ConversationHistory(max_recent=8, evict_batch=4)
+    for index in range(9):
+        history.append(_turn(index))
+    assert len(history) == 5 and history.spilled == 4
+
+    history = ConversationHistory(max_recent=100)
+    previous, restarts = None, 0
+    for index in range(40):
+        history.append(_turn(index))
+        summary, turns = history.context(200, stable=True)
+        used = sum(estimate_tokens(entry["user"]) + estimate_tokens(entry["bot"]) for entry in turns)
+        assert used <= 200 and turns[-1]["user"].startswith(f"question {index} ")
+        if previous and turns[0] is previous[0]:
+            assert turns[:len(previous)] == previous
+        elif previous:
+            restarts += 1
+        previous = turns
+    assert 0 < restarts < 15
+
+
+def test_extractive_summary_notes():
+    """One note per evicted turn using the first sentence of each side"""
+    summary = extractive_summary("", {"user": "I love falafel. Where is the best one?", "bot": "Haifa! Trust me."})
+    assert summary == "- User: I love falafel. | Reply: Haifa!"
+
+
+def main():
+    """Run history store tests"""
+    test_list_compatible_recent_window()
+    test_constant_memory_with_spill_and_summary()
+    test_context_fits_the_token_budget()
+    test_summary_larger_than_budget_is_dropped()
+    test_batch_eviction_and_stable_window()
+    test_extractive_summary_notes()
+    print("SUCCESS: History store tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared provider HTTP pool
+"""
+
+import sys
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.http_pool import ProviderHttpPool, get_http_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler that counts new TCP connections"""
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        KeepAliveHandler.connections += 1
+        BaseHTTPRequestHandler.setup(self)
+
+    def _reply(self, body=b""):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._reply()
+
+    def do_GET(self):
+        self._reply(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    KeepAliveHandler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_warm_up_connection_is_reused():
+    """The warm-up opens the one connection every later request goes over"""
+    server, url = _serve()
+    pool = ProviderHttpPool()
+    try:
+        pool.warm(url, wait=True)
+        assert pool.warmups == 1 and KeepAliveHandler.connections == 1
+        for _ in range(3):
+            assert pool.client().get(url).text == "ok"
+        assert KeepAliveHandler.connections == 1
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+def test_rewarm_only_after_idle():
+    """only_if_idle skips hosts used recently and re-warms after rewarm_after seconds"""
+    server, url = _serve()
+    pool = ProviderHttpPool(rewarm_after=0.05)
+    try:
+        assert pool.idle_for(url) is None
+        pool.client().get(url)
+        assert pool.warm(url, only_if_idle=True) is None
+        pool._last_used["127.0.0.1"] -= 1.0  # Pretend the host has been idle for a second
+        assert pool.warm(url, only_if_idle=True, wait=True) is not None
+        assert pool.idle_for(url) < 0.05
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+def test_unreachable_host_only_warns():
+    """A failed warm-up never raises"""
+    pool = ProviderHttpPool()
+    pool.warm("http://127.0.0.1:9/", wait=True)
+    assert pool.warmups == 0
+    pool.close()
+
+
+def test_process_wide_pool():
+    """Every caller gets the same pool; later settings are ignored"""
+    assert get_http_pool() is get_http_pool(max_connections=1)
+
+
+def main():
+    """Run HTTP pool tests"""
+    test_warm_up_connection_is_reused()
+    test_rewarm_only_after_idle()
+    test_unreachable_host_only_warns()
+    test_process_wide_pool()
+    print("SUCCESS: HTTP pool tests passed")
+
+
+if __name__ == "__main__":
+    main()
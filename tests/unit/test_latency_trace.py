@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-turn latency tracing and its exports
+"""
+
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import threading
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.latency_trace import LatencyTracer, TurnTrace, RollingHistogram
+from utils.speech_pipeline import SpeechPipeline
+
+
+def _trace_turn(tracer, offsets, base=1000.0):
+    tracer.begin_turn(speech_end=base)
+    for name, offset in offsets.items():
+        tracer.mark(name, base + offset)
+    return tracer.end_turn()
+
+
+def test_stage_durations():
+    """Stages are computed between recorded boundaries; the first mark wins"""
+    trace = TurnTrace(1)
+    trace.mark("speech_end", 10.0)
+    trace.mark("stt_result", 10.4)
+    trace.mark("stt_result", 11.0)
+    trace.mark("llm_first_token", 10.9)
+
+    durations = trace.durations()
+    assert abs(durations["stt"] - 0.4) < 1e-9
+    assert abs(durations["llm_first_token"] - 0.5) < 1e-9
+    assert "playback" not in durations
+
+
+def test_rolling_percentiles():
+    """Percentiles follow the window; counts are all-time"""
+    histogram = RollingHistogram(window=100)
+    for value in range(1, 201):
+        histogram.add(value / 1000.0)
+    assert histogram.count == 200
+    assert histogram.percentile(0.5) == 0.151
+    assert histogram.percentile(0.99) == 0.2
+
+
+def test_marks_outside_a_turn_are_ignored():
+    """Greetings and prompts spoken between turns don't leak into the next trace"""
+    tracer = LatencyTracer()
+    tracer.mark("playback_start", 5.0)
+    tracer.begin_turn(speech_end=10.0)
+    assert "playback_start" not in tracer.current.marks
+    assert tracer.end_turn()["turn"] == 1
+    assert tracer.end_turn() is None
+
+
+def test_session_tracers_roll_up_into_a_parent():
+    """Concurrent conversations keep their own open turn; finished turns also land in the parent"""
+    parent = LatencyTracer()
+    first, second = LatencyTracer(parent=parent), LatencyTracer(parent=parent)
+    first.begin_turn(speech_end=1000.0)
+    _trace_turn(second, {"stt_result": 0.2})
+    first.mark("stt_result", 1000.4)
+    first.end_turn()
+
+    assert first.turns == second.turns == 1
+    assert parent.turns == 2 and parent.percentiles()["stt"]["count"] == 2
+    assert parent.current is None
+
+
+def test_jsonl_and_prometheus_exports():
+    """Every finished turn is appended to the trace; the snapshot carries p50/p95/p99"""
+    directory = tempfile.mkdtemp()
+    trace_path = os.path.join(directory, "traces", "turns.jsonl")
+    metrics_path = os.path.join(directory, "latency.prom")
+    tracer = LatencyTracer(trace_path=trace_path, metrics_path=metrics_path, prefix="test")
+
+    for index in range(10):
+        _trace_turn(tracer, {
+            "stt_result": 0.3 + index * 0.01,
+            "llm_first_token": 0.8,
+            "llm_done": 1.5,
+            "tts_first_chunk": 1.0,
+            "playback_start": 1.05,
+            "playback_end": 3.0,
+        })
+
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 10
+    assert abs(records[0]["stages"]["stt"] - 0.3) < 1e-6
+    assert abs(records[0]["stages"]["response"] - 1.05) < 1e-6
+
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    assert '# TYPE test_turn_stage_seconds summary' in text
+    assert 'test_turn_stage_seconds{stage="stt",quantile="0.95"} 0.390000' in text
+    assert 'test_turn_stage_seconds_count{stage="turn"} 10' in text
+    assert 'test_turns_total 10' in text
+
+    stats = tracer.percentiles()
+    assert abs(stats["stt"]["p50"] - 0.35) < 1e-6
+    assert stats["playback"]["count"] == 10
+
+
+def test_speech_pipeline_reports_tts_and_playback_start():
+    """The pipeline tells the tracer when the first chunk is rendered and starts playing"""
+    tracer = LatencyTracer()
+    tracer.begin_turn(speech_end=0.0)
+    order = []
+    lock = threading.Lock()
+
+    def on_event(name):
+        with lock:
+            order.append(name)
+        tracer.mark(name)
+
+    SpeechPipeline(synthesize=lambda text: text, play=lambda audio: None, on_event=on_event).run(["a.", "b."])
+    assert order == ["tts_first_chunk", "playback_start"]
+    assert tracer.current.marks["tts_first_chunk"] <= tracer.current.marks["playback_start"]
+
+
+def test_cli_flags_enable_the_exports():
+    """--latency-trace / --latency-metrics turn the exports on from the command line chat"""
+    from main import CHARACTER_VOICE_AVAILABLE
+
+    directory = tempfile.mkdtemp()
+    trace_path = os.path.join(directory, "turns.jsonl")
+    metrics_path = os.path.join(directory, "latency.prom")
+    answers = ["2", "TestBot"] + (["n"] if CHARACTER_VOICE_AVAILABLE else []) + ["", "hello there", "quit"]
+
+    result = subprocess.run(
+        [sys.executable, "main.py", "--latency-trace", trace_path, "--latency-metrics", metrics_path],
+        input="\n".join(answers) + "\n", text=True, capture_output=True, timeout=120, cwd=project_root
+    )
+
+    assert result.returncode == 0, result.stderr
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 1 and "llm_done" in records[0]["marks"]
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        assert "barkoni_turns_total 1" in f.read()
+
+
+def main():
+    """Run latency tracing tests"""
+    test_stage_durations()
+    test_rolling_percentiles()
+    test_marks_outside_a_turn_are_ignored()
+    test_session_tracers_roll_up_into_a_parent()
+    test_jsonl_and_prometheus_exports()
+    test_speech_pipeline_reports_tts_and_playback_start()
+    test_cli_flags_enable_the_exports()
+    print("SUCCESS: Latency trace tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for lazy backend imports
+"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.lazy_import import lazy_import, module_available, import_times
+
+
+def test_module_loaded_on_first_use():
+    """Nothing is imported until an attribute is accessed"""
+    sys.modules.pop("colorsys", None)
+    colorsys = lazy_import("colorsys")
+
+    assert not colorsys.loaded
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert colorsys.loaded
+    assert "colorsys" in [name for name, _ in import_times()]
+
+
+def test_missing_module_fails_on_use():
+    """A missing backend only raises when the mode actually needs it"""
+    missing = lazy_import("surely_not_an_installed_module")
+    try:
+        missing.anything
+    except ImportError:
+        return
+    assert False, "missing module did not raise"
+
+
+def test_module_available():
+    """Availability is checked without importing"""
+    assert module_available("json", "wave")
+    assert not module_available("json", "surely_not_an_installed_module")
+    assert not module_available("surely_not_an_installed_module.sub")
+
+
+def test_main_imports_no_heavy_backends():
+    """Importing main must not pull in TTS, torch, pygame, tkinter or the AI SDKs"""
+    heavy = ["TTS", "torch", "librosa", "pygame", "tkinter", "anthropic", "openai",
+             "speech_recognition", "pyaudio", "pyttsx3"]
+    already_loaded = {name for name in heavy if name in sys.modules}
+
+    import main  # noqa: F401
+
+    newly_loaded = [name for name in heavy if name in sys.modules and name not in already_loaded]
+    assert newly_loaded == []
+
+
+def test_broken_voice_install_keeps_the_system_voice():
+    """Packages that are found but fail to load leave the system voice working"""
+    from types import SimpleNamespace
+    import main as chatbot_module
+
+    class Engine:
+        def getProperty(self, name):
+            return []
+
+        def setProperty(self, name, value):
+            pass
+
+    def broken_xtts():
+        raise OSError("libtorch_cpu.so: cannot open shared object file")
+
+    originals = chatbot_module.pyttsx3, chatbot_module.get_xtts_model
+    chatbot_module.pyttsx3 = SimpleNamespace(init=Engine)
+    chatbot_module.get_xtts_model = broken_xtts
+    try:
+        chatbot = SimpleNamespace(character_name="TestBot", use_character_voice=True)
+        chatbot_module.CharacterVoiceChatbot.setup_voice_components(chatbot)
+    finally:
+        chatbot_module.pyttsx3, chatbot_module.get_xtts_model = originals
+
+    assert isinstance(chatbot.system_tts, Engine) and chatbot.voice_ready
+    assert chatbot.character_tts is None and not chatbot.use_character_voice
+
+
+def main():
+    """Run lazy import tests"""
+    test_module_loaded_on_first_use()
+    test_missing_module_fails_on_use()
+    test_module_available()
+    test_main_imports_no_heavy_backends()
+    test_broken_voice_install_keeps_the_system_voice()
+    print("SUCCESS: Lazy import tests passed")
+
+
+if __name__ == "__main__":
+    main()
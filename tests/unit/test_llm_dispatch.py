@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for hedged LLM dispatch and the provider circuit breaker
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.llm_dispatch import HedgedDispatcher, CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def _leg(words, delay=0.0, fail=False, log=None):
+    """Fake provider stream: waits `delay` before the first token, closes on cancel"""
+    def start(cancel):
+        closed = threading.Event()
+        cancel.add_callback(closed.set)
+
+        def stream():
+            if closed.wait(delay):
+                if log is not None:
+                    log.append("cancelled")
+                return
+            if fail:
+                raise RuntimeError("provider down")
+            for word in words:
+                yield word
+        return stream()
+    return start
+
+
+def test_fast_primary_needs_no_hedge():
+    """A primary that answers within its hedge delay wins alone"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.5)
+    log = []
+    text = "".join(dispatcher.stream({"claude": _leg(["Sababa", "!"]), "openai": _leg(["no"], log=log)}))
+    assert text == "Sababa!"
+    assert dispatcher.hedges == 0 and log == []
+    assert dispatcher.stats()["providers"]["claude"]["wins"] == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    """Past the hedge delay the secondary races; the first token wins and the loser's stream is closed"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.05)
+    log = []
+    started = time.monotonic()
+    text = "".join(dispatcher.stream({"claude": _leg(["slow"], delay=2.0, log=log), "openai": _leg(["fast"])}))
+
+    assert text == "fast"
+    assert time.monotonic() - started < 1.0
+    assert dispatcher.hedges == 1 and dispatcher.wins["openai"] == 1
+    time.sleep(0.05)
+    assert log == ["cancelled"]
+
+
+def test_overtaken_primary_leaves_a_censored_sample():
+    """A primary that loses the race still records how long it had waited, so its p95 can grow"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.05)
+    text = "".join(dispatcher.stream({"claude": _leg(["slow"], delay=2.0), "openai": _leg(["fast"], delay=0.1)}))
+
+    assert text == "fast"
+    samples = list(dispatcher.latency["claude"].samples)
+    assert len(samples) == 1 and samples[0] >= 0.15
+    assert dispatcher.latency["claude"].count == 1
+    # The hedge that lost to a fast primary started late - its short wait says nothing
+    fast = HedgedDispatcher(["claude", "openai"], default_delay=0.05)
+    assert "".join(fast.stream({"claude": _leg(["quick"], delay=0.1), "openai": _leg(["late"], delay=2.0)})) == "quick"
+    assert len(fast.latency["openai"].samples) == 0
+
+
+def test_hedge_delay_follows_p95():
+    """Default delay until enough samples, then the clamped p95 of time-to-first-token"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=1.5, min_delay=0.3, max_delay=5.0, min_samples=5)
+    assert dispatcher.hedge_delay("claude") == 1.5
+    for value in (0.4, 0.5, 0.6, 0.7, 2.0):
+        dispatcher._record("claude", True, value)
+    assert dispatcher.hedge_delay("claude") == 2.0
+    for _ in range(100):
+        dispatcher._record("claude", True, 0.01)
+    assert dispatcher.hedge_delay("claude") == 0.3
+
+
+def test_failures_open_the_breaker_and_route_around():
+    """A failing primary falls over immediately, and after enough failures is skipped entirely"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=5.0, failure_threshold=2, cooldown=60)
+    legs = {"claude": _leg([], fail=True), "openai": _leg(["backup"])}
+    for _ in range(2):
+        started = time.monotonic()
+        assert "".join(dispatcher.stream(legs)) == "backup"
+        assert time.monotonic() - started < 1.0  # No waiting for the hedge delay
+    assert dispatcher.breakers["claude"].state == OPEN
+    assert dispatcher.route() == ["openai"]
+
+
+def test_all_providers_failing_raises():
+    """When every leg fails the last error reaches the caller"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.01)
+    try:
+        list(dispatcher.stream({"claude": _leg([], fail=True), "openai": _leg([], fail=True)}))
+    except RuntimeError as e:
+        assert "provider down" in str(e)
+    else:
+        raise AssertionError("expected the provider error")
+
+
+def test_breaker_half_open_trial():
+    """After the cooldown one trial is allowed; success closes, failure reopens"""
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.available()
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_breaker_lets_one_concurrent_trial_through():
+    """Concurrent conversations sharing a half-open breaker send one trial; the rest go to the backup"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=5.0, failure_threshold=1, cooldown=0.05)
+    dispatcher._record("claude", False)
+    time.sleep(0.06)
+    assert dispatcher.breakers["claude"].state == HALF_OPEN
+
+    trials = []
+    trial_sent = threading.Event()
+
+    def slow_recovered_primary(cancel):
+        trials.append(cancel)
+        trial_sent.set()
+        return _leg(["recovered"], delay=0.2)(cancel)
+
+    legs = {"claude": slow_recovered_primary, "openai": _leg(["backup"])}
+    replies = []
+    first = threading.Thread(target=lambda: replies.append("".join(dispatcher.stream(legs))))
+    first.start()
+    assert trial_sent.wait(1.0)
+    assert dispatcher.route() == ["openai"]  # The trial is in flight
+    others = [threading.Thread(target=lambda: replies.append("".join(dispatcher.stream(legs)))) for _ in range(4)]
+    for thread in others:
+        thread.start()
+    for thread in [first] + others:
+        thread.join(2.0)
+
+    assert len(trials) == 1
+    assert sorted(replies) == ["backup"] * 4 + ["recovered"]
+    assert dispatcher.breakers["claude"].state == CLOSED
+
+
+def test_abandoned_trial_releases_the_breaker():
+    """A trial that loses the hedge race gives no verdict, so the next request may try again"""
+    dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.05, failure_threshold=1, cooldown=0.05)
+    dispatcher._record("claude", False)
+    time.sleep(0.06)
+    assert "".join(dispatcher.stream({"claude": _leg(["slow"], delay=2.0), "openai": _leg(["fast"])})) == "fast"
+    assert dispatcher.breakers["claude"].state == HALF_OPEN
+    assert dispatcher.breakers["claude"].available()
+
+
+def test_chat_streams_through_the_dispatcher():
+    """With both clients set, stream_response and generate_response take the hedged path"""
+    from main import CharacterChat
+
+    chat = CharacterChat("TestBot", ai_provider="claude")
+    chat.claude_client, chat.openai_client = object(), object()
+    chat.dispatcher = HedgedDispatcher(["claude", "openai"], default_delay=0.05)
+    chat._claude_stream = lambda user_input, cancel=None: _leg(["late"], delay=2.0)(cancel)
+    chat._openai_stream = lambda user_input, cancel=None: _leg(["Ahla ", "ahi!"])(cancel)
+
+    assert "".join(chat.stream_response("hi")) == "Ahla ahi!"
+    assert chat.generate_response("hi") == "Ahla ahi!"
+    assert chat.dispatcher.hedges == 2
+
+
+def main():
+    """Run LLM dispatch tests"""
+    test_fast_primary_needs_no_hedge()
+    test_slow_primary_is_hedged_and_cancelled()
+    test_overtaken_primary_leaves_a_censored_sample()
+    test_hedge_delay_follows_p95()
+    test_failures_open_the_breaker_and_route_around()
+    test_all_providers_failing_raises()
+    test_breaker_half_open_trial()
+    test_half_open_breaker_lets_one_concurrent_trial_through()
+    test_abandoned_trial_releases_the_breaker()
+    test_chat_streams_through_the_dispatcher()
+    print("SUCCESS: LLM dispatch tests passed")
+
+
+if __name__ == "__main__":
+    main()
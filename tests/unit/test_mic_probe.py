@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for microphone discovery and the saved device choice
+"""
+
+import sys
+import os
+import tempfile
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.mic_probe import MicrophoneSelector, rank_probes
+
+
+def _probe_result(index, ok=True, rms=100.0, open_time=0.05):
+    return {"device_index": index, "ok": ok, "open_time": open_time if ok else None, "rms": rms, "error": None}
+
+
+def test_rank_prefers_working_device_that_hears_something():
+    """Failed and silent devices sink below a working one"""
+    ranked = rank_probes([
+        _probe_result(None, ok=False),
+        _probe_result(1, rms=0.0, open_time=0.01),
+        _probe_result(5, rms=80.0, open_time=0.2),
+    ])
+    assert [p["device_index"] for p in ranked] == [5, 1, None]
+
+
+def test_default_wins_near_ties():
+    """A device within 10 ms of the system default doesn't displace it; a clearly faster one does"""
+    ranked = rank_probes([
+        _probe_result(3, open_time=0.036),
+        _probe_result(None, open_time=0.045),
+        _probe_result(4, open_time=0.054),
+    ])
+    assert [p["device_index"] for p in ranked] == [None, 3, 4]
+
+    ranked = rank_probes([_probe_result(None, open_time=0.045), _probe_result(7, open_time=0.020)])
+    assert [p["device_index"] for p in ranked] == [7, None]
+
+
+def test_choice_is_probed_once_and_cached():
+    """A second selector reuses the saved device without probing"""
+    cache_path = os.path.join(tempfile.mkdtemp(), "microphone.json")
+    devices = [(1, "Intel Smart Sound"), (14, "Realtek HD Audio")]
+    probed = []
+
+    def probe(index):
+        probed.append(index)
+        return _probe_result(index, ok=(index == 14))
+
+    first = MicrophoneSelector(cache_path, probe=probe, list_devices=lambda: devices)
+    assert first.select() == 14
+    assert probed == [None, 1, 14]
+
+    probed.clear()
+    second = MicrophoneSelector(cache_path, probe=probe, list_devices=lambda: devices)
+    assert second.select() == 14
+    assert second.device_name == "Realtek HD Audio"
+    assert probed == []
+
+
+def test_device_change_triggers_new_probe():
+    """A different device list invalidates the saved choice"""
+    cache_path = os.path.join(tempfile.mkdtemp(), "microphone.json")
+    devices = [(1, "Intel Smart Sound")]
+    probed = []
+
+    def probe(index):
+        probed.append(index)
+        return _probe_result(index)
+
+    MicrophoneSelector(cache_path, probe=probe, list_devices=lambda: devices).select()
+    probed.clear()
+
+    devices.append((2, "USB Headset"))
+    MicrophoneSelector(cache_path, probe=probe, list_devices=lambda: devices).select()
+    assert probed == [None, 1, 2]
+
+
+def main():
+    """Run microphone discovery tests"""
+    test_rank_prefers_working_device_that_hears_something()
+    test_default_wins_near_ties()
+    test_choice_is_probed_once_and_cached()
+    test_device_change_triggers_new_probe()
+    print("SUCCESS: Microphone discovery tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the background ambient noise tracker
+"""
+
+import sys
+import os
+import threading
+import time
+from array import array
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.noise_floor import AmbientNoiseTracker
+
+
+class FakeMicrophone:
+    """Minimal stand-in for sr.Microphone producing a constant-level signal"""
+
+    CHUNK = 160
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, level, open_count):
+        self.level = level
+        self.open_count = open_count
+        self.stream = self
+
+    def __enter__(self):
+        self.open_count.append(1)
+        return self
+
+    def __exit__(self, *exc):
+        self.open_count.pop()
+
+    def read(self, size):
+        time.sleep(0.001)
+        return array('h', [self.level, -self.level] * (size // 2)).tobytes()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.01)
+    return condition()
+
+
+def test_floor_tracks_room_level():
+    """The EMA converges on the background level and drives the threshold"""
+    open_count = []
+    tracker = AmbientNoiseTracker(lambda: FakeMicrophone(200, open_count), alpha=0.2).start()
+    try:
+        assert _wait_for(lambda: tracker.frames_observed > 50)
+        metrics = tracker.metrics()
+        assert abs(metrics["noise_floor"] - 200) < 1
+        assert abs(metrics["energy_threshold"] - 300) < 2
+    finally:
+        tracker.stop()
+
+
+def test_pause_releases_device():
+    """pause() returns only once the sampler has closed the microphone"""
+    open_count = []
+    tracker = AmbientNoiseTracker(lambda: FakeMicrophone(100, open_count)).start()
+    try:
+        assert _wait_for(lambda: open_count)
+        tracker.pause()
+        assert open_count == []
+        tracker.resume()
+        assert _wait_for(lambda: open_count)
+    finally:
+        tracker.stop()
+
+
+def test_bot_speech_is_not_learned():
+    """Frames captured while the bot talks never raise the floor"""
+    quiet = threading.Event()
+    tracker = AmbientNoiseTracker(lambda: FakeMicrophone(5000, []), initial_threshold=150,
+                                  is_quiet=quiet.is_set).start()
+    try:
+        time.sleep(0.1)
+        assert tracker.frames_observed == 0
+        assert tracker.noise_floor == 100
+    finally:
+        tracker.stop()
+
+
+def test_user_speech_between_turns_is_not_learned():
+    """Loud frames while the bot is quiet (the user talking) don't become the floor"""
+    tracker = AmbientNoiseTracker(lambda: FakeMicrophone(0, []), alpha=0.2)
+    for _ in range(20):
+        assert tracker.observe(100.0)
+    for _ in range(50):
+        assert not tracker.observe(4000.0)
+    assert tracker.noise_floor < 200
+    assert tracker.energy_threshold < 300
+
+
+def test_nested_pause_needs_every_resume():
+    """A listen inside a barge-in doesn't restart sampling while the outer pause still holds the device"""
+    open_count = []
+    tracker = AmbientNoiseTracker(lambda: FakeMicrophone(100, open_count)).start()
+    try:
+        assert _wait_for(lambda: open_count)
+        tracker.pause()
+        tracker.pause()
+        tracker.resume()
+        assert not _wait_for(lambda: open_count, timeout=0.2)
+        tracker.resume()
+        assert _wait_for(lambda: open_count)
+    finally:
+        tracker.stop()
+
+
+def main():
+    """Run noise tracker tests"""
+    test_floor_tracks_room_level()
+    test_pause_releases_device()
+    test_user_speech_between_turns_is_not_learned()
+    test_nested_pause_needs_every_resume()
+    test_bot_speech_is_not_learned()
+    print("SUCCESS: Noise tracker tests passed")
+
+
+if __name__ == "__main__":
+    main()
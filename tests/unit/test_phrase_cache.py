@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk TTS phrase cache
+"""
+
+import sys
+import os
+import tempfile
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.phrase_cache import PhraseCache
+
+
+def _pcm(n_samples, value=1):
+    """Silence-like int16 PCM payload of n_samples"""
+    return int(value).to_bytes(2, "little", signed=True) * n_samples
+
+
+def test_key_normalizes_text_but_not_voice_settings():
+    """Whitespace differences share a key; voice settings do not"""
+    base = PhraseCache.make_key("Shalom  achi!\n", "xtts_v2", "abc", 1.0, "en")
+    assert base == PhraseCache.make_key(" Shalom achi!", "xtts_v2", "abc", 1.0, "en")
+    assert base != PhraseCache.make_key("Shalom achi!", "xtts_v2", "other", 1.0, "en")
+    assert base != PhraseCache.make_key("Shalom achi!", "xtts_v2", "abc", 1.2, "en")
+    assert base != PhraseCache.make_key("Shalom achi!", "xtts_v2", "abc", 1.0, "he")
+
+
+def test_round_trip_and_persistence():
+    """Stored audio comes back identical, also from a fresh cache instance"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PhraseCache(cache_dir=cache_dir)
+        key = PhraseCache.make_key("Ma nishma?", "xtts_v2")
+        assert cache.get(key) is None
+
+        cache.put(key, _pcm(100, 7), 24000)
+        assert cache.get(key) == (_pcm(100, 7), 24000)
+
+        reopened = PhraseCache(cache_dir=cache_dir)
+        assert key in reopened
+        assert reopened.get(key) == (_pcm(100, 7), 24000)
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_respects_size_cap():
+    """The least recently used phrase is evicted first"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Each entry is 2000 bytes of PCM plus a 44 byte WAV header
+        cache = PhraseCache(cache_dir=cache_dir, max_bytes=5000)
+        cache.put("a", _pcm(1000), 16000)
+        cache.put("b", _pcm(1000), 16000)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", _pcm(1000), 16000)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert not os.path.exists(os.path.join(cache_dir, "b.wav"))
+        assert cache.total_bytes <= 5000
+
+
+def main():
+    """Run phrase cache tests"""
+    test_key_normalizes_text_but_not_voice_settings()
+    test_round_trip_and_persistence()
+    test_lru_eviction_respects_size_cap()
+    print("SUCCESS: Phrase cache tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Unit tests for background pre-rendering of fixed phrases
+"""
+
+import sys
+import os
+import threading
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.prerender import PhraseWarmup
+
+
+def test_waits_for_voice_then_renders_uncached_phrases():
+    """Nothing renders before the voice is ready; cached phrases are skipped"""
+    rendered = []
+    ready = threading.Event()
+    warmup = PhraseWarmup(
+        ["Shalom!", "Yalla bro!", "Shalom!", "", "Sababa!"],
+        render=rendered.append,
+        is_cached=lambda text: text == "Sababa!",
+        ready_event=ready,
+        on_progress=lambda progress: None
+    ).start()
+
+    assert not warmup.wait(0.1)
+    assert rendered == []
+
+    ready.set()
+    assert warmup.wait(5)
+    assert rendered == ["Shalom!", "Yalla bro!"]
+    progress = warmup.progress
+    assert progress["total"] == 3 and progress["completed"] == 3
+    assert progress["already_cached"] == 1 and progress["finished"]
+
+
+def test_render_failures_are_counted_not_raised():
+    """One bad phrase does not stop the warm-up"""
+    def render(text):
+        if text == "bad":
+            raise RuntimeError("synthesis failed")
+
+    warmup = PhraseWarmup(["bad", "good"], render=render, on_progress=lambda progress: None).start()
+    assert warmup.wait(5)
+    assert warmup.progress["failed"] == 1 and warmup.progress["rendered"] == 1
+
+
+def main():
+    """Run pre-render tests"""
+    test_waits_for_voice_then_renders_uncached_phrases()
+    test_render_failures_are_counted_not_raised()
+    print("SUCCESS: Pre-render tests passed")
+
+
+if __name__ == "__main__":
+    main()
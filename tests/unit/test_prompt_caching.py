@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cache-friendly Claude request layout
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from main import CharacterChat
+
+
+class FakeMessages:
+    """Records each request and answers with fixed usage numbers"""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        usage = SimpleNamespace(input_tokens=12, cache_read_input_tokens=900, cache_creation_input_tokens=40)
+        return SimpleNamespace(content=[SimpleNamespace(text=" Sababa! ")], usage=usage)
+
+
+def _chat():
+    chat = CharacterChat("Barkuni", ai_provider="claude")
+    chat.claude_client = SimpleNamespace(messages=FakeMessages())
+    return chat
+
+
+def test_persona_is_a_cached_system_block():
+    """The persona goes in `system` with a cache breakpoint; the user turn is a plain message"""
+    chat = _chat()
+    kwargs = chat._claude_request_kwargs("hello")
+
+    assert kwargs["system"][0]["text"] == chat._build_system_prompt()
+    assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert kwargs["messages"] == [{"role": "user", "content": "hello"}]
+
+
+def test_history_is_structured_and_the_prefix_repeats():
+    """Turns become alternating messages; each request starts with the previous one's cached prefix"""
+    chat = _chat()
+    previous = None
+    for index in range(6):
+        user_input = f"question {index}"
+        kwargs = chat._claude_request_kwargs(user_input)
+        messages = kwargs["messages"]
+
+        assert [message["role"] for message in messages] == ["user", "assistant"] * index + ["user"]
+        if index:
+            assert messages[-2]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        if previous and len(previous["messages"]) > 1:
+            # Same bytes up to the previous request's last breakpoint (the cache marker itself moves on)
+            cached = len(previous["messages"]) - 2
+            assert kwargs["system"] == previous["system"]
+            assert messages[:cached] == previous["messages"][:cached]
+            assert messages[cached]["content"] == previous["messages"][cached]["content"][0]["text"]
+        previous = kwargs
+        chat._record_turn(user_input, f"answer {index}")
+
+
+def test_cache_usage_is_logged_per_turn():
+    """Cache reads / writes / uncached input tokens are accumulated from the response usage"""
+    chat = _chat()
+    assert chat._generate_response("hello") == "Sababa!"
+    chat._generate_response("again")
+    assert chat.prompt_cache_stats == {"cache_read": 1800, "cache_write": 80, "uncached": 24}
+    assert len(chat.claude_client.messages.requests) == 2
+
+
+def main():
+    """Run prompt caching tests"""
+    test_persona_is_a_cached_system_block()
+    test_history_is_structured_and_the_prefix_repeats()
+    test_cache_usage_is_logged_per_turn()
+    print("SUCCESS: Prompt caching tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the speech recognition stage (concurrent languages, streaming partials)
+"""
+
+import sys
+import os
+import threading
+from array import array
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.recognition import RecognizerBackend, ConcurrentRecognizer
+from tests.unit.streaming_chatbot import streaming_chatbot
+
+
+class StandInBackend(RecognizerBackend):
+    """Local stand-in service: fixed answer per language; held languages block until released"""
+
+    name = "stand-in"
+
+    def __init__(self, answers, hold=(), meet=False):
+        """
+        answers: language -> [(transcript, confidence)] or Exception
+        meet: every language waits (briefly) until all of them are in flight at once
+        """
+        self.answers = answers
+        self.calls = []
+        self.finished = []
+        self.overlapped = []
+        self.released = {language: threading.Event() for language in answers}
+        for language in answers:
+            if language not in hold:
+                self.released[language].set()
+        self.arrivals = threading.Barrier(len(answers)) if meet else None
+
+    def release(self):
+        for event in self.released.values():
+            event.set()
+
+    def recognize(self, audio, language):
+        self.calls.append(language)
+        if self.arrivals:
+            try:
+                self.arrivals.wait(timeout=2.0)  # Only opens if the variants overlap
+                self.overlapped.append(language)
+            except threading.BrokenBarrierError:
+                pass
+        self.released[language].wait(timeout=5.0)
+        self.finished.append(language)
+        answer = self.answers[language]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def test_languages_run_concurrently_and_best_confidence_wins():
+    """Every variant is in flight at the same time, and confidence decides"""
+    backend = StandInBackend({
+        "he-IL": [("מה נשמע", 0.62)],
+        "en-US": [("ma nishma", 0.41)],
+    }, meet=True)
+    result = ConcurrentRecognizer(backend, accept_confidence=0.99).recognize(b"audio")
+
+    assert result["text"] == "מה נשמע"
+    assert result["language"] == "he-IL"
+    assert result["backend"] == "stand-in"
+    assert sorted(backend.overlapped) == ["en-US", "he-IL"]
+    assert sorted(backend.calls) == ["en-US", "he-IL"]
+
+
+def test_confident_answer_does_not_wait_for_stragglers():
+    """A confident early result is returned while a slow variant is still running"""
+    backend = StandInBackend({
+        "he-IL": [("שלום", 0.93)],
+        "en-US": [("shalom", 0.95)],
+    }, hold=("en-US",))
+    try:
+        result = ConcurrentRecognizer(backend).recognize(b"audio")
+        assert result["text"] == "שלום"
+        assert backend.finished == ["he-IL"]  # en-US was still held when the answer came back
+    finally:
+        backend.release()
+
+
+def test_failures_and_empty_answers_are_ignored():
+    """A failing or empty variant does not hide a good one"""
+    backend = StandInBackend({
+        "he-IL": RuntimeError("network down"),
+        "en-US": [("hello", 0.8)],
+        "ar-IL": [],
+    })
+    result = ConcurrentRecognizer(backend, languages=("he-IL", "en-US", "ar-IL")).recognize(b"audio")
+    assert result["text"] == "hello"
+
+    nothing = StandInBackend({"he-IL": [], "en-US": []})
+    assert ConcurrentRecognizer(nothing).recognize(b"audio") is None
+
+
+def test_timeout_returns_best_so_far():
+    """A variant slower than the timeout is abandoned"""
+    backend = StandInBackend({
+        "he-IL": [("late", 0.99)],
+        "en-US": [("early", 0.5)],
+    }, hold=("he-IL",))
+    try:
+        result = ConcurrentRecognizer(backend, timeout=0.2).recognize(b"audio")
+        assert result["text"] == "early"
+        assert "he-IL" not in backend.finished
+    finally:
+        backend.release()
+
+
+class HangingOnceBackend(RecognizerBackend):
+    """Every language's first call hangs (like a request with no timeout); later calls answer at once"""
+
+    name = "hanging"
+
+    def __init__(self):
+        self.hung = set()
+        self.unblock = threading.Event()
+
+    def recognize(self, audio, language):
+        if language not in self.hung:
+            self.hung.add(language)
+            self.unblock.wait(5.0)
+            return []
+        return [(f"answer {language}", 0.9)]
+
+
+def test_hung_calls_do_not_starve_the_next_turn():
+    """Stragglers still holding every pooled worker don't make the next turn wait out its timeout"""
+    backend = HangingOnceBackend()
+    recognizer = ConcurrentRecognizer(backend, timeout=0.2)
+    try:
+        assert recognizer.recognize(b"turn 1") is None
+        assert backend.hung == {"he-IL", "en-US"}  # Both workers are stuck in turn 1
+
+        result = recognizer.recognize(b"turn 2")
+        assert result is not None and result["text"] == "answer he-IL"
+    finally:
+        backend.unblock.set()
+        recognizer.shutdown()
+
+
+def test_backend_must_implement_recognize():
+    """RecognizerBackend is abstract - a backend without recognize can't be built"""
+    class Incomplete(RecognizerBackend):
+        pass
+
+    try:
+        Incomplete()
+    except TypeError:
+        return
+    raise AssertionError("a backend without recognize() was instantiated")
+
+
+class FakeStreamingSession:
+    """Scripted streaming engine: one hypothesis per fed frame, its own phrase endpoint after endpoint_at frames"""
+
+    def __init__(self, script, endpoint_at=None):
+        self.script = list(script)
+        self.endpoint_at = len(self.script) if endpoint_at is None else endpoint_at
+        self.endpoint = False
+        self.fed = 0
+
+    def feed(self, pcm):
+        self.fed += 1
+        hypothesis = self.script.pop(0) if self.script else self.last
+        self.last = hypothesis
+        self.endpoint = self.endpoint or self.fed >= self.endpoint_at
+        return hypothesis
+
+    def finish(self):
+        return self.last, 0.9
+
+
+class FakeSource:
+    """Microphone stand-in: `loud` frames of speech, then silence"""
+
+    CHUNK = 1600
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, loud):
+        self.loud = loud
+        self.stream = SimpleNamespace(read=self._read)
+
+    def _read(self, size):
+        level = 3000 if self.loud > 0 else 0
+        self.loud -= 1
+        return array('h', [level, -level] * (size // 2)).tobytes()
+
+
+def test_streaming_listen_reports_partials_and_ends_after_trailing_silence():
+    """Partials are surfaced while listening; the adaptive endpointer ends the turn once the user goes quiet"""
+    session = FakeStreamingSession(["", "", "ma", "ma nish", "ma nishma"])
+    partials = []
+    chatbot = streaming_chatbot(lambda rate: session, on_partial_transcript=partials.append)
+
+    text = chatbot._listen_streaming(FakeSource(loud=5), timeout=5, phrase_timeout=10)
+
+    assert text == "ma nishma"
+    assert partials == ["ma", "ma nish", "ma nishma"]
+    # Five frames of speech, then one silence window (0.8 s of 0.1 s frames; float sums may need one more)
+    assert 13 <= session.fed <= 14
+    assert "speech_end" in chatbot.tracer.current.marks and "stt_result" in chatbot.tracer.current.marks
+
+
+def test_engine_phrase_endpoint_does_not_end_the_turn():
+    """The recognizer's own endpoint mid-sentence is ignored while the user keeps talking"""
+    session = FakeStreamingSession(["", "ma", "ma nish", "ma nish ma", "ma nish ma shlomcha"], endpoint_at=2)
+    chatbot = streaming_chatbot(lambda rate: session)
+
+    text = chatbot._listen_streaming(FakeSource(loud=5), timeout=5, phrase_timeout=10)
+
+    assert text == "ma nish ma shlomcha"
+    assert session.fed > 5
+
+
+def main():
+    """Run recognition tests"""
+    test_languages_run_concurrently_and_best_confidence_wins()
+    test_confident_answer_does_not_wait_for_stragglers()
+    test_failures_and_empty_answers_are_ignored()
+    test_timeout_returns_best_so_far()
+    test_hung_calls_do_not_starve_the_next_turn()
+    test_backend_must_implement_recognize()
+    test_streaming_listen_reports_partials_and_ends_after_trailing_silence()
+    test_engine_phrase_endpoint_does_not_end_the_turn()
+    print("SUCCESS: Recognition tests passed")
+
+
+if __name__ == "__main__":
+    main()
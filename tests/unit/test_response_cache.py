@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the opener response cache
+"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.response_cache import ResponseCache, normalize_text
+from main import CharacterChat
+
+
+def test_normalized_keys():
+    """Case, punctuation and niqqud don't matter; long inputs and other characters aren't cached"""
+    cache = ResponseCache(characters=("Barkuni",))
+    assert normalize_text("  Ma NISHMA?!  ") == "ma nishma"
+    assert normalize_text("שָׁלוֹם!") == "שלום"
+    assert cache.make_key("Barkuni", "Shalom!") == cache.make_key("barkuni", "shalom")
+    assert cache.make_key("Barkuni", "tell me a long story about your trip to eilat please") is None
+    assert cache.make_key("Other", "shalom") is None
+    history = [{"user": "hi", "bot": "Ahla!"}]
+    assert cache.make_key("Barkuni", "shalom", history) != cache.make_key("Barkuni", "shalom")
+
+
+def test_variants_rotate():
+    """A key serves only once it has all its variants, never the same reply twice in a row"""
+    cache = ResponseCache(variants=3)
+    key = cache.make_key("Barkuni", "hi")
+    for reply in ("Ahla!", "Shalom ahi!", "Ma kore?"):
+        assert cache.get(key) is None
+        cache.put(key, reply)
+
+    served = [cache.get(key) for _ in range(10)]
+    assert all(served)
+    assert all(a != b for a, b in zip(served, served[1:]))
+    assert cache.stats()["hits"] == 10 and cache.stats()["misses"] == 3
+
+
+def test_ttl_and_lru():
+    """Expired replies are dropped; past max_entries the least recently used key goes"""
+    cache = ResponseCache(variants=1, ttl=0.05, max_entries=2)
+    for text in ("hi", "hey"):
+        cache.put(cache.make_key("x", text), text.upper())
+    assert cache.get(cache.make_key("x", "hi")) == "HI"  # "hey" is now least recently used
+    cache.put(cache.make_key("x", "yo"), "YO")
+    assert cache.get(cache.make_key("x", "hey")) is None
+    time.sleep(0.06)
+    assert cache.get(cache.make_key("x", "hi")) is None
+    assert cache.stats()["entries"] == 1  # "yo" is dropped on its next lookup
+
+
+def test_cache_hit_skips_the_provider():
+    """Chat replies come from the cache once filled; hit rates join the latency metrics"""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text="Sababa!")], usage=None)
+
+    chat = CharacterChat("Barkuni", ai_provider="claude")
+    chat.claude_client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    chat.use_response_cache(ResponseCache(variants=1))
+
+    assert chat.generate_response("Shalom!") == "Sababa!"
+    assert chat.generate_response("shalom") == "Sababa!"
+    assert "".join(chat.stream_response("SHALOM")) == "Sababa!"
+    assert len(calls) == 1
+    assert 'barkoni_response_cache_lookups_total{result="hit"} 2' in chat.tracer.prometheus_text()
+
+
+def main():
+    """Run response cache tests"""
+    test_normalized_keys()
+    test_variants_rotate()
+    test_ttl_and_lru()
+    test_cache_hit_skips_the_provider()
+    print("SUCCESS: Response cache tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streaming sentence chunker used by streamed TTS
+"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.sentence_stream import SentenceChunker, chunk_text_stream, split_sentences
+
+
+def test_first_sentence_is_released_before_stream_ends():
+    """A finished sentence is emitted as soon as the next token arrives"""
+    chunker = SentenceChunker()
+    assert chunker.feed("YOOOO BRO! Ma nishma achi") == []
+    assert chunker.feed("?! Wait") == ["YOOOO BRO! Ma nishma achi?!"]
+    assert chunker.flush() == ["Wait"]
+
+
+def test_token_by_token_stream_matches_full_text():
+    """Feeding one character at a time gives the same chunks as the full text"""
+    text = "Shalom shalom! LO MA'AMIN you're here. Ma kore po? Yalla bro"
+    streamed = list(chunk_text_stream(iter(text)))
+    assert streamed == split_sentences(text)
+    assert " ".join(streamed) == text
+
+
+def test_hebrew_punctuation():
+    """Hebrew sentences are cut at their punctuation too"""
+    chunks = split_sentences("שלום שלום! מה קורה איתך היום? בוא נדבר על זה.")
+    assert chunks == ["שלום שלום! מה קורה איתך היום?", "בוא נדבר על זה."]
+
+
+def test_decimal_point_is_not_a_boundary():
+    """Numbers like 3.5 do not split a sentence"""
+    assert split_sentences("The version is 3.5 and it works great.") == [
+        "The version is 3.5 and it works great."
+    ]
+
+
+def test_long_clause_and_runaway_text_are_cut():
+    """Long unpunctuated text is still chunked so TTS never waits for the end"""
+    chunks = split_sentences("wait wait wait achi listen listen, ma ani omer bro this is insane")
+    assert chunks[0] == "wait wait wait achi listen listen,"
+
+    runaway = " ".join(["yalla"] * 60)
+    chunks = split_sentences(runaway, max_chars=50)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == runaway
+
+
+def main():
+    """Run sentence chunker tests"""
+    test_first_sentence_is_released_before_stream_ends()
+    test_token_by_token_stream_matches_full_text()
+    test_hebrew_punctuation()
+    test_decimal_point_is_not_a_boundary()
+    test_long_clause_and_runaway_text_are_cut()
+    print("SUCCESS: Sentence chunker tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the multi-session WebSocket voice server
+"""
+
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import websockets
+
+from server import SharedModels, VoiceServer, CLOSE_TRY_AGAIN_LATER
+from utils.response_cache import ResponseCache
+
+
+class ToneModels(SharedModels):
+    """Shared models with a fake voice (one short PCM buffer per sentence) and fake recognition"""
+
+    def __init__(self, **kwargs):
+        SharedModels.__init__(self, character_name="TestBot", max_workers=4, **kwargs)
+        self.synthesized = []
+
+    @property
+    def voice_available(self):
+        return True
+
+    def synthesize(self, text):
+        self.synthesized.append(text)
+        return b"\x01\x00" * 160, 16000
+
+    def recognize(self, pcm, sample_rate):
+        return "hello there" if len(pcm) >= 3200 else None
+
+
+async def _with_server(server, scenario):
+    started = asyncio.Event()
+    holder = {}
+
+    def ready(ws_server):
+        holder["port"] = list(ws_server.sockets)[0].getsockname()[1]
+        started.set()
+
+    serving = asyncio.create_task(server.serve("127.0.0.1", 0, ready=ready))
+    await asyncio.wait_for(started.wait(), 5)
+    try:
+        return await asyncio.wait_for(scenario(f"ws://127.0.0.1:{holder['port']}"), 10)
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+
+
+async def _turn(websocket, message):
+    """Send one turn and collect messages (and binary audio sizes) until reply_end"""
+    await websocket.send(message) if isinstance(message, bytes) else await websocket.send(json.dumps(message))
+    received = []
+    while True:
+        frame = await websocket.recv()
+        if isinstance(frame, bytes):
+            received.append({"type": "pcm", "bytes": len(frame)})
+            continue
+        received.append(json.loads(frame))
+        if received[-1]["type"] in ("reply_end", "error"):
+            return received
+
+
+def test_concurrent_sessions_keep_their_own_history():
+    """Two sessions talk at once on one set of models; histories stay separate"""
+    models = ToneModels()
+    server = VoiceServer(models, max_sessions=4)
+
+    async def client(url, text):
+        async with websockets.connect(url) as websocket:
+            ready = json.loads(await websocket.recv())
+            assert ready["type"] == "ready"
+            messages = await _turn(websocket, {"type": "text", "text": text})
+            return ready["session"], messages, server.sessions[ready["session"]].chat.conversation_history[:]
+
+    async def scenario(url):
+        return await asyncio.gather(client(url, "hello bro"), client(url, "thanks man"))
+
+    (first_id, first, first_history), (second_id, second, second_history) = asyncio.run(_with_server(server, scenario))
+
+    assert first_id != second_id
+    for messages in (first, second):
+        kinds = [message["type"] for message in messages]
+        assert kinds[0] == "reply_chunk" and kinds[-1] == "reply_end"
+        assert "audio" in kinds and "pcm" in kinds
+    assert [entry["user"] for entry in first_history] == ["hello bro"]
+    assert [entry["user"] for entry in second_history] == ["thanks man"]
+    assert server.stats()["active_sessions"] == 0
+    models.shutdown()
+
+
+def test_admission_control_rejects_extra_sessions():
+    """Beyond max_sessions a connection is closed with 'try again later'"""
+    models = ToneModels()
+    server = VoiceServer(models, max_sessions=1)
+
+    async def scenario(url):
+        async with websockets.connect(url) as first:
+            await first.recv()
+            async with websockets.connect(url) as second:
+                try:
+                    await second.recv()
+                except websockets.ConnectionClosed as closed:
+                    return closed.rcvd.code
+        return None
+
+    assert asyncio.run(_with_server(server, scenario)) == CLOSE_TRY_AGAIN_LATER
+    assert server.rejected == 1
+    models.shutdown()
+
+
+def test_pcm_turn_and_memory_cap():
+    """PCM in -> transcript and reply; an utterance over the cap is refused; history is trimmed"""
+    models = ToneModels()
+    server = VoiceServer(models, max_sessions=2, session_memory_mb=0.01)  # ~10 KB per session
+
+    async def scenario(url):
+        async with websockets.connect(url) as websocket:
+            session_id = json.loads(await websocket.recv())["session"]
+            await websocket.send(json.dumps({"type": "audio_start", "sample_rate": 16000}))
+            await websocket.send(b"\x00\x01" * 2000)
+            spoken = await _turn(websocket, {"type": "audio_end"})
+
+            await websocket.send(json.dumps({"type": "audio_start"}))
+            await websocket.send(b"\x00\x01" * 4000)
+            refused = await _turn(websocket, b"\x00\x01" * 2000)
+            # The rest of the refused utterance is dropped and its audio_end answers nothing
+            await websocket.send(b"\x00\x01" * 2000)
+            await websocket.send(json.dumps({"type": "audio_end"}))
+            after_refusal = await _turn(websocket, {"type": "text", "text": "still there?"})
+
+            bad_rate = await _turn(websocket, {"type": "audio_start", "sample_rate": "fast"})
+
+            session = server.sessions[session_id]
+            for index in range(40):
+                session.chat._record_turn("x" * 200, "y" * 200)
+                session._trim_history()
+            return spoken, refused, after_refusal, bad_rate, session.memory_bytes(), session.chat.conversation_history
+
+    spoken, refused, after_refusal, bad_rate, memory, history = asyncio.run(_with_server(server, scenario))
+
+    assert spoken[0] == {"type": "transcript", "text": "hello there"}
+    assert spoken[-1]["type"] == "reply_end"
+    assert refused[-1]["type"] == "error" and "memory cap" in refused[-1]["message"]
+    assert after_refusal[0]["type"] == "reply_chunk"  # No transcript of a truncated tail
+    assert bad_rate == [{"type": "error", "message": "invalid sample_rate: 'fast'"}]
+    assert memory <= 0.01 * 1024 * 1024
+    assert 0 < len(history) < 40
+    # Turns trimmed for memory still reach the rolling summary
+    assert history.spilled >= 40 - len(history) and "x" in history.summary
+    models.shutdown()
+
+
+def test_session_turns_and_cache_counters_are_exported():
+    """Every session's turns roll up into the server metrics file and the periodic stats line"""
+    metrics_path = os.path.join(tempfile.mkdtemp(), "server.prom")
+    models = ToneModels(response_cache=ResponseCache(characters=("TestBot",)), latency_metrics_path=metrics_path)
+    server = VoiceServer(models, max_sessions=4)
+
+    async def client(url, text):
+        async with websockets.connect(url) as websocket:
+            await websocket.recv()
+            await _turn(websocket, {"type": "text", "text": text})
+
+    async def scenario(url):
+        await asyncio.gather(client(url, "hello bro"), client(url, "thanks man"))
+
+    asyncio.run(_with_server(server, scenario))
+    with open(metrics_path, encoding="utf-8") as f:
+        metrics = f.read()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        server.log_stats()
+
+    assert server.stats()["latency"]["llm_first_token"]["count"] == 2
+    assert "barkoni_turns_total 2" in metrics
+    assert 'barkoni_turn_stage_seconds_count{stage="tts_first_chunk"} 2' in metrics
+    assert 'barkoni_response_cache_lookups_total{result="hit"}' in metrics
+    assert "barkoni_sessions_active" in metrics
+    line = log.getvalue()
+    assert line.startswith("INFO: Voice server: sessions 0/4") and "response cache" in line
+    assert "llm_first_token p50" in line
+    models.shutdown()
+
+
+def main():
+    """Run voice server tests"""
+    test_concurrent_sessions_keep_their_own_history()
+    test_admission_control_rejects_extra_sessions()
+    test_pcm_turn_and_memory_cap()
+    test_session_turns_and_cache_counters_are_exported()
+    print("SUCCESS: Voice server tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the producer/consumer speech pipeline
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.speech_pipeline import SpeechPipeline
+
+
+def test_synthesis_overlaps_playback():
+    """Chunk N+1 is synthesized while chunk N is still playing"""
+    log = []  # (event, chunk) in the order they happened
+    lock = threading.Lock()
+    synthesis_started = {text: threading.Event() for text in "abcd"}
+    played = []
+
+    def record(event, text):
+        with lock:
+            log.append((event, text))
+
+    def synthesize(text):
+        record("synthesis_start", text)
+        synthesis_started[text].set()
+        return text.upper()
+
+    def play(audio):
+        text = audio.lower()
+        following = chr(ord(text) + 1)
+        if following in synthesis_started:
+            # A serial pipeline would never get here first - the wait then times out and the order check fails
+            synthesis_started[following].wait(1.0)
+        played.append(audio)
+        record("playback_end", text)
+
+    stats = SpeechPipeline(synthesize, play).run(["a", "b", "c", "d"])
+
+    assert played == ["A", "B", "C", "D"]
+    assert stats["chunks"] == 4
+    for current, following in zip("abc", "bcd"):
+        assert log.index(("synthesis_start", following)) < log.index(("playback_end", current))
+    assert stats["first_audio_latency"] <= stats["wall_time"]
+
+
+def test_failed_chunk_goes_to_error_handler():
+    """A synthesis failure is handed to on_error and later chunks still play"""
+    played, failed = [], []
+
+    def synthesize(text):
+        if text == "bad":
+            raise RuntimeError("boom")
+        return text
+
+    heard = []
+    pipeline = SpeechPipeline(synthesize, played.append, on_error=lambda text, e: failed.append(text),
+                              on_chunk=heard.append)
+    pipeline.run(["ok", "bad", "fine"])
+
+    assert played == ["ok", "fine"]
+    assert failed == ["bad"]
+    assert heard == ["ok", "bad", "fine"]  # The failed chunk still goes out through the fallback
+
+
+def test_cancel_stops_both_stages():
+    """Cancelling stops playback and the synthesis worker"""
+    cancel = threading.Event()
+    synthesized = []
+
+    def synthesize(text):
+        synthesized.append(text)
+        return text
+
+    def play(audio):
+        cancel.set()
+
+    stats = SpeechPipeline(synthesize, play, max_ahead=1).run(iter(range(100)), cancel_event=cancel)
+    time.sleep(0.3)
+
+    assert stats["cancelled"]
+    assert len(synthesized) < 10
+
+
+def main():
+    """Run speech pipeline tests"""
+    test_synthesis_overlaps_playback()
+    test_failed_chunk_goes_to_error_handler()
+    test_cancel_stops_both_stages()
+    print("SUCCESS: Speech pipeline tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the speech-owner thread and its cancellable handles
+"""
+
+import sys
+import os
+import threading
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.speech_worker import SpeechWorker
+
+
+def test_all_speech_runs_on_one_thread_in_order():
+    """Utterances from many threads are serialized on the owner thread"""
+    spoken, threads = [], set()
+
+    def speak(handle):
+        threads.add(threading.current_thread().name)
+        spoken.append(handle.text)
+        return len(handle.text)
+
+    worker = SpeechWorker(speak)
+    engine_thread = worker.call(lambda: threading.current_thread().name)
+    handles = [worker.submit(text=f"line {i}") for i in range(5)]
+
+    assert handles[-1].wait(5)
+    assert spoken == [f"line {i}" for i in range(5)]
+    assert threads == {engine_thread}
+    assert handles[0].result == 6
+    assert handles[0].timings()["speaking"] is not None
+    worker.shutdown(5)
+
+
+def test_cancel_interrupts_current_and_skips_queued():
+    """cancel() stops the playing utterance; queued cancelled ones never start"""
+    started = []
+    interrupted = threading.Event()
+    speaking = threading.Event()
+
+    def speak(handle):
+        started.append(handle.text)
+        speaking.set()
+        handle.cancel_event.wait(5)
+
+    worker = SpeechWorker(speak, interrupt=interrupted.set)
+    first = worker.submit(text="long reply")
+    second = worker.submit(text="next reply")
+    assert speaking.wait(5)
+
+    second.cancel()
+    first.cancel()
+
+    assert first.wait(5) and second.wait(5)
+    assert interrupted.is_set()
+    assert started == ["long reply"]
+    assert first.cancelled and second.cancelled
+    worker.shutdown(5)
+
+
+def test_busy_covers_the_hand_off_to_the_speech_thread():
+    """busy never reads False between the thread taking an utterance off the queue and speaking it"""
+    speaking, release = threading.Event(), threading.Event()
+
+    def speak(handle):
+        speaking.set()
+        release.wait(5)
+
+    worker = SpeechWorker(speak)
+    for _ in range(200):
+        speaking.clear()
+        release.clear()
+        handle = worker.submit(text="hi")
+        while not speaking.is_set():
+            assert worker.busy
+        release.set()
+        assert handle.wait(5)
+        assert not worker.busy
+    worker.shutdown(5)
+
+
+def test_cancel_all_stops_current_and_queued():
+    """Everything submitted so far is cancelled; only the utterance already playing had started"""
+    started = []
+    speaking = threading.Event()
+
+    def speak(handle):
+        started.append(handle.text)
+        speaking.set()
+        handle.cancel_event.wait(5)
+
+    worker = SpeechWorker(speak)
+    handles = [worker.submit(text=f"line {i}") for i in range(3)]
+    assert speaking.wait(5)
+
+    worker.cancel_all()
+    assert all(handle.wait(5) and handle.cancelled for handle in handles)
+    assert started == ["line 0"] and not worker.busy
+    worker.shutdown(5)
+
+
+def test_errors_are_reported_on_the_handle():
+    """A failing utterance does not kill the speech thread"""
+    def speak(handle):
+        if handle.text == "bad":
+            raise RuntimeError("engine busy")
+        return True
+
+    worker = SpeechWorker(speak)
+    errors = []
+    bad = worker.submit(text="bad")
+    bad.add_done_callback(lambda handle: errors.append(handle.error))
+    good = worker.submit(text="good")
+
+    assert good.wait(5)
+    assert isinstance(errors[0], RuntimeError)
+    assert good.result is True
+    worker.shutdown(5)
+
+
+def main():
+    """Run speech worker tests"""
+    test_all_speech_runs_on_one_thread_in_order()
+    test_cancel_interrupts_current_and_skips_queued()
+    test_busy_covers_the_hand_off_to_the_speech_thread()
+    test_cancel_all_stops_current_and_queued()
+    test_errors_are_reported_on_the_handle()
+    print("SUCCESS: Speech worker tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the single-pass TTS text frontend
+"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.text_frontend import SubstitutionTable, enhance_for_hebrew_accent, benchmark
+
+
+def test_output_is_never_rewritten_again():
+    """A replacement that contains another rule's source is left alone"""
+    table = SubstitutionTable([('a', 'b'), ('b', 'c')])
+    assert table.apply("ab") == "bc"
+
+
+def test_longest_match_wins():
+    """Overlapping sources prefer the longest one at each position"""
+    table = SubstitutionTable([('מה', 'Ma'), ('מה נשמע', 'Ma nish-MA')])
+    assert table.apply("מה נשמע? מה") == "Ma nish-MA? Ma"
+
+
+def test_whole_word_and_case_options():
+    """Whole-word rules respect boundaries; ignore_case rules match any casing"""
+    table = SubstitutionTable([('no', 'lo', {'whole_word': True, 'ignore_case': True})])
+    assert table.apply("No, not now. no!") == "lo, not now. lo!"
+
+
+def test_followed_by_option():
+    """followed_by only rewrites when the lookahead matches"""
+    table = SubstitutionTable([('er', 'err', {'followed_by': r'\s'})])
+    assert table.apply("never ever") == "neverr ever"
+
+
+def test_duplicate_sources_rejected():
+    """Ambiguous tables fail at compile time, not mid-utterance"""
+    try:
+        SubstitutionTable([('hi', 'Shalom', {'ignore_case': True}), ('Hi', 'Hey')])
+    except ValueError:
+        return
+    assert False, "duplicate source was accepted"
+
+
+def test_hebrew_accent_frontend():
+    """Accent rewrites and Hebrew expressions are applied together"""
+    assert enhance_for_hebrew_accent("Hello! What do you think about this?") == \
+        "Shalom! Vhat do you zink about zis?"
+    assert enhance_for_hebrew_accent("Thanks, okay") == "toda, sababa"
+    # Whitespace is preserved (the old implementation collapsed it via split/join)
+    assert enhance_for_hebrew_accent("yes\n\nno") == "ken\n\nlo"
+
+
+def test_per_word_cache_matches_a_whole_text_pass():
+    """Rewriting word by word (cached) gives exactly the single-pass result, and the cache stays bounded"""
+    rules = [
+        ('th', 'z'), ('w', 'v'), ('er', 'err', {'followed_by': r'\s'}),
+        ('with', 'vith', {'whole_word': True}), ('no', 'lo', {'whole_word': True, 'ignore_case': True}),
+    ]
+    cached = SubstitutionTable(rules, cache_size=8)
+    uncached = SubstitutionTable(rules, cache_size=0)
+    text = "  No! never\twith them, whether or no...\n\nno-one withers with ever  "
+    for _ in range(2):
+        assert cached.apply(text) == uncached.apply(text) == \
+            "  lo! neverr\tvith zem, vhezerr or lo...\n\nlo-one vizers vith everr  "
+    assert cached.apply("never") == "never"
+    assert len(cached._words) <= 8
+
+
+def test_multi_word_sources_use_the_whole_text_pass():
+    """A source containing a space can't be matched word by word"""
+    table = SubstitutionTable([('מה נשמע', 'Ma nish-MA')])
+    assert not table._per_word
+    assert table.apply("אז מה נשמע?") == "אז Ma nish-MA?"
+
+
+def test_mixed_casings_do_not_grow_the_table():
+    """Every casing of a case-insensitive source is rewritten without adding entries at runtime"""
+    table = SubstitutionTable([('okay', 'sababa', {'ignore_case': True})], cache_size=0)
+    assert table.apply("okay OKAY Okay oKaY") == "sababa sababa sababa sababa"
+    assert table._exact == {} and table._folded == {"okay": "sababa"}
+
+
+def test_benchmark_includes_text_without_repetition():
+    """The benchmark also measures a cold word cache, not only repeated samples"""
+    results = benchmark(repeat=1, number=3)
+    assert set(results) == {"short", "reply", "long", "unique"}
+    assert all(row["compiled_us"] > 0 and row["chained_us"] > 0 for row in results.values())
+
+
+def main():
+    """Run text frontend tests"""
+    test_output_is_never_rewritten_again()
+    test_longest_match_wins()
+    test_whole_word_and_case_options()
+    test_followed_by_option()
+    test_duplicate_sources_rejected()
+    test_hebrew_accent_frontend()
+    test_per_word_cache_matches_a_whole_text_pass()
+    test_multi_word_sources_use_the_whole_text_pass()
+    test_mixed_casings_do_not_grow_the_table()
+    test_benchmark_includes_text_without_repetition()
+    print("SUCCESS: Text frontend tests passed")
+
+
+if __name__ == "__main__":
+    main()
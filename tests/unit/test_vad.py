@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the frame-energy voice activity detector
+"""
+
+import sys
+import os
+import math
+from array import array
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.vad import EnergyVAD, frame_rms
+
+
+def _tone(amplitude, n_samples=480):
+    """16-bit PCM sine frame with the given peak amplitude"""
+    samples = array('h', (int(amplitude * math.sin(i / 5.0)) for i in range(n_samples)))
+    return samples.tobytes()
+
+
+def test_frame_rms():
+    """RMS of a sine is amplitude / sqrt(2); silence is zero"""
+    assert frame_rms(_tone(0)) == 0.0
+    assert abs(frame_rms(_tone(10000)) - 10000 / math.sqrt(2)) < 200
+
+
+def test_speech_needs_sustained_energy_over_noise_floor():
+    """Short clicks are ignored; sustained speech flips the state and silence releases it"""
+    vad = EnergyVAD(threshold_ratio=3.0, min_threshold=300, attack_frames=3, release_frames=4)
+    for _ in range(20):
+        assert not vad.update(_tone(200))  # Room noise
+
+    assert not vad.update(_tone(8000))  # One click
+    assert not vad.update(_tone(200))
+
+    states = [vad.update(_tone(8000)) for _ in range(3)]
+    assert states == [False, False, True]
+
+    states = [vad.update(_tone(200)) for _ in range(4)]
+    assert states == [True, True, True, False]
+
+
+def test_echo_level_raises_threshold():
+    """Calibrating on playback echo keeps echo from counting as speech"""
+    vad = EnergyVAD(threshold_ratio=4.0, min_threshold=100, attack_frames=2)
+    for _ in range(20):
+        vad.observe_noise(frame_rms(_tone(2000)))
+
+    assert not any(vad.update(_tone(2500)) for _ in range(10))
+    assert any(vad.update(_tone(20000)) for _ in range(3))
+
+
+def main():
+    """Run VAD tests"""
+    test_frame_rms()
+    test_speech_needs_sustained_energy_over_noise_floor()
+    test_echo_level_raises_threshold()
+    print("SUCCESS: VAD tests passed")
+
+
+if __name__ == "__main__":
+    main()
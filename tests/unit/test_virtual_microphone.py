@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the file-backed virtual microphone and the STT benchmark helpers
+"""
+
+import sys
+import os
+import tempfile
+import time
+import wave
+from array import array
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import speech_recognition as sr
+
+from utils.virtual_microphone import FileMicrophone, load_wav_pcm, speech_bounds
+from utils.stt_benchmark import word_error_rate, load_references, summarize, run_benchmark
+from utils.latency_trace import LatencyTracer
+from utils.vad import frame_rms
+from tests.unit.streaming_chatbot import streaming_chatbot
+
+
+def _write_wav(path, pattern, rate=16000, channels=1):
+    """pattern: list of (level, seconds) square-wave segments"""
+    samples = array('h')
+    for level, seconds in pattern:
+        for value in [level, -level] * int(seconds * rate / 2):
+            samples.extend([value] * channels)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+def test_load_downmixes_and_resamples():
+    """Stereo 8 kHz input comes out as mono 16 kHz"""
+    path = os.path.join(tempfile.mkdtemp(), "stereo.wav")
+    _write_wav(path, [(1000, 0.5)], rate=8000, channels=2)
+    samples = load_wav_pcm(path, 16000)
+    assert abs(len(samples) - 8000) <= 2
+    assert max(abs(value) for value in samples) <= 1000
+
+
+def test_speech_bounds():
+    """Speech is located against the recording's own noise floor"""
+    path = os.path.join(tempfile.mkdtemp(), "turn.wav")
+    _write_wav(path, [(40, 0.3), (3000, 0.6), (40, 0.4)])
+    start, end = speech_bounds(load_wav_pcm(path, 16000), 16000)
+    assert abs(start - 0.3) < 0.04
+    assert abs(end - 0.9) < 0.04
+
+
+def test_paced_playback():
+    """rate=4 hands out one second of audio in about a quarter second"""
+    path = os.path.join(tempfile.mkdtemp(), "turn.wav")
+    _write_wav(path, [(3000, 1.0)])
+    microphone = FileMicrophone(rate=4.0, lead_seconds=0, tail_seconds=0, end_of_stream=True)
+    microphone.play(path)
+
+    start = time.perf_counter()
+    with microphone as source:
+        while source.stream.read(source.CHUNK):
+            pass
+    elapsed = time.perf_counter() - start
+
+    assert abs(microphone.position - 1.0) < 0.01
+    assert 0.2 < elapsed < 0.5
+
+
+def test_recognizer_listen_endpoints_after_speech():
+    """sr.Recognizer.listen accepts the virtual microphone and stops after the speech"""
+    path = os.path.join(tempfile.mkdtemp(), "turn.wav")
+    _write_wav(path, [(40, 0.3), (3000, 0.8), (40, 0.3)])
+    microphone = FileMicrophone(rate=0)
+    microphone.play(path)
+
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = 300
+    recognizer.dynamic_energy_threshold = False
+    recognizer.pause_threshold = 0.5
+    with microphone as source:
+        audio = recognizer.listen(source, timeout=3)
+
+    assert isinstance(audio, sr.AudioData)
+    latency = microphone.position - microphone.speech_end
+    assert 0.4 < latency < 0.8
+
+
+def test_word_error_rate_and_references():
+    """WER counts word edits; references come from .txt sidecars"""
+    assert word_error_rate("shalom ma nishma", "shalom ma nishma") == 0.0
+    assert abs(word_error_rate("shalom ma nishma", "shalom nishma") - 1 / 3.0) < 1e-9
+    assert word_error_rate("", "") == 0.0
+
+    directory = tempfile.mkdtemp()
+    wav_path = os.path.join(directory, "a.wav")
+    _write_wav(wav_path, [(3000, 0.1)])
+    with open(os.path.join(directory, "a.txt"), 'w', encoding='utf-8') as f:
+        f.write("hello there\n")
+    assert load_references([wav_path]) == {wav_path: "hello there"}
+
+    summary = summarize([{"endpoint_latency": 0.5, "recognition_latency": None, "wer": 0.0},
+                         {"endpoint_latency": 0.7, "recognition_latency": None, "wer": 0.5}])
+    assert abs(summary["endpoint_latency"]["mean"] - 0.6) < 1e-9
+    assert "recognition_latency" not in summary
+
+
+class LoudFrameSession:
+    """Offline-recognizer stand-in: hears "hello there" once loud audio arrives; finishing takes 50 ms"""
+
+    def __init__(self):
+        self.heard = False
+        self.endpoint = False
+
+    def feed(self, frame):
+        self.heard = self.heard or frame_rms(frame) > 1000
+        return "hello there" if self.heard else ""
+
+    def finish(self):
+        time.sleep(0.05)
+        return "hello there", 0.9
+
+
+def test_benchmark_times_the_streaming_backend():
+    """Endpoint and recognition latency are measured when text comes straight from streaming STT"""
+    path = os.path.join(tempfile.mkdtemp(), "turn.wav")
+    _write_wav(path, [(40, 0.3), (3000, 0.8), (40, 1.5)])
+    microphone = FileMicrophone(rate=0)
+    chatbot = streaming_chatbot(lambda rate: LoudFrameSession())
+
+    def listen_for_speech(timeout):
+        with microphone as source:
+            return chatbot._listen_streaming(source, timeout)
+
+    chatbot.listen_for_speech = listen_for_speech
+    chatbot.recognize_audio = None  # Never called on the streaming path
+
+    rows = run_benchmark(chatbot, microphone, [path], {path: "hello there"})
+    assert rows[0]["transcript"] == "hello there" and rows[0]["wer"] == 0.0
+    assert 0 < rows[0]["endpoint_latency"] < 1.5
+    assert 0.05 <= rows[0]["recognition_latency"] < 0.5
+    assert chatbot.tracer.begin_turn.__func__ is LatencyTracer.begin_turn  # Tracer hooks removed afterwards
+
+
+def main():
+    """Run virtual microphone tests"""
+    test_load_downmixes_and_resamples()
+    test_speech_bounds()
+    test_paced_playback()
+    test_recognizer_listen_endpoints_after_speech()
+    test_word_error_rate_and_references()
+    test_benchmark_times_the_streaming_backend()
+    print("SUCCESS: Virtual microphone tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the XTTS speaker latent cache and reference audio hashing
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from utils.xtts_runtime import SpeakerLatentCache, file_sha256
+
+
+class _Latent:
+    """Minimal tensor stand-in: what the cache calls before saving"""
+
+    def __init__(self, array):
+        self.array = np.asarray(array, dtype=np.float32)
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class CountingModel:
+    """Fake XTTS model that counts get_conditioning_latents calls"""
+
+    def __init__(self, make_latent=_Latent):
+        self.make_latent = make_latent
+        self.calls = []
+
+    def get_conditioning_latents(self, audio_path):
+        self.calls.append(audio_path)
+        with open(audio_path[0], "rb") as f:
+            seed = float(len(f.read()))
+        return self.make_latent([[seed, 1.0, 2.0]]), self.make_latent([seed, -1.0])
+
+    def parameters(self):
+        import torch  # Only reached when loading from disk (torch round-trip test)
+
+        return iter([torch.zeros(1)])
+
+
+def _reference(directory, content=b"RIFF fake reference audio"):
+    path = os.path.join(directory, "reference.wav")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_latents_are_computed_once_per_reference():
+    """Repeat calls for the same reference come from memory"""
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _reference(directory)
+        model = CountingModel()
+        cache = SpeakerLatentCache(cache_dir=os.path.join(directory, "latents"))
+
+        first = cache.get_latents(model, reference)
+        assert cache.get_latents(model, reference) is first
+        assert len(model.calls) == 1
+
+
+def test_latents_are_saved_as_npz():
+    """Computed latents land on disk under the model id and reference hash"""
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _reference(directory)
+        cache_dir = os.path.join(directory, "latents")
+        gpt_cond_latent, speaker_embedding = SpeakerLatentCache(cache_dir=cache_dir).get_latents(
+            CountingModel(), reference)
+
+        assert os.listdir(cache_dir) == [f"xtts_v2_{file_sha256(reference)}.npz"]
+        with np.load(os.path.join(cache_dir, os.listdir(cache_dir)[0])) as data:
+            assert np.array_equal(data["gpt_cond_latent"], gpt_cond_latent.array)
+            assert np.array_equal(data["speaker_embedding"], speaker_embedding.array)
+
+
+def test_latents_round_trip_through_disk():
+    """A fresh cache (a new process) loads the .npz instead of recomputing"""
+    torch = pytest.importorskip("torch")  # Loading rebuilds tensors on the model's device
+
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _reference(directory)
+        cache_dir = os.path.join(directory, "latents")
+        model = CountingModel(make_latent=lambda values: torch.tensor(values, dtype=torch.float32))
+        gpt_cond_latent, speaker_embedding = SpeakerLatentCache(cache_dir=cache_dir).get_latents(model, reference)
+
+        loaded = SpeakerLatentCache(cache_dir=cache_dir).get_latents(model, reference)
+        assert len(model.calls) == 1
+        assert torch.equal(loaded[0], gpt_cond_latent) and torch.equal(loaded[1], speaker_embedding)
+
+
+def test_changed_reference_invalidates_the_latents():
+    """New reference audio gets new latents, in memory and on disk"""
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _reference(directory)
+        cache_dir = os.path.join(directory, "latents")
+        model = CountingModel()
+        cache = SpeakerLatentCache(cache_dir=cache_dir)
+        before = cache.get_latents(model, reference)
+
+        _reference(directory, b"RIFF a different, longer reference recording")
+        os.utime(reference, ns=(0, os.stat(reference).st_mtime_ns + 1_000_000_000))
+        after = cache.get_latents(model, reference)
+
+        assert len(model.calls) == 2
+        assert after[0].array[0][0] != before[0].array[0][0]
+        assert len(os.listdir(cache_dir)) == 2
+
+
+def test_hash_is_memoized_on_size_and_mtime():
+    """The file is only re-read when its size or mtime changes"""
+    with tempfile.TemporaryDirectory() as directory:
+        reference = _reference(directory, b"AAAA")
+        original = file_sha256(reference)
+        stat = os.stat(reference)
+
+        # Same size and mtime: the memo answers without reading the new content
+        _reference(directory, b"BBBB")
+        os.utime(reference, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert file_sha256(reference) == original
+
+        os.utime(reference, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert file_sha256(reference) != original
+
+
+def main():
+    """Run XTTS runtime tests"""
+    test_latents_are_computed_once_per_reference()
+    test_latents_are_saved_as_npz()
+    test_latents_round_trip_through_disk()
+    test_changed_reference_invalidates_the_latents()
+    test_hash_is_memoized_on_size_and_mtime()
+    print("SUCCESS: XTTS runtime tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -113,7 +113,7 @@ class BarkuniVoiceComprehensiveTester:
         """Measure how long speech output takes"""
         start_time = time.time()
         try:
-            chatbot.speak(text)
+            chatbot.speak(text, wait=True)
             end_time = time.time()
             return end_time - start_time
         except Exception:
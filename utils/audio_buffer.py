@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+In-Memory Audio Playback
+Converts synthesized float waveforms to the mixer's PCM format and plays them
+through pygame.mixer.Sound without any temporary files
+"""
+
+import time
+
+
+def resample(wav, src_rate, dst_rate):
+    """Resample a mono float waveform (polyphase when scipy is available, linear otherwise)"""
+    import numpy as np
+
+    if src_rate == dst_rate or len(wav) == 0:
+        return wav
+
+    try:
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        g = gcd(int(src_rate), int(dst_rate))
+        return resample_poly(wav, int(dst_rate) // g, int(src_rate) // g).astype(np.float32)
+    except ImportError:
+        duration = len(wav) / float(src_rate)
+        dst_len = int(round(duration * dst_rate))
+        src_times = np.arange(len(wav)) / float(src_rate)
+        dst_times = np.arange(dst_len) / float(dst_rate)
+        return np.interp(dst_times, src_times, wav).astype(np.float32)
+
+
+def to_int16_pcm(wav, src_rate, dst_rate=None, channels=1):
+    """Convert a float (-1..1) or int16 waveform (or raw int16 bytes) to interleaved int16 PCM at dst_rate"""
+    import numpy as np
+
+    if isinstance(wav, (bytes, bytearray)):
+        wav = np.frombuffer(wav, dtype=np.int16)
+    wav = np.asarray(wav).reshape(-1)
+    if wav.dtype == np.int16:
+        wav = wav.astype(np.float32) / 32768.0
+    else:
+        wav = wav.astype(np.float32)
+
+    if dst_rate:
+        wav = resample(wav, src_rate, dst_rate)
+
+    pcm = (np.clip(wav, -1.0, 1.0) * 32767.0).astype(np.int16)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1).reshape(-1)
+    return pcm
+
+
+def make_sound(wav, sample_rate):
+    """Build a pygame Sound from a waveform, matching the initialized mixer format"""
+    import pygame
+
+    mixer = pygame.mixer.get_init()
+    if mixer is None:
+        raise RuntimeError("pygame.mixer is not initialized - call pygame.mixer.init() before playing audio")
+    mixer_rate, mixer_format, mixer_channels = mixer
+    if abs(mixer_format) != 16:
+        raise ValueError(f"Unsupported mixer sample format: {mixer_format}")
+
+    pcm = to_int16_pcm(wav, sample_rate, dst_rate=mixer_rate, channels=mixer_channels)
+    return pygame.mixer.Sound(buffer=pcm.tobytes())
+
+
+def play_buffer(wav, sample_rate, wait=True, poll_interval=0.02):
+    """Play a waveform from memory; returns the pygame Channel it is playing on"""
+    sound = make_sound(wav, sample_rate)
+    channel = sound.play()
+
+    if wait and channel is not None:
+        while channel.get_busy():
+            time.sleep(poll_interval)
+    return channel
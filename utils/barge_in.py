@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Barge-In Monitor
+Watches the microphone while the bot is speaking; as soon as the user starts
+talking it stops playback and captures the utterance for recognition
+"""
+
+import collections
+import threading
+
+from utils.vad import EnergyVAD, frame_rms
+
+
+def make_echo_vad():
+    """VAD for listening over our own playback: echo reaches the mic too, so require a clear margin over it"""
+    return EnergyVAD(threshold_ratio=4.0, attack_frames=5, release_frames=8)
+
+
+class BargeInMonitor:
+    """Background microphone watcher that interrupts speech on user voice activity"""
+
+    def __init__(self, microphone, on_barge_in, vad=None, calibration_seconds=0.3,
+                 pre_roll_seconds=0.3, end_silence_seconds=0.8, max_utterance_seconds=10.0):
+        """
+        microphone: a speech_recognition Microphone (or compatible AudioSource)
+        on_barge_in(): called once, from the monitor thread, when user speech starts
+        """
+        self.microphone = microphone
+        self.on_barge_in = on_barge_in
+        self.vad = vad or make_echo_vad()
+        self.calibration_seconds = calibration_seconds
+        self.pre_roll_seconds = pre_roll_seconds
+        self.end_silence_seconds = end_silence_seconds
+        self.max_utterance_seconds = max_utterance_seconds
+
+        self.triggered = threading.Event()
+        self.captured_audio = None
+        self.error = None
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching the microphone"""
+        self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop watching; an utterance already being captured is finished first"""
+        if not self.triggered.is_set():
+            self._stop.set()
+        self._done.wait(timeout)
+        return self.captured_audio
+
+    def wait_for_capture(self, timeout=None):
+        """Wait for the barged-in utterance to be fully captured"""
+        self._done.wait(timeout)
+        return self.captured_audio
+
+    def _run(self):
+        import speech_recognition as sr
+
+        try:
+            with self.microphone as source:
+                frame_seconds = float(source.CHUNK) / source.SAMPLE_RATE
+                calibration_frames = int(self.calibration_seconds / frame_seconds)
+                pre_roll = collections.deque(maxlen=max(1, int(self.pre_roll_seconds / frame_seconds)))
+                end_silence_frames = int(self.end_silence_seconds / frame_seconds)
+                max_frames = int(self.max_utterance_seconds / frame_seconds)
+
+                frames = []
+                silence_run = 0
+                frame_index = 0
+
+                while not self._stop.is_set():
+                    frame = source.stream.read(source.CHUNK)
+                    frame_index += 1
+
+                    if not self.triggered.is_set():
+                        # Learn the playback echo + room level before arming
+                        if frame_index <= calibration_frames:
+                            self.vad.observe_noise(frame_rms(frame, source.SAMPLE_WIDTH))
+                            pre_roll.append(frame)
+                            continue
+
+                        pre_roll.append(frame)
+                        if self.vad.update(frame, source.SAMPLE_WIDTH):
+                            self.triggered.set()
+                            frames.extend(pre_roll)
+                            try:
+                                self.on_barge_in()
+                            except Exception as e:
+                                print(f"ERROR: Barge-in callback error: {e}")
+                        continue
+
+                    frames.append(frame)
+                    if self.vad.update(frame, source.SAMPLE_WIDTH):
+                        silence_run = 0
+                    else:
+                        silence_run += 1
+
+                    if silence_run >= end_silence_frames or len(frames) >= max_frames:
+                        break
+
+                if frames:
+                    self.captured_audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        except Exception as e:
+            self.error = e
+            print(f"WARNING: Barge-in monitor stopped: {e}")
+        finally:
+            self._done.set()
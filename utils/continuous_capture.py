@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Continuous Capture
+Keeps the microphone open on a background thread, writes every frame into a
+preallocated ring buffer and cuts utterances (with pre-roll) on voice
+activity, so speech between turns is never lost and the device is opened once
+"""
+
+import queue
+import threading
+import time
+
+from utils.barge_in import make_echo_vad
+from utils.endpointing import AdaptiveEndpointer
+from utils.vad import EnergyVAD, frame_rms
+
+
+class SampleRingBuffer:
+    """Fixed-size int16 ring buffer addressed by absolute sample index"""
+
+    def __init__(self, capacity):
+        import numpy as np
+
+        self._np = np
+        self._data = np.zeros(int(capacity), dtype=np.int16)
+        self.capacity = int(capacity)
+        self.written = 0  # Total samples ever written (index of the next sample)
+        self._lock = threading.Lock()
+
+    @property
+    def oldest(self):
+        """Absolute index of the oldest sample still held"""
+        return max(0, self.written - self.capacity)
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones when full"""
+        with self._lock:
+            count = len(samples)
+            if count >= self.capacity:
+                self.written += count - self.capacity
+                samples = samples[-self.capacity:]
+                count = self.capacity
+
+            start = self.written % self.capacity
+            end = start + count
+            if end <= self.capacity:
+                self._data[start:end] = samples
+            else:
+                split = self.capacity - start
+                self._data[start:] = samples[:split]
+                self._data[:count - split] = samples[split:]
+            self.written += count
+
+    def read(self, start, end):
+        """Copy of samples [start, end) clipped to what is still in the buffer"""
+        with self._lock:
+            start = max(start, self.oldest)
+            end = min(end, self.written)
+            if end <= start:
+                return self._np.zeros(0, dtype=self._np.int16)
+
+            begin = start % self.capacity
+            stop = begin + (end - start)
+            if stop <= self.capacity:
+                return self._data[begin:stop].copy()
+            return self._np.concatenate((self._data[begin:], self._data[:stop - self.capacity]))
+
+
+class ContinuousCapture:
+    """Always-on microphone reader that queues complete utterances for recognition"""
+
+    def __init__(self, make_microphone, vad=None, pre_roll_seconds=0.3, end_silence_seconds=0.8,
+                 max_utterance_seconds=15.0, buffer_seconds=30.0, is_quiet=None, on_speech_start=None,
+                 listen_while_busy=False, max_queued=8, endpointer=None, echo_vad=None, echo_calibration_seconds=0.3):
+        """
+        make_microphone(): returns the speech_recognition Microphone to hold open
+        is_quiet(): False while the bot is talking; speech is then ignored unless listen_while_busy
+        on_speech_start(): called from the capture thread when an utterance begins (barge-in hook)
+        endpointer: decides when an utterance ends (default: adaptive, starting at end_silence_seconds)
+        echo_vad: stricter VAD used while the bot is talking (listen_while_busy); it is calibrated on the
+            playback echo for echo_calibration_seconds at the start of every reply, like the barge-in monitor
+        """
+        self.make_microphone = make_microphone
+        self.vad = vad or EnergyVAD()
+        self.echo_vad = echo_vad or make_echo_vad()
+        self.echo_calibration_seconds = echo_calibration_seconds
+        self.pre_roll_seconds = pre_roll_seconds
+        self.end_silence_seconds = end_silence_seconds
+        self.max_utterance_seconds = max_utterance_seconds
+        self.buffer_seconds = buffer_seconds
+        self.is_quiet = is_quiet or (lambda: True)
+        self.on_speech_start = on_speech_start
+        self.listen_while_busy = listen_while_busy
+        self.endpointer = endpointer or AdaptiveEndpointer(base_silence=end_silence_seconds,
+                                                           max_utterance=max_utterance_seconds)
+
+        self.utterances = queue.Queue(maxsize=max_queued)
+        self.ring = None
+        self.sample_rate = None
+        self.sample_width = None
+        self.error = None
+        self.stats = {"frames": 0, "utterances": 0, "dropped": 0}
+
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self, timeout=2.0):
+        """Open the microphone and start capturing"""
+        self._thread = threading.Thread(target=self._run, name="continuous-capture", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self.error:
+            raise self.error
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop capturing and release the microphone"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def get_utterance(self, timeout=None):
+        """Next complete utterance as sr.AudioData, or None on timeout"""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        """Drop utterances captured but not yet consumed"""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def _emit(self, start, end):
+        import speech_recognition as sr
+
+        samples = self.ring.read(start, end)
+        if not len(samples):
+            return
+        audio = sr.AudioData(samples.tobytes(), self.sample_rate, self.sample_width)
+        audio.captured_at = time.time()
+        try:
+            self.utterances.put_nowait(audio)
+        except queue.Full:
+            # Recognition is far behind - keep the newest speech
+            try:
+                self.utterances.get_nowait()
+                self.stats["dropped"] += 1
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(audio)
+        self.stats["utterances"] += 1
+
+    def _run(self):
+        import numpy as np
+
+        try:
+            with self.make_microphone() as source:
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                if self.sample_width != 2:
+                    raise ValueError("Continuous capture needs 16-bit audio")
+
+                self.ring = SampleRingBuffer(self.buffer_seconds * self.sample_rate)
+                pre_roll = int(self.pre_roll_seconds * self.sample_rate)
+                frame_seconds = float(source.CHUNK) / source.SAMPLE_RATE
+                self._ready.set()
+
+                echo_calibration_frames = int(self.echo_calibration_seconds / frame_seconds)
+
+                utterance_start = None
+                run_start = None
+                speech_run = 0
+                busy_frames = 0
+                vad = self.vad
+
+                while not self._stop.is_set():
+                    frame = source.stream.read(source.CHUNK)
+                    frame_start = self.ring.written
+                    self.ring.write(np.frombuffer(frame, dtype=np.int16))
+                    self.stats["frames"] += 1
+
+                    busy = not self.is_quiet()
+                    busy_frames = busy_frames + 1 if busy else 0
+                    if utterance_start is None:
+                        if busy and not self.listen_while_busy:
+                            # Our own voice is playing; don't learn it and don't cut it
+                            speech_run = 0
+                            continue
+                        vad = self.echo_vad if busy else self.vad
+                        if busy and busy_frames <= echo_calibration_frames:
+                            # A reply just started: learn its echo level before arming barge-in
+                            if busy_frames == 1:
+                                self.echo_vad.noise_floor = None
+                            self.echo_vad.observe_noise(frame_rms(frame, self.sample_width))
+                            speech_run = 0
+                            continue
+
+                    speech = vad.is_speech_frame(frame_rms(frame, self.sample_width))
+
+                    if utterance_start is None:
+                        if not speech:
+                            speech_run = 0
+                            continue
+                        if speech_run == 0:
+                            run_start = frame_start
+                        speech_run += 1
+                        if speech_run >= vad.attack_frames:
+                            # Include the pre-roll so the first syllable is never clipped
+                            utterance_start = max(self.ring.oldest, run_start - pre_roll)
+                            self.endpointer.reset()
+                            self.endpointer.update(True, (self.ring.written - run_start) / float(self.sample_rate))
+                            if self.on_speech_start:
+                                try:
+                                    self.on_speech_start()
+                                except Exception as e:
+                                    print(f"ERROR: Speech start callback error: {e}")
+                        continue
+
+                    if self.endpointer.update(speech, frame_seconds):
+                        self._emit(utterance_start, self.ring.written)
+                        utterance_start = None
+                        speech_run = 0
+        except Exception as e:
+            self.error = e
+            print(f"WARNING: Continuous capture stopped: {e}")
+        finally:
+            self._ready.set()
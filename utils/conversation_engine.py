@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Conversation Engine
+Event-driven voice conversation on asyncio: listening, recognition, response
+generation and speech are tasks linked by queues, with explicit state
+transitions and cancellation instead of a sleep-polling loop. Blocking
+backends run on a shared executor and speech completion is awaited through
+SpeechHandle callbacks, so one process can host many conversations
+"""
+
+import asyncio
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# Conversation states
+IDLE = "idle"
+LISTENING = "listening"
+RECOGNIZING = "recognizing"
+THINKING = "thinking"
+SPEAKING = "speaking"
+STOPPED = "stopped"
+
+TRANSITIONS = {
+    IDLE: {LISTENING, SPEAKING, STOPPED},
+    LISTENING: {RECOGNIZING, THINKING, SPEAKING, STOPPED},
+    RECOGNIZING: {LISTENING, THINKING, SPEAKING, STOPPED},
+    THINKING: {LISTENING, SPEAKING, STOPPED},
+    SPEAKING: {LISTENING, STOPPED},
+    STOPPED: set(),
+}
+
+_END = object()
+
+
+class _ChunkChannel:
+    """Thread-safe hand-off from the response generator to the speech thread"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.closed = False
+        self.chunks = []  # Everything generated, spoken or not
+        self.handle = None  # SpeechHandle playing this channel
+
+    def put(self, chunk):
+        self.chunks.append(chunk)
+        self._queue.put(chunk)
+
+    def close(self):
+        self.closed = True
+        self._queue.put(_END)
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is _END:
+                return
+            yield chunk
+
+
+class ConversationEngine:
+    """One voice conversation: capture -> recognize -> respond -> speak, as asyncio tasks"""
+
+    def __init__(self, capture, recognize, respond, speak, wait_speech=None, on_command=None,
+                 on_silence=None, on_turn=None, on_state=None, listen_timeout=10, full_duplex=False,
+                 barge_in=False, executor=None, error_backoff=1.0, on_turn_start=None):
+        """
+        capture(timeout): blocking; returns audio, already-recognized text, or None on silence
+        recognize(audio): blocking; returns text or None
+        respond(text): blocking iterable of reply chunks (drained on the executor)
+        speak(chunks): queues chunks for speech and returns a SpeechHandle (its spoken list is what was heard)
+        wait_speech(handle): optional blocking wait used instead of the handle callback (e.g. barge-in monitor)
+        on_command(text): None, or (reply, end_conversation) for special commands
+        on_silence(count): prompt to speak after `count` silent turns, or None
+        on_turn(user_text, reply_text): called after every answered turn
+        on_state(old, new): called on every state transition
+        on_turn_start(utterance): called when a captured utterance takes the floor, before it is recognized
+        full_duplex: capture keeps running while the bot talks (continuous capture)
+        barge_in: with full_duplex, a new utterance cuts the current reply short
+        executor: runs the blocking calls (default: one owned by each run(), abandoned on stop so a
+            capture still blocked in listen can't hold up shutdown)
+        """
+        self.capture = capture
+        self.recognize = recognize
+        self.respond = respond
+        self.speak = speak
+        self.wait_speech = wait_speech
+        self.on_command = on_command
+        self.on_silence = on_silence
+        self.on_turn = on_turn
+        self.on_state = on_state
+        self.on_turn_start = on_turn_start
+        self.listen_timeout = listen_timeout
+        self.full_duplex = full_duplex
+        self.barge_in = barge_in
+        self.executor = executor
+        self._own_executor = None
+        self.error_backoff = error_backoff
+
+        self.state = IDLE
+        self.silence_count = 0
+        self._loop = None
+        self._utterances = None
+        self._turns = None
+        self._idle = None
+        self._stopped = None
+        self._tasks = []
+        self._turn_task = None
+        self._handle = None
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        if state not in TRANSITIONS[self.state]:
+            raise RuntimeError(f"invalid conversation transition {self.state} -> {state}")
+        old, self.state = self.state, state
+        if self.on_state:
+            try:
+                self.on_state(old, state)
+            except Exception as e:
+                print(f"ERROR: State callback error: {e}")
+
+    @property
+    def running(self):
+        return self._stopped is not None and not self._stopped.is_set()
+
+
+    async def run(self, greeting=None):
+        """Run the conversation until stop() (or a command ends it)"""
+        self._loop = asyncio.get_running_loop()
+        self._utterances = asyncio.Queue()
+        self._turns = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._stopped = asyncio.Event()
+        if self.executor is None:
+            # Not the loop's default executor: asyncio.run() joins that one, and a blocked capture would stall it
+            self._own_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="conversation")
+
+        try:
+            if greeting:
+                await self.say(greeting)
+            self._set_state(LISTENING)
+            self._idle.set()
+
+            self._tasks = [
+                asyncio.create_task(self._listen_loop(), name="conversation-listen"),
+                asyncio.create_task(self._recognize_loop(), name="conversation-recognize"),
+                asyncio.create_task(self._turn_loop(), name="conversation-turns"),
+            ]
+            await self._stopped.wait()
+        finally:
+            await self._shutdown()
+
+    def stop(self):
+        """End the conversation (safe to call from any thread)"""
+        if self._loop is None or self._stopped is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._stopped.set()
+        else:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def _shutdown(self):
+        if self._stopped is not None:
+            self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        tasks = [task for task in self._tasks + [self._turn_task] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks, self._turn_task = [], None
+        if self._own_executor is not None:
+            self._own_executor.shutdown(wait=False, cancel_futures=True)
+            self._own_executor = None
+        self._set_state(STOPPED)
+
+    async def _blocking(self, fn, *args):
+        return await self._loop.run_in_executor(self.executor or self._own_executor, fn, *args)
+
+
+    async def _listen_loop(self):
+        """Capture utterances; half duplex only listens while no turn is in progress"""
+        while True:
+            if not self.full_duplex:
+                await self._idle.wait()
+            try:
+                utterance = await self._blocking(self.capture, self.listen_timeout)
+            except Exception as e:
+                print(f"ERROR: Listening failed: {e}")
+                await asyncio.sleep(self.error_backoff)
+                continue
+
+            if not self.full_duplex:
+                # Take the floor before the next capture can start
+                self._idle.clear()
+            await self._utterances.put(utterance)
+
+    async def _recognize_loop(self):
+        """Turn captured audio into text and hand it to the turn stage"""
+        while True:
+            utterance = await self._utterances.get()
+
+            if self.full_duplex:
+                if utterance is None and not self._idle.is_set():
+                    continue  # Quiet while the bot is talking is not the user being silent
+                await self._claim_turn()
+
+            if utterance is not None and self.on_turn_start:
+                # Full duplex captures run ahead of the reply; the turn itself only starts now
+                try:
+                    self.on_turn_start(utterance)
+                except Exception as e:
+                    print(f"ERROR: Turn start callback error: {e}")
+
+            if utterance is None or isinstance(utterance, str):
+                await self._turns.put(utterance)
+                continue
+
+            self._set_state(RECOGNIZING)
+            try:
+                text = await self._blocking(self.recognize, utterance)
+            except Exception as e:
+                print(f"ERROR: Recognition failed: {e}")
+                text = None
+            await self._turns.put(text)
+
+    async def _claim_turn(self):
+        """Wait for the current turn to end (or cut it short on barge-in), then take the floor"""
+        if not self._idle.is_set() and self.barge_in and self._turn_task and not self._turn_task.done():
+            print("BARGE-IN: User started talking - stopped speaking")
+            self._turn_task.cancel()
+        await self._idle.wait()
+        self._idle.clear()
+
+    async def _turn_loop(self):
+        """Answer each recognized utterance (or the silence) as its own cancellable task"""
+        while True:
+            text = await self._turns.get()
+            self._turn_task = asyncio.create_task(self._take_turn(text), name="conversation-turn")
+            await asyncio.wait({self._turn_task})
+            if not self._turn_task.cancelled() and self._turn_task.exception():
+                print(f"ERROR: Error in conversation turn: {self._turn_task.exception()}")
+            self._turn_task = None
+
+            if self.running:
+                self._set_state(LISTENING)
+                self._idle.set()
+
+    async def _take_turn(self, text):
+        if not text or not text.strip():
+            self.silence_count += 1
+            prompt = self.on_silence(self.silence_count) if self.on_silence else None
+            if prompt:
+                await self.say(prompt)
+            return
+
+        self.silence_count = 0
+        command = self.on_command(text) if self.on_command else None
+        if command:
+            reply, end_conversation = command
+            if reply:
+                await self.say(reply)
+            if end_conversation:
+                self.stop()
+            return
+
+        reply = await self.reply(text)
+        if self.on_turn:
+            self.on_turn(text, reply)
+
+
+    async def say(self, text):
+        """Speak a fixed line and wait for it to finish"""
+        self._set_state(SPEAKING)
+        channel = _ChunkChannel()
+        channel.put(text)
+        channel.close()
+        await self._speak(channel)
+
+    async def reply(self, text):
+        """Generate the reply on the executor while the speech thread plays it chunk by chunk"""
+        self._set_state(THINKING)
+        channel = _ChunkChannel()
+        loop = self._loop
+
+        def produce():
+            try:
+                for chunk in self.respond(text):
+                    if channel.closed:
+                        break
+                    if not channel.chunks:
+                        loop.call_soon_threadsafe(self._first_chunk)
+                    channel.put(chunk)
+            finally:
+                if not channel.closed:
+                    channel.close()
+
+        generation = asyncio.ensure_future(self._blocking(produce))
+        try:
+            await asyncio.gather(generation, self._speak(channel))
+        except asyncio.CancelledError:
+            if not channel.closed:
+                channel.close()
+            # Cut short (barge-in): keep the question and the part of the reply that was actually spoken
+            if self.on_turn:
+                try:
+                    self.on_turn(text, " ".join(getattr(channel.handle, "spoken", [])))
+                except Exception as e:
+                    print(f"ERROR: Turn callback error: {e}")
+            raise
+        return " ".join(channel.chunks)
+
+    def _first_chunk(self):
+        if self.state == THINKING:
+            self._set_state(SPEAKING)
+
+    async def _speak(self, channel):
+        handle = self._handle = channel.handle = self.speak(channel)
+        try:
+            if self.wait_speech:
+                await self._blocking(self.wait_speech, handle)
+            else:
+                done = self._loop.create_future()
+
+                def finished(_):
+                    self._loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+                handle.add_done_callback(finished)
+                await done
+        except asyncio.CancelledError:
+            handle.cancel()
+            raise
+        finally:
+            self._handle = None
+        return handle
+
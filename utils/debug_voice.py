@@ -23,7 +23,7 @@ def test_voice_initialization():
         if chatbot.voice_ready:
             print("\nTesting voice output...")
             test_text = "Shalom! This is a test of Barkuni's voice system!"
-            chatbot.speak(test_text)
+            chatbot.speak(test_text, wait=True)
             print("Voice test completed.")
         else:
             print("Voice system not ready!")
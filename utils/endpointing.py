@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Adaptive Endpointing
+Decides when the user has finished talking. The trailing-silence window
+follows the speaker's own pause statistics (fast talkers get a short window,
+slow ones a longer one) and shrinks when the partial transcript already
+looks complete; a hard cap replaces the fixed phrase time limit
+"""
+
+import argparse
+import collections
+import glob
+import os
+import wave
+
+from utils.vad import EnergyVAD, frame_rms
+
+# Sentence-final punctuation (Latin and Hebrew/Arabic question mark)
+_COMPLETE_ENDINGS = (".", "!", "?", "؟", "׃")
+# Words a sentence rarely ends on - more is coming
+_DANGLING_WORDS = {
+    "and", "or", "but", "so", "because", "the", "a", "an", "to", "of", "with", "if", "that",
+    "ו", "או", "אבל", "כי", "ש", "של", "עם", "את", "אם",
+}
+_QUESTION_STARTS = {
+    "what", "why", "how", "when", "where", "who", "which", "is", "are", "do", "does", "can", "could",
+    "will", "would", "should", "מה", "למה", "איך", "מתי", "איפה", "מי", "האם",
+}
+
+
+def looks_complete(text):
+    """Heuristic: does a (partial) transcript read like a finished sentence or question?"""
+    words = text.strip().lower().split()
+    if not words:
+        return False
+    if text.rstrip().endswith(_COMPLETE_ENDINGS):
+        return True
+    if words[-1] in _DANGLING_WORDS:
+        return False
+    # Recognizers often drop punctuation; a short question is complete once it has a few words
+    return words[0] in _QUESTION_STARTS and len(words) >= 3
+
+
+class AdaptiveEndpointer:
+    """Trailing-silence endpoint detector tuned by observed pauses and transcript completeness"""
+
+    def __init__(self, base_silence=0.8, min_silence=0.35, max_silence=1.5, pause_quantile=0.9,
+                 margin=1.25, complete_factor=0.6, max_utterance=15.0, history=50, min_samples=5, min_pause=0.15):
+        """
+        base_silence: window used until min_samples pauses have been observed
+        pause_quantile / margin: window = margin * that quantile of the speaker's mid-utterance pauses
+        min_pause: shorter gaps (between syllables and words) are not pauses and are not learned
+        complete_factor: window multiplier when the partial transcript looks complete
+        max_utterance: hard cap on one utterance (seconds)
+        """
+        self.base_silence = base_silence
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.pause_quantile = pause_quantile
+        self.margin = margin
+        self.complete_factor = complete_factor
+        self.max_utterance = max_utterance
+        self.min_samples = min_samples
+        self.min_pause = min_pause
+        self.pauses = collections.deque(maxlen=history)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (learned pause statistics are kept)"""
+        self.elapsed = 0.0
+        self.speech_seen = False
+        self.silence = 0.0
+        self.partial_text = ""
+
+    def observe_pause(self, seconds):
+        """Record a silence gap the speaker continued after (intra-word dips are ignored)"""
+        if seconds > 0 and seconds >= self.min_pause - 1e-9:  # Frame sums drift below exact multiples
+            self.pauses.append(seconds)
+
+    def silence_window(self, partial_text=None):
+        """Trailing silence (seconds) that ends the current utterance"""
+        if len(self.pauses) >= self.min_samples:
+            ordered = sorted(self.pauses)
+            index = min(len(ordered) - 1, int(self.pause_quantile * len(ordered)))
+            window = ordered[index] * self.margin
+        else:
+            window = self.base_silence
+
+        text = self.partial_text if partial_text is None else partial_text
+        if text and looks_complete(text):
+            window *= self.complete_factor
+        return max(self.min_silence, min(self.max_silence, window))
+
+    def update(self, is_speech, frame_seconds, partial_text=None):
+        """Feed one frame decision; returns True once the utterance should end"""
+        if is_speech or self.speech_seen:
+            # The hard cap counts from the first speech, not from when listening began
+            self.elapsed += frame_seconds
+        if partial_text is not None:
+            self.partial_text = partial_text
+
+        if is_speech:
+            if self.speech_seen and self.silence > 0:
+                # The speaker paused and went on - that gap is a mid-utterance pause
+                self.observe_pause(self.silence)
+            self.speech_seen = True
+            self.silence = 0.0
+        elif self.speech_seen:
+            self.silence += frame_seconds
+
+        if self.elapsed >= self.max_utterance:
+            return True
+        return self.speech_seen and self.silence >= self.silence_window()
+
+
+def measure_pauses(pcm, sample_rate, threshold, frame_seconds=0.03, sample_width=2, min_pause=0.15):
+    """Mid-utterance silence gaps (seconds, at least min_pause) in a captured utterance, for learning pause statistics"""
+    frame_bytes = int(sample_rate * frame_seconds) * sample_width
+    pauses, gap, speech_seen = [], 0.0, False
+    for offset in range(0, len(pcm) - frame_bytes + 1, frame_bytes):
+        if frame_rms(pcm[offset:offset + frame_bytes], sample_width) > threshold:
+            if speech_seen and gap > 0 and gap >= min_pause - 1e-9:
+                pauses.append(gap)
+            speech_seen, gap = True, 0.0
+        elif speech_seen:
+            gap += frame_seconds
+    return pauses
+
+
+def _read_wav(path):
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: need 16-bit mono audio")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def replay_session(pcm, sample_rate, endpointer, frame_seconds=0.03, vad=None):
+    """Run a recorded turn through VAD + endpointer; returns endpoint latency and whether it cut early"""
+    vad = vad or EnergyVAD()
+    frame_bytes = int(sample_rate * frame_seconds) * 2
+    frames = [pcm[i:i + frame_bytes] for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes)]
+    decisions = [vad.is_speech_frame(frame_rms(frame)) for frame in frames]
+    if not any(decisions):
+        return None
+
+    last_speech = (len(decisions) - 1 - decisions[::-1].index(True) + 1) * frame_seconds
+    endpointer.reset()
+    # Recordings end shortly after the speaker; pad with silence so every policy can fire
+    padded = decisions + [False] * int(endpointer.max_silence / frame_seconds + 2)
+    for index, speech in enumerate(padded):
+        if endpointer.update(speech, frame_seconds):
+            ended = (index + 1) * frame_seconds
+            return {"latency": max(0.0, ended - last_speech), "premature": ended < last_speech}
+    return None
+
+
+def benchmark(paths, configs, frame_seconds=0.03):
+    """Compare endpointing policies over recorded sessions (processed in order, so adaptation carries over)"""
+    sessions = []
+    for path in paths:
+        try:
+            sessions.append((path,) + _read_wav(path))
+        except (OSError, ValueError, wave.Error) as e:
+            print(f"WARNING: Skipping {path}: {e}")
+
+    results = {}
+    for name, make_endpointer in configs.items():
+        endpointer = make_endpointer()
+        latencies, premature = [], 0
+        for _, pcm, sample_rate in sessions:
+            outcome = replay_session(pcm, sample_rate, endpointer, frame_seconds)
+            if outcome is None:
+                continue
+            if outcome["premature"]:
+                premature += 1
+            else:
+                latencies.append(outcome["latency"])
+        latencies.sort()
+        results[name] = {
+            "sessions": len(latencies) + premature,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+            "p90_latency": latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))] if latencies else None,
+            "premature_cuts": premature,
+        }
+    return results
+
+
+def main():
+    """Benchmark fixed vs adaptive endpointing on recorded WAV sessions (python -m utils.endpointing)"""
+    parser = argparse.ArgumentParser(description="Endpointing benchmark")
+    parser.add_argument("inputs", nargs="*", default=[os.path.join("data", "processed_audio", "segments")],
+                        help="WAV files or directories of 16-bit mono recordings (one user turn each)")
+    parser.add_argument("--fixed", type=float, default=0.8, help="Fixed pause threshold to compare against")
+    parser.add_argument("--quantile", type=float, default=0.9)
+    parser.add_argument("--margin", type=float, default=1.25)
+    parser.add_argument("--min-silence", type=float, default=0.35)
+    parser.add_argument("--max-silence", type=float, default=1.5)
+    parser.add_argument("--min-pause", type=float, default=0.15, help="Shorter gaps are not learned as pauses")
+    args = parser.parse_args()
+
+    paths = []
+    for item in args.inputs:
+        paths.extend(sorted(glob.glob(os.path.join(item, "*.wav"))) if os.path.isdir(item) else [item])
+    if not paths:
+        print("ERROR: No recordings found")
+        return
+
+    configs = {
+        f"fixed {args.fixed:.2f}s": lambda: AdaptiveEndpointer(base_silence=args.fixed, min_silence=args.fixed,
+                                                            max_silence=args.fixed, min_samples=10 ** 9),
+        "adaptive": lambda: AdaptiveEndpointer(pause_quantile=args.quantile, margin=args.margin,
+                                               min_silence=args.min_silence, max_silence=args.max_silence,
+                                               min_pause=args.min_pause),
+    }
+
+    print(f"Endpointing benchmark over {len(paths)} recordings")
+    print("=" * 64)
+    print(f"{'policy':<16}{'sessions':>10}{'mean (ms)':>12}{'p90 (ms)':>12}{'premature':>12}")
+    for name, row in benchmark(paths, configs).items():
+        mean = f"{row['mean_latency'] * 1000:.0f}" if row["mean_latency"] is not None else "-"
+        p90 = f"{row['p90_latency'] * 1000:.0f}" if row["p90_latency"] is not None else "-"
+        print(f"{name:<16}{row['sessions']:>10}{mean:>12}{p90:>12}{row['premature_cuts']:>12}")
+
+
+if __name__ == "__main__":
+    main()
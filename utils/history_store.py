@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Conversation History Store
+Keeps a fixed-size ring of recent turns in memory, spills older turns to a
+JSONL file and folds them into an incrementally updated summary, and builds
+prompt context within a token budget - so long sessions use constant memory
+and constant prompt size. Reads like the list it replaces ({"user", "bot"}
+dicts, append / slicing / iteration over the recent turns). Eviction in
+batches and the stable context window keep the prompt prefix byte-identical
+across turns, so provider-side prompt caches keep hitting
+"""
+
+import collections
+import json
+import os
+import re
+import threading
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 bytes of UTF-8 per token, so Hebrew counts about double per character)"""
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+def _first_sentence(text, max_chars):
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3].rstrip() + "..."
+
+
+def extractive_summary(summary, entry, max_chars=1500):
+    """Fold one evicted turn into the running summary: one short note per turn, oldest notes dropped past max_chars"""
+    note = f"- User: {_first_sentence(entry.get('user', ''), 120)} | Reply: {_first_sentence(entry.get('bot', ''), 60)}"
+    notes = [line for line in summary.split("\n") if line] + [note]
+    while len(notes) > 1 and len("\n".join(notes)) > max_chars:
+        notes.pop(0)
+    return "\n".join(notes)
+
+
+class ConversationHistory:
+    """Recent turns in memory, older ones on disk and in a rolling summary"""
+
+    def __init__(self, max_recent=16, spill_path=None, summarize=None, summary_chars=1500, evict_batch=1):
+        """
+        max_recent: turns kept verbatim in memory
+        spill_path: JSONL file older turns are appended to (None keeps only the summary)
+        summarize(summary, entry, max_chars) -> new summary, called once per evicted turn
+        evict_batch: turns evicted at once when the ring overflows (the summary then changes less often)
+        """
+        self.max_recent = max_recent
+        self.evict_batch = max(1, min(evict_batch, max_recent))
+        self.spill_path = spill_path
+        self.summarize = summarize or extractive_summary
+        self.summary_chars = summary_chars
+        self.summary = ""
+        self.spilled = 0
+        self._recent = collections.deque()
+        self._context_start = None  # Absolute turn index the stable context window starts at
+        self._lock = threading.RLock()
+
+    # List-style access over the recent turns
+
+    def append(self, entry):
+        with self._lock:
+            self._recent.append(entry)
+            if len(self._recent) > self.max_recent:
+                keep = max(0, self.max_recent - self.evict_batch + 1)
+                while len(self._recent) > keep:
+                    self._evict(self._recent.popleft())
+
+    def pop(self, index=-1):
+        with self._lock:
+            entries = list(self._recent)
+            entry = entries.pop(index)
+            self._recent = collections.deque(entries)
+            self._context_start = None  # Indexes shifted - the next stable window starts fresh
+            return entry
+
+    def evict_oldest(self):
+        """Move the oldest recent turn out to disk and the summary (e.g. to free memory); returns it or None"""
+        with self._lock:
+            if not self._recent:
+                return None
+            entry = self._recent.popleft()
+            self._evict(entry)
+            return entry
+
+    def clear(self):
+        """Forget everything in memory, including the summary (the spill file is kept)"""
+        with self._lock:
+            self._recent.clear()
+            self.summary = ""
+            self._context_start = None
+
+    def __len__(self):
+        return len(self._recent)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._recent))
+
+    def __getitem__(self, index):
+        with self._lock:
+            return list(self._recent)[index]
+
+    def __bool__(self):
+        return bool(self._recent) or bool(self.summary)
+
+    @property
+    def turn_count(self):
+        """All turns so far, spilled ones included"""
+        return self.spilled + len(self._recent)
+
+    def _evict(self, entry):
+        if self.spill_path:
+            try:
+                directory = os.path.dirname(self.spill_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"WARNING: Could not spill conversation history: {e}")
+        try:
+            self.summary = self.summarize(self.summary, entry, self.summary_chars)
+        except Exception as e:
+            print(f"WARNING: History summary update failed: {e}")
+        self.spilled += 1
+
+    def all_turns(self):
+        """Every turn in order: the spilled ones read back from disk, then the recent ones"""
+        turns = []
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, 'r', encoding='utf-8') as f:
+                turns.extend(json.loads(line) for line in f if line.strip())
+        with self._lock:
+            turns.extend(self._recent)
+        return turns
+
+    def memory_bytes(self):
+        """Approximate bytes of text held in memory (recent turns plus summary)"""
+        with self._lock:
+            return len(self.summary.encode("utf-8")) + sum(
+                len(entry.get("user", "").encode("utf-8")) + len(entry.get("bot", "").encode("utf-8"))
+                for entry in self._recent)
+
+    def context(self, budget_tokens=800, estimate=estimate_tokens, stable=False):
+        """
+        (summary or None, newest recent turns that fit) within budget_tokens, oldest first.
+        stable=True keeps the window's first turn fixed while the turns since then still fit, and
+        when they stop fitting restarts it with only half the budget used - so for several turns in
+        a row the context only grows at the end (a cacheable prefix) instead of sliding every turn
+        """
+        with self._lock:
+            summary = self.summary or None
+            remaining = budget_tokens
+            if summary:
+                if estimate(summary) > budget_tokens:
+                    summary = None  # Larger than the whole budget - recent turns are worth more
+                else:
+                    remaining -= estimate(summary)
+
+            def cost(entry):
+                return estimate(entry.get("user", "")) + estimate(entry.get("bot", ""))
+
+            recent = list(self._recent)
+            if stable and self._context_start is not None and self._context_start >= self.spilled:
+                window = recent[self._context_start - self.spilled:]
+                if sum(cost(entry) for entry in window) <= remaining:
+                    return summary, window
+
+            fill = remaining // 2 if stable else remaining
+            turns = []
+            for entry in reversed(recent):
+                if cost(entry) > fill:
+                    break
+                turns.append(entry)
+                fill -= cost(entry)
+            if stable:
+                self._context_start = self.spilled + len(recent) - len(turns)
+        turns.reverse()
+        return summary, turns
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Provider HTTP Pool
+One keep-alive connection pool per process for the Claude / OpenAI clients
+(passed as their http_client), so every session and every turn reuses open
+TCP + TLS connections. A warm-up ping opens the connection before the first
+request, and again when a host has been idle long enough for its pooled
+connection to have been dropped
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ProviderHttpPool:
+    """Shared httpx.Client with keep-alive limits, last-use tracking per host and background warm-ups"""
+
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_expiry=120.0, rewarm_after=30.0):
+        """
+        max_connections / max_keepalive: pool limits across all sessions
+        keepalive_expiry: seconds an idle pooled connection is kept open
+        rewarm_after: idle seconds after which warm(only_if_idle=True) opens a fresh connection
+        """
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.rewarm_after = rewarm_after
+        self.warmups = 0
+        self._client = None
+        self._last_used = {}  # host -> monotonic time of the last request
+        self._warming = set()
+        self._lock = threading.Lock()
+
+    def client(self):
+        """The shared httpx.Client (created on first use)"""
+        with self._lock:
+            if self._client is None:
+                import httpx  # Installed with the anthropic / openai SDKs
+
+                self._client = httpx.Client(
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_keepalive,
+                                        keepalive_expiry=self.keepalive_expiry),
+                    event_hooks={"request": [self._on_request]},
+                )
+            return self._client
+
+    def _on_request(self, request):
+        with self._lock:
+            self._last_used[request.url.host] = time.monotonic()
+
+    def idle_for(self, url):
+        """Seconds since the last request to url's host (None if it was never contacted)"""
+        with self._lock:
+            last = self._last_used.get(urlsplit(url).hostname)
+        return None if last is None else time.monotonic() - last
+
+    def warm(self, url, only_if_idle=False, wait=False):
+        """
+        Open (or refresh) a pooled connection to url's host with a HEAD request in the background.
+        only_if_idle skips hosts used within rewarm_after seconds. Returns the thread, or None if skipped
+        """
+        host = urlsplit(url).hostname
+        idle = self.idle_for(url)
+        with self._lock:
+            if host in self._warming or (only_if_idle and idle is not None and idle < self.rewarm_after):
+                return None
+            self._warming.add(host)
+
+        thread = threading.Thread(target=self._ping, args=(url, host), name=f"http-warm-{host}", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def _ping(self, url, host):
+        try:
+            # Any status will do - the TCP + TLS session is what stays in the pool
+            self.client().head(url, timeout=10.0)
+            self.warmups += 1
+        except Exception as e:
+            print(f"WARNING: Could not warm connection to {host}: {e}")
+        finally:
+            with self._lock:
+                self._warming.discard(host)
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+def get_http_pool(**settings):
+    """The process-wide pool; settings apply only to the call that creates it"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProviderHttpPool(**settings)
+        return _pool
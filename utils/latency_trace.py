@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Turn Latency Tracing
+Timestamps every conversation turn at its stage boundaries (end of user
+speech, STT result, LLM first token / completion, first TTS chunk, playback
+start / end), keeps rolling p50/p95/p99 per stage, and exports finished
+turns to a JSONL trace plus a Prometheus-style text snapshot
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+# Turn timeline, in the order the marks normally arrive
+MARKS = ("speech_end", "stt_result", "llm_first_token", "llm_done", "tts_first_chunk", "playback_start", "playback_end")
+
+# Stage name -> (from mark, to mark)
+STAGES = collections.OrderedDict([
+    ("stt", ("speech_end", "stt_result")),
+    ("llm_first_token", ("stt_result", "llm_first_token")),
+    ("llm_total", ("stt_result", "llm_done")),
+    ("tts_first_chunk", ("llm_first_token", "tts_first_chunk")),
+    ("playback_wait", ("tts_first_chunk", "playback_start")),
+    ("response", ("speech_end", "playback_start")),
+    ("playback", ("playback_start", "playback_end")),
+    ("turn", ("speech_end", "playback_end")),
+])
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class TurnTrace:
+    """Wall-clock timestamps of one turn's stage boundaries"""
+
+    def __init__(self, turn_id, started_at=None):
+        self.turn_id = turn_id
+        self.started_at = started_at or time.time()
+        self.marks = {}
+
+    def mark(self, name, at=None):
+        """Record a boundary; the first timestamp wins (later chunks don't move it)"""
+        if name not in self.marks:
+            self.marks[name] = at if at is not None else time.time()
+
+    def durations(self):
+        """{stage: seconds} for every stage whose two boundaries were recorded"""
+        result = {}
+        for stage, (start, end) in STAGES.items():
+            if start in self.marks and end in self.marks:
+                result[stage] = max(0.0, self.marks[end] - self.marks[start])
+        return result
+
+    def to_dict(self):
+        return {
+            "turn": self.turn_id,
+            "started_at": self.started_at,
+            "marks": {name: self.marks[name] for name in MARKS if name in self.marks},
+            "stages": self.durations(),
+        }
+
+
+class RollingHistogram:
+    """Latency samples over the last `window` turns, with nearest-rank percentiles"""
+
+    def __init__(self, window=500):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0  # All-time, like a Prometheus counter
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyTracer:
+    """Collects turn traces from the listening, AI and speech threads"""
+
+    def __init__(self, trace_path=None, metrics_path=None, window=500, prefix="barkoni", parent=None):
+        """
+        trace_path: append one JSON line per finished turn
+        metrics_path: rewrite a Prometheus text snapshot after every turn
+        window: turns kept for the rolling percentiles
+        parent: tracer that also receives every finished turn (e.g. the server-wide one behind a session's)
+        """
+        self.parent = parent
+        self.trace_path = trace_path
+        self.metrics_path = metrics_path
+        self.prefix = prefix
+        self.collectors = []  # Extra callables(prefix) -> Prometheus text, appended to the snapshot
+        self.histograms = collections.OrderedDict((stage, RollingHistogram(window)) for stage in STAGES)
+        self.turns = 0
+        self.current = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Turns can finish on several threads at once (server sessions)
+
+    def begin_turn(self, speech_end=None):
+        """Open a trace for a new turn (an unanswered open turn is dropped)"""
+        with self._lock:
+            self.current = TurnTrace(self._next_id)
+            self._next_id += 1
+            if speech_end is not None:
+                self.current.mark("speech_end", speech_end)
+            return self.current
+
+    def mark(self, name, at=None):
+        """Timestamp a boundary of the open turn; ignored between turns"""
+        with self._lock:
+            if self.current is not None:
+                self.current.mark(name, at)
+
+    def end_turn(self):
+        """Close the open turn: update the histograms and write the exports"""
+        with self._lock:
+            trace, self.current = self.current, None
+        if trace is None:
+            return None
+        return self.add_trace(trace)
+
+    def add_trace(self, trace):
+        """Fold a finished TurnTrace into the histograms and exports, then pass it to the parent"""
+        with self._lock:
+            for stage, seconds in trace.durations().items():
+                self.histograms[stage].add(seconds)
+            self.turns += 1
+            record = trace.to_dict()
+
+        if self.trace_path:
+            self._append_trace(record)
+        if self.metrics_path:
+            self.write_prometheus(self.metrics_path)
+        if self.parent is not None:
+            self.parent.add_trace(trace)
+        return record
+
+    def _append_trace(self, record):
+        try:
+            directory = os.path.dirname(self.trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.trace_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"WARNING: Could not write latency trace: {e}")
+
+    def percentiles(self):
+        """{stage: {"p50", "p95", "p99", "count"}} for stages with samples"""
+        with self._lock:
+            result = {}
+            for stage, histogram in self.histograms.items():
+                if histogram.samples:
+                    result[stage] = {f"p{int(q * 100)}": histogram.percentile(q) for q in QUANTILES}
+                    result[stage]["count"] = histogram.count
+            return result
+
+    def prometheus_text(self):
+        """Rolling per-stage latency as a Prometheus summary (text exposition format)"""
+        name = f"{self.prefix}_turn_stage_seconds"
+        lines = [
+            f"# HELP {name} Conversation turn stage latency in seconds (rolling window)",
+            f"# TYPE {name} summary",
+        ]
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                if not histogram.samples:
+                    continue
+                for q in QUANTILES:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {histogram.percentile(q):.6f}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            lines.append(f"# HELP {self.prefix}_turns_total Conversation turns traced")
+            lines.append(f"# TYPE {self.prefix}_turns_total counter")
+            lines.append(f"{self.prefix}_turns_total {self.turns}")
+            collectors = list(self.collectors)
+        return "\n".join(lines) + "\n" + "".join(collector(self.prefix) for collector in collectors)
+
+    def write_prometheus(self, path):
+        """Atomically replace path with the current snapshot (textfile-collector friendly)"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = path + ".tmp"
+            with self._write_lock:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.prometheus_text())
+                os.replace(temp_path, path)
+        except OSError as e:
+            print(f"WARNING: Could not write latency metrics: {e}")
+
+    def print_report(self):
+        """Per-stage percentile table on the console"""
+        stats = self.percentiles()
+        if not stats:
+            print("No latency traces recorded")
+            return
+        print(f"\nTurn latency ({self.turns} turns)")
+        print("=" * 56)
+        print(f"{'stage':<18}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'turns':>8}")
+        for stage, row in stats.items():
+            print(f"{stage:<18}{row['p50'] * 1000:>10.0f}{row['p95'] * 1000:>10.0f}{row['p99'] * 1000:>10.0f}{row['count']:>8}")
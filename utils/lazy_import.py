@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+Module proxies that import their backend on first attribute access, so the
+chatbot only pays for the heavy libraries (TTS, torch, pygame, tkinter...)
+that the chosen mode actually uses - plus a per-import cost report
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+
+PROCESS_START = time.perf_counter()
+
+# (module name, seconds spent importing it) in load order
+_import_times = []
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time it is used"""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    _import_times.append((self._name, time.perf_counter() - start))
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return a proxy for module `name` without importing it yet"""
+    return LazyModule(name)
+
+
+def module_available(*names):
+    """True if every named module can be imported (checked without importing it)"""
+    for name in names:
+        try:
+            if importlib.util.find_spec(name) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
+
+
+def import_times():
+    """Modules imported through lazy proxies so far, with their cost in seconds"""
+    with _lock:
+        return list(_import_times)
+
+
+def print_startup_profile(label="Startup"):
+    """Print per-import cost and total time since the process started"""
+    elapsed = time.perf_counter() - PROCESS_START
+    times = import_times()
+
+    print(f"\n{label} profile")
+    print("=" * 40)
+    if times:
+        for name, seconds in sorted(times, key=lambda item: item[1], reverse=True):
+            print(f"{name:<28}{seconds * 1000:>9.1f} ms")
+    else:
+        print("No heavy backends imported")
+    print("-" * 40)
+    print(f"{'lazy imports total':<28}{sum(seconds for _, seconds in times) * 1000:>9.1f} ms")
+    print(f"{'since process start':<28}{elapsed * 1000:>9.1f} ms")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Hedged LLM Dispatch
+Streams a reply from the primary provider and, if its first token is later
+than that provider's recent p95 time-to-first-token, fires the same request
+at the next provider. Whichever produces a token first wins and the other
+request is cancelled (its HTTP stream closed). Per-provider latency is
+tracked, and a circuit breaker routes around a provider that keeps failing
+"""
+
+import queue
+import threading
+import time
+
+from utils.latency_trace import RollingHistogram
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CancelToken:
+    """Set by the dispatcher when a leg loses; callbacks (e.g. stream.close) run when it is set"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def add_callback(self, callback):
+        """Run callback on cancel (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def set(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # Closing a stream mid-read may raise; the leg is abandoned either way
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; after cooldown exactly one trial request is let
+    through (half-open) until it succeeds or fails. Not locked itself - HedgedDispatcher calls it under its lock
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return CLOSED
+        return HALF_OPEN if time.monotonic() - self.opened_at >= self.cooldown else OPEN
+
+    def available(self):
+        """Would a request be let through now"""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self.trial_in_flight)
+
+    def try_acquire(self):
+        """Claim the right to send a request: always while closed, once (the trial) while half-open"""
+        if not self.available():
+            return False
+        if self.state == HALF_OPEN:
+            self.trial_in_flight = True
+        return True
+
+    def release(self):
+        """The trial was abandoned without an answer (e.g. it lost a race) - let another one through"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()  # (Re)open - a failed trial restarts the cooldown
+        self.trial_in_flight = False
+
+
+class HedgedDispatcher:
+    """Latency-aware routing over an ordered list of providers (primary first); shared by every conversation"""
+
+    def __init__(self, providers, hedge_quantile=0.95, default_delay=1.5, min_delay=0.3, max_delay=5.0,
+                 min_samples=5, window=200, failure_threshold=3, cooldown=30.0):
+        """
+        providers: provider names, most preferred first
+        hedge_quantile: the primary's time-to-first-token quantile after which the hedge fires
+        default_delay: hedge delay until min_samples latencies are known; min/max_delay clamp the quantile
+        failure_threshold / cooldown: circuit breaker settings per provider
+        """
+        self.providers = list(providers)
+        self.hedge_quantile = hedge_quantile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.latency = {name: RollingHistogram(window) for name in self.providers}
+        self.breakers = {name: CircuitBreaker(failure_threshold, cooldown) for name in self.providers}
+        self.wins = {name: 0 for name in self.providers}
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, name):
+        """Seconds to wait for name's first token before hedging"""
+        with self._lock:
+            histogram = self.latency[name]
+            if len(histogram.samples) < self.min_samples:
+                return self.default_delay
+            return min(self.max_delay, max(self.min_delay, histogram.percentile(self.hedge_quantile)))
+
+    def route(self):
+        """Providers to try in order - open (or mid-trial half-open) breakers are skipped, unless all are"""
+        with self._lock:
+            available = [name for name in self.providers if self.breakers[name].available()]
+        return available or list(self.providers)
+
+    def _record(self, name, ok, first_token=None):
+        with self._lock:
+            if ok:
+                self.breakers[name].record_success()
+                if first_token is not None:
+                    self.latency[name].add(first_token)
+            else:
+                state = self.breakers[name].state
+                self.breakers[name].record_failure()
+                if state != OPEN and self.breakers[name].state == OPEN:
+                    print(f"WARNING: {name} keeps failing - routing around it for {self.breakers[name].cooldown:.0f}s")
+
+    def _run_leg(self, name, start, cancel, events):
+        stream = None
+        try:
+            stream = start(cancel)
+            for text in stream:
+                if cancel.is_set():
+                    break
+                if text:
+                    events.put(("token", name, text))
+            events.put(("done", name, None))
+        except Exception as e:
+            events.put(("error", name, e))
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    def stream(self, legs):
+        """
+        Yield the winning provider's text deltas.
+        legs: {name: start(cancel) -> iterable of text}; start should register a way to abort its
+        request with cancel.add_callback and stop when cancel.is_set()
+        """
+        pending = [name for name in self.providers if name in legs]
+        events = queue.Queue()
+        cancels, started = {}, {}
+        claimed, recorded = set(), set()
+
+        def launch(name):
+            cancels[name] = CancelToken()
+            started[name] = time.monotonic()
+            threading.Thread(target=self._run_leg, args=(name, legs[name], cancels[name], events),
+                             name=f"llm-{name}", daemon=True).start()
+
+        def launch_next():
+            # Skips providers whose breaker is open, or half-open with its one trial already in flight
+            while pending:
+                name = pending.pop(0)
+                with self._lock:
+                    allowed = self.breakers[name].try_acquire()
+                if allowed:
+                    claimed.add(name)
+                    launch(name)
+                    return name
+            return None
+
+        first = launch_next()
+        if first is None:
+            # Every breaker is open - trying the primary beats not answering at all
+            first = [name for name in self.providers if name in legs][0]
+            launch(first)
+        hedge_at = time.monotonic() + self.hedge_delay(first)
+        winner, failed, last_error = None, set(), None
+
+        try:
+            while True:
+                if winner is None and pending:
+                    try:
+                        kind, name, payload = events.get(timeout=max(0.0, hedge_at - time.monotonic()))
+                    except queue.Empty:
+                        # Primary is slower than its usual p95 - race the next provider
+                        if launch_next():
+                            with self._lock:
+                                self.hedges += 1
+                        continue
+                else:
+                    kind, name, payload = events.get()
+
+                if winner is not None and name != winner:
+                    continue  # Leftovers from a cancelled leg
+
+                if kind in ("token", "done") and winner is None:
+                    winner = name
+                    recorded.add(name)
+                    now = time.monotonic()
+                    self._record(name, True, now - started[name])
+                    with self._lock:
+                        self.wins[name] += 1
+                        for other in cancels:
+                            if other not in recorded and started[other] <= started[name]:
+                                # Overtaken with no first token yet: its time-to-first-token is at least
+                                # this (censored). Without it a slow primary's p95 only sees its fast wins
+                                self.latency[other].add(now - started[other])
+                    for other, cancel in cancels.items():
+                        if other != name:
+                            cancel.set()
+
+                if kind == "token":
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    recorded.add(name)
+                    self._record(name, False)
+                    if name == winner:
+                        raise payload  # Failed mid-reply - switching providers would repeat half a sentence
+                    failed.add(name)
+                    last_error = payload
+                    if launch_next() is None and failed == set(cancels):
+                        raise last_error  # Nobody left to try (the next one is launched at once otherwise)
+        finally:
+            for cancel in cancels.values():
+                cancel.set()
+            with self._lock:
+                for name in claimed - recorded:
+                    self.breakers[name].release()
+
+    def stats(self):
+        """{provider: {p50, p95, count, wins, breaker}} plus the number of hedges fired"""
+        with self._lock:
+            providers = {
+                name: {
+                    "p50": self.latency[name].percentile(0.5),
+                    "p95": self.latency[name].percentile(0.95),
+                    "count": self.latency[name].count,
+                    "wins": self.wins[name],
+                    "breaker": self.breakers[name].state,
+                }
+                for name in self.providers
+            }
+            return {"providers": providers, "hedges": self.hedges}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Microphone Discovery
+Probes the input devices once (open + short level test), ranks them and
+remembers the working one in a small cache file, so each turn opens only
+the known-good device instead of walking a list of candidates
+"""
+
+import json
+import os
+import time
+
+from utils.vad import frame_rms
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "microphone.json")
+
+
+def list_input_devices():
+    """[(device_index, name)] for every device with input channels"""
+    import speech_recognition as sr
+
+    pyaudio_module = sr.Microphone.get_pyaudio()
+    audio = pyaudio_module.PyAudio()
+    try:
+        devices = []
+        for index in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) > 0:
+                devices.append((index, info.get("name", f"device {index}")))
+        return devices
+    finally:
+        audio.terminate()
+
+
+def probe_device(device_index, seconds=0.2):
+    """Open a device and read a short burst; returns timing, level and whether it works"""
+    import speech_recognition as sr
+
+    result = {"device_index": device_index, "ok": False, "open_time": None, "rms": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        with sr.Microphone(device_index=device_index) as source:
+            result["open_time"] = time.perf_counter() - start
+            frames = max(1, int(seconds * source.SAMPLE_RATE / source.CHUNK))
+            levels = [frame_rms(source.stream.read(source.CHUNK), source.SAMPLE_WIDTH) for _ in range(frames)]
+            result["rms"] = sum(levels) / len(levels)
+            result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def rank_probes(probes, tie_tolerance=0.01):
+    """
+    Working devices first, then ones that hear something (all-zero input is usually a dead device), then fastest
+    to open - a device that opens within tie_tolerance seconds of the system default (device_index None) ties
+    with it, and the default wins the tie
+    """
+    default_time = next((p["open_time"] for p in probes if p["device_index"] is None), None)
+
+    def open_time(p):
+        if p["open_time"] is None:
+            return float("inf")
+        if default_time is not None and abs(p["open_time"] - default_time) <= tie_tolerance:
+            return default_time
+        return p["open_time"]
+
+    return sorted(
+        probes,
+        key=lambda p: (not p["ok"], p["rms"] <= 0.0, open_time(p), p["device_index"] is not None)
+    )
+
+
+class MicrophoneSelector:
+    """Picks the microphone once and persists the choice across runs"""
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, probe=probe_device, list_devices=list_input_devices):
+        self.cache_path = cache_path
+        self.probe = probe
+        self.list_devices = list_devices
+        self.device_index = None
+        self.device_name = None
+        self.probes = []
+
+    def select(self, force=False):
+        """Return the device index to use (None = system default), probing only if needed"""
+        try:
+            devices = self.list_devices()
+        except Exception as e:
+            print(f"WARNING: Could not list microphones: {e}")
+            return None
+
+        if not force:
+            cached = self._load_cache()
+            # The saved choice is only valid while the device list is unchanged
+            if cached and cached.get("devices") == [name for _, name in devices]:
+                self.device_index = cached.get("device_index")
+                self.device_name = cached.get("device_name")
+                return self.device_index
+
+        return self._discover(devices)
+
+    def invalidate(self):
+        """Forget the saved device (e.g. it failed to open or the hardware changed)"""
+        self.device_index = None
+        self.device_name = None
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            pass
+
+    def _discover(self, devices):
+        print("Probing microphones...")
+        names = dict(devices)
+        self.probes = rank_probes([self.probe(None)] + [self.probe(index) for index, _ in devices])
+
+        best = self.probes[0] if self.probes and self.probes[0]["ok"] else None
+        if best is None:
+            print("WARNING: No working microphone found")
+            return None
+
+        self.device_index = best["device_index"]
+        self.device_name = names.get(self.device_index, "default")
+        print(f"SUCCESS: Using microphone: {self.device_name}")
+        self._save_cache([name for _, name in devices])
+        return self.device_index
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, device_names):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "device_index": self.device_index,
+                    "device_name": self.device_name,
+                    "devices": device_names,
+                    "probed_at": time.time(),
+                }, f, indent=2)
+        except OSError as e:
+            print(f"WARNING: Could not save microphone choice: {e}")
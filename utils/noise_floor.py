@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Ambient Noise Tracker
+Samples the microphone in the background between turns and keeps an
+exponential moving average of the room's noise level, so a listen can set
+its energy threshold instantly instead of calibrating for half a second
+"""
+
+import threading
+import time
+
+from utils.vad import EnergyVAD, frame_rms
+
+
+class AmbientNoiseTracker:
+    """Background noise-floor estimate (EMA over frames captured between turns)"""
+
+    def __init__(self, make_microphone, threshold_ratio=1.5, min_threshold=50.0, alpha=0.05,
+                 initial_threshold=None, is_quiet=None):
+        """
+        make_microphone(): returns a fresh speech_recognition Microphone for the current device
+        is_quiet(): False while the bot is talking, so its own voice never raises the floor
+        """
+        self.make_microphone = make_microphone
+        self.is_quiet = is_quiet or (lambda: True)
+        initial_noise = initial_threshold / threshold_ratio if initial_threshold else None
+        self.model = EnergyVAD(threshold_ratio=threshold_ratio, min_threshold=min_threshold,
+                               noise_alpha=alpha, initial_noise=initial_noise)
+        self.frames_observed = 0
+        self.updated_at = None
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._pauses = 0  # Nested pause() calls (e.g. a listen inside a barge-in) each need their resume()
+        self._active = threading.Event()
+        self._released = threading.Event()
+        self._released.set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def noise_floor(self):
+        return self.model.noise_floor
+
+    @property
+    def energy_threshold(self):
+        """Threshold to hand to the recognizer for the next listen"""
+        with self._lock:
+            return self.model.threshold
+
+    def metrics(self):
+        """Current noise floor and threshold for monitoring"""
+        with self._lock:
+            return {
+                "noise_floor": self.model.noise_floor,
+                "energy_threshold": self.model.threshold,
+                "frames_observed": self.frames_observed,
+                "updated_at": self.updated_at,
+            }
+
+    def observe(self, rms):
+        """Fold one background frame level into the estimate; returns False for a frame that sounds like speech"""
+        with self._lock:
+            # The user may talk between turns - frames above the current threshold are not room noise
+            speech = self.model.noise_floor is not None and rms > self.model.threshold
+            if not speech:
+                self.model.observe_noise(rms)
+            self.frames_observed += 1
+            self.updated_at = time.time()
+            return not speech
+
+    def start(self):
+        """Start sampling in the background"""
+        self._active.set()
+        self._thread = threading.Thread(target=self._run, name="noise-floor", daemon=True)
+        self._thread.start()
+        return self
+
+    def pause(self, timeout=1.0):
+        """Stop sampling and release the device (before a listen or barge-in opens it)"""
+        with self._state_lock:
+            self._pauses += 1
+            self._active.clear()
+        self._released.wait(timeout)
+
+    def resume(self):
+        """Resume background sampling once every pause() has been matched"""
+        with self._state_lock:
+            self._pauses = max(0, self._pauses - 1)
+            if self._pauses == 0:
+                self._active.set()
+
+    def stop(self, timeout=1.0):
+        """Stop the sampler thread for good"""
+        self._stop.set()
+        self._active.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._active.wait()
+            if self._stop.is_set():
+                break
+
+            with self._state_lock:
+                # pause() may have slipped in after the wait
+                if not self._active.is_set():
+                    continue
+                self._released.clear()
+            try:
+                with self.make_microphone() as source:
+                    while self._active.is_set() and not self._stop.is_set():
+                        frame = source.stream.read(source.CHUNK)
+                        if self.is_quiet():
+                            self.observe(frame_rms(frame, source.SAMPLE_WIDTH))
+            except Exception as e:
+                if self.error is None:
+                    print(f"WARNING: Background noise sampling stopped: {e}")
+                self.error = e
+                # Don't spin on a broken device; a later resume() tries again
+                self._active.clear()
+            finally:
+                self._released.set()
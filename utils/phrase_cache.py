@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+TTS Phrase Cache
+Content-addressed on-disk store of rendered utterances with a size cap and
+LRU eviction, so repeated phrases play without running TTS inference
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+import wave
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Normalize text for cache keys (Unicode NFC, collapsed whitespace; case is kept since TTS voices it)"""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class PhraseCache:
+    """Rendered audio keyed by (text, voice backend, reference audio hash, speed, language)"""
+
+    def __init__(self, cache_dir=os.path.join("cache", "phrases"), max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index = OrderedDict()  # key -> file size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def make_key(text, backend, reference_hash=None, speed=1.0, language="en"):
+        """Build the content address for a rendered phrase"""
+        payload = json.dumps(
+            [normalize_text(text), backend, reference_hash, round(float(speed), 3), language],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files on disk (oldest access time first)"""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._index
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """Return (int16 PCM bytes, sample_rate) for a cached phrase, or None"""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with wave.open(path, 'rb') as wf:
+                sample_rate = wf.getframerate()
+                pcm = wf.readframes(wf.getnframes())
+            os.utime(path)  # Persist recency for the next process
+        except (OSError, EOFError, wave.Error):
+            self._forget(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return pcm, sample_rate
+
+    def put(self, key, pcm, sample_rate):
+        """Store mono int16 PCM bytes and evict least recently used phrases over the size cap"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with wave.open(tmp_path, 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(int(sample_rate))
+                wf.writeframes(pcm)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"WARNING: Could not write phrase cache entry: {e}")
+            return False
+
+        with self._lock:
+            self._total_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            evicted = self._evict_locked()
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        return True
+
+    def _evict_locked(self):
+        """Drop least recently used keys until under the size cap (caller holds the lock)"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            old_key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(old_key)
+        return evicted
+
+    def _forget(self, key):
+        with self._lock:
+            self._total_bytes -= self._index.pop(key, 0)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
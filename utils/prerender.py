@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Phrase Pre-Rendering
+Renders fixed utterances with the active voice on a background worker so
+they are already in the phrase cache before the first conversation turn
+"""
+
+import threading
+import time
+
+
+class PhraseWarmup:
+    """Background worker that renders a list of phrases once the voice is ready"""
+
+    def __init__(self, phrases, render, is_cached=None, ready_event=None, on_progress=None):
+        self.phrases = list(dict.fromkeys(p for p in phrases if p and p.strip()))
+        self.render = render
+        self.is_cached = is_cached
+        self.ready_event = ready_event
+        self.on_progress = on_progress or self._print_progress
+
+        self.rendered = 0
+        self.already_cached = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="phrase-warmup", daemon=True)
+
+    def start(self):
+        """Start rendering in the background; returns immediately"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the worker to stop after the phrase it is rendering"""
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """Block until warm-up finishes; returns True if it did"""
+        return self._done.wait(timeout)
+
+    @property
+    def progress(self):
+        """Snapshot of warm-up progress"""
+        completed = self.rendered + self.already_cached + self.failed
+        return {
+            "total": len(self.phrases),
+            "completed": completed,
+            "rendered": self.rendered,
+            "already_cached": self.already_cached,
+            "failed": self.failed,
+            "finished": self._done.is_set(),
+            "elapsed": (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0,
+        }
+
+    def _run(self):
+        try:
+            # The voice (e.g. reference audio) may only be loaded after startup
+            if self.ready_event is not None:
+                while not self.ready_event.wait(0.5):
+                    if self._stop.is_set():
+                        return
+
+            self.started_at = time.time()
+            for text in self.phrases:
+                if self._stop.is_set():
+                    break
+                try:
+                    if self.is_cached and self.is_cached(text):
+                        self.already_cached += 1
+                    else:
+                        self.render(text)
+                        self.rendered += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"WARNING: Pre-render failed for '{text[:40]}': {e}")
+                self.on_progress(self.progress)
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+    @staticmethod
+    def _print_progress(progress):
+        if progress["completed"] == progress["total"]:
+            print(f"SUCCESS: Pre-rendered {progress['total']} fixed phrases "
+                  f"({progress['rendered']} new, {progress['already_cached']} cached) "
+                  f"in {progress['elapsed']:.1f}s")
+        elif progress["completed"] % 5 == 0:
+            print(f"PRERENDER: {progress['completed']}/{progress['total']} phrases ready")
@@ -9,6 +9,11 @@ import random
 from pathlib import Path
 import json
 
+try:
+    from utils.text_frontend import SubstitutionTable
+except ImportError:
+    from text_frontend import SubstitutionTable
+
 class RealisticBarkuniVoice:
     def __init__(self):
         """Initialize realistic Barkuni voice system"""
@@ -70,20 +75,17 @@ class RealisticBarkuniVoice:
             'מה גרם לך': 'Ma ga-RAM le-CHA'
         }
 
+        # No word boundaries: Hebrew attaches prefixes (ו, ה, ב...) directly to words
+        self.pronunciation_frontend = SubstitutionTable(
+            list(self.hebrew_pronunciations.items()) + [('!', ', '), ('?', ', ')]
+        )
+
     def improve_hebrew_pronunciation(self, text):
         """Improve Hebrew pronunciation in text"""
 
-        # Replace Hebrew words with phonetic equivalents
-        improved_text = text
-
-        for hebrew, pronunciation in self.hebrew_pronunciations.items():
-            improved_text = improved_text.replace(hebrew, pronunciation)
-
-        # Add pauses for natural speech
-        improved_text = improved_text.replace('!', ', ')
-        improved_text = improved_text.replace('?', ', ')
-
-        return improved_text
+        # Replace Hebrew words with phonetic equivalents and add pauses for
+        # natural speech (! and ? become commas) in a single pass
+        return self.pronunciation_frontend.apply(text)
 
     def speak_as_barkuni(self, text):
         """Speak text as Barkuni with Hebrew accent"""
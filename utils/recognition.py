@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Speech Recognition Stage
+Pluggable recognizer backends (cloud, or offline streaming with partial
+results) and a concurrent multi-language front end: every language variant
+is sent at once and the most confident answer wins
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class RecognizerBackend(ABC):
+    """Interface: recognize(audio, language) -> [(transcript, confidence), ...] best first"""
+
+    name = "backend"
+
+    @abstractmethod
+    def recognize(self, audio, language):
+        """Return alternatives for the audio, or [] if nothing was understood"""
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition"""
+
+    name = "google"
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio, language):
+        import speech_recognition as sr
+
+        try:
+            response = self.recognizer.recognize_google(audio, language=language, show_all=True)
+        except sr.UnknownValueError:
+            return []
+
+        # show_all gives {"alternative": [...], "final": ...} or [] when nothing was heard;
+        # only the top alternative usually carries a confidence
+        alternatives = response.get("alternative", []) if isinstance(response, dict) else []
+        return [
+            (alt["transcript"], float(alt.get("confidence", 0.0)))
+            for alt in alternatives if alt.get("transcript", "").strip()
+        ]
+
+
+_vosk_models = {}
+_vosk_lock = threading.Lock()
+
+
+def get_vosk_model(model_path):
+    """Load a Vosk model once per process (they take seconds and hundreds of MB)"""
+    with _vosk_lock:
+        model = _vosk_models.get(model_path)
+        if model is None:
+            from vosk import Model, SetLogLevel
+
+            SetLogLevel(-1)
+            print(f"Loading offline speech model: {model_path}")
+            model = Model(model_path)
+            _vosk_models[model_path] = model
+        return model
+
+
+class VoskSession:
+    """One streaming utterance: feed() PCM as it arrives, finish() for the transcript"""
+
+    def __init__(self, model, sample_rate):
+        from vosk import KaldiRecognizer
+
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.recognizer.SetWords(True)
+        self.segments = []
+        self.words = []
+        self.endpoint = False
+
+    def _take(self, result):
+        text = result.get("text", "").strip()
+        if text:
+            self.segments.append(text)
+            self.words.extend(result.get("result", []))
+
+    def feed(self, pcm):
+        """Add 16-bit mono PCM; returns the current hypothesis (partial until an endpoint)"""
+        if self.recognizer.AcceptWaveform(pcm):
+            # The engine detected the end of a phrase; its text is now final
+            self._take(json.loads(self.recognizer.Result()))
+            self.endpoint = True
+            return " ".join(self.segments)
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(self.segments + [partial]).strip()
+
+    def finish(self):
+        """Final (transcript, confidence); confidence is the mean word confidence"""
+        self._take(json.loads(self.recognizer.FinalResult()))
+        confidences = [word.get("conf", 0.0) for word in self.words]
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return " ".join(self.segments), confidence
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline, CPU-only recognizer with partial results (one model per language)"""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path, language="en-US"):
+        self.language = language
+        self.model = get_vosk_model(model_path)
+
+    def start_stream(self, sample_rate):
+        """Begin a streaming utterance at the microphone's sample rate"""
+        return VoskSession(self.model, sample_rate)
+
+    def recognize(self, audio, language):
+        if language != self.language:
+            return []
+        session = self.start_stream(audio.sample_rate)
+        session.feed(audio.get_raw_data(convert_width=2))
+        text, confidence = session.finish()
+        return [(text, confidence)] if text else []
+
+
+class ConcurrentRecognizer:
+    """Recognize all language variants in parallel and keep the most confident result"""
+
+    def __init__(self, backend, languages=("he-IL", "en-US"), timeout=6.0, accept_confidence=0.85,
+                 max_workers=None):
+        """
+        languages: in preference order (wins ties)
+        accept_confidence: a result at least this confident is returned without waiting for the rest
+        max_workers: pooled threads (default: one per language); a call that finds them all busy, e.g.
+            held by stragglers from an earlier turn, gets a thread of its own instead of queueing
+        """
+        self.backend = backend
+        self.languages = list(languages)
+        self.timeout = timeout
+        self.accept_confidence = accept_confidence
+        self.max_workers = max_workers or len(self.languages)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="recognize")
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+
+    def _release_worker(self, future):
+        with self._busy_lock:
+            self._busy -= 1
+
+    def _submit(self, audio, language):
+        with self._busy_lock:
+            pooled = self._busy < self.max_workers
+            if pooled:
+                self._busy += 1
+        if pooled:
+            future = self._executor.submit(self._recognize_one, audio, language)
+            future.add_done_callback(self._release_worker)  # Also runs when cancelled before starting
+            return future
+
+        # Waiting in the queue would eat into this turn's timeout
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._recognize_one(audio, language))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"recognize-{language}", daemon=True).start()
+        return future
+
+    def _recognize_one(self, audio, language):
+        start = time.perf_counter()
+        alternatives = self.backend.recognize(audio, language)
+        if not alternatives:
+            return None
+        text, confidence = alternatives[0]
+        return {
+            "text": text,
+            "confidence": confidence,
+            "language": language,
+            "backend": getattr(self.backend, "name", "backend"),
+            "latency": time.perf_counter() - start,
+        }
+
+    def recognize(self, audio):
+        """Best result as {text, confidence, language, backend, latency}, or None"""
+        start = time.perf_counter()
+        futures = {self._submit(audio, language): rank
+                   for rank, language in enumerate(self.languages)}
+        pending = set(futures)
+        best, best_key = None, None
+
+        while pending:
+            remaining = self.timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # One failed variant (network, quota...) must not sink the others
+                    print(f"WARNING: Recognition failed: {e}")
+                    continue
+                if result is None:
+                    continue
+
+                key = (result["confidence"], -futures[future])
+                if best_key is None or key > best_key:
+                    best, best_key = result, key
+
+            if best is not None and best["confidence"] >= self.accept_confidence:
+                break
+
+        # Stragglers are ignored; the ones not started yet are dropped
+        for future in pending:
+            future.cancel()
+
+        if best is not None:
+            best["wall_time"] = time.perf_counter() - start
+        return best
+
+    def shutdown(self):
+        """Release the worker threads"""
+        self._executor.shutdown(wait=False)
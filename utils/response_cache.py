@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Replies to short, common user inputs ("shalom", "ma nishma", "hi") keyed on
+the normalized text, the character and a hash of the recent conversation, so
+repeated openers skip the provider round-trip. Entries expire after a TTL,
+the least recently used key is evicted past max_entries, and each key keeps
+several reply variants so cached answers don't sound canned
+"""
+
+import collections
+import hashlib
+import random
+import re
+import threading
+import time
+
+_NON_WORD = re.compile(r"[^\w\s]", re.UNICODE)
+_NIQQUD = re.compile(r"[֑-ׇ]")  # Hebrew vowel points and cantillation marks
+
+
+def normalize_text(text):
+    """Lowercase, no punctuation or Hebrew vowel points, single spaces"""
+    text = _NIQQUD.sub("", text.lower())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def context_hash(turns):
+    """Short hash of the recent turns ({"user", "bot"} dicts) a reply depends on - "" for a fresh conversation"""
+    if not turns:
+        return ""
+    digest = hashlib.sha1()
+    for entry in turns:
+        digest.update(normalize_text(entry.get("user", "")).encode("utf-8") + b"\x00")
+        digest.update(normalize_text(entry.get("bot", "")).encode("utf-8") + b"\x00")
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """TTL + LRU cache of reply variants, shared by every conversation that opts in"""
+
+    def __init__(self, characters=None, ttl=6 * 3600, max_entries=500, variants=3, max_words=6, context_turns=2):
+        """
+        characters: character names that opt in (None = every character)
+        ttl: seconds a cached reply stays usable
+        variants: replies collected per key before it serves from cache (1 = always the same reply)
+        max_words: longer inputs are never cached - only short openers repeat
+        context_turns: recent turns folded into the key
+        """
+        self.characters = {name.lower() for name in characters} if characters else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.variants = max(1, variants)
+        self.max_words = max_words
+        self.context_turns = context_turns
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()  # key -> [(reply, stored_at), ...], least recently used first
+        self._last_served = {}
+        self._lock = threading.Lock()
+
+    def enabled_for(self, character_name):
+        return self.characters is None or character_name.lower() in self.characters
+
+    def make_key(self, character_name, user_input, history=()):
+        """Cache key for this input and conversation state, or None if it should not be cached"""
+        if not self.enabled_for(character_name):
+            return None
+        text = normalize_text(user_input)
+        if not text or len(text.split()) > self.max_words:
+            return None
+        recent = list(history)[-self.context_turns:] if self.context_turns else []
+        return (character_name.lower(), text, context_hash(recent))
+
+    def get(self, key):
+        """A cached reply once the key has all its variants (never the same one twice in a row), else None"""
+        if key is None:
+            return None
+        with self._lock:
+            variants = self._fresh(key)
+            if len(variants) < self.variants:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            choices = [reply for reply, _ in variants if reply != self._last_served.get(key)] or [variants[0][0]]
+            reply = random.choice(choices)
+            self._last_served[key] = reply
+            self.hits += 1
+            return reply
+
+    def put(self, key, reply):
+        """Add a provider reply as another variant of key (the oldest variant is replaced once full)"""
+        reply = (reply or "").strip()
+        if key is None or not reply:
+            return
+        with self._lock:
+            variants = self._fresh(key)
+            if any(existing == reply for existing, _ in variants):
+                return
+            variants.append((reply, time.time()))
+            self._entries[key] = variants[-self.variants:]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._last_served.pop(evicted, None)
+
+    def _fresh(self, key):
+        """Unexpired variants of key (expired ones are dropped); caller holds the lock"""
+        now = time.time()
+        variants = [(reply, stored) for reply, stored in self._entries.get(key, []) if now - stored < self.ttl]
+        if variants:
+            self._entries[key] = variants
+        else:
+            self._entries.pop(key, None)
+        return variants
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def prometheus_text(self, prefix="barkoni"):
+        """Hit / miss counters and cache size in the Prometheus text format"""
+        stats = self.stats()
+        return "\n".join([
+            f"# HELP {prefix}_response_cache_lookups_total Response cache lookups by result",
+            f"# TYPE {prefix}_response_cache_lookups_total counter",
+            f'{prefix}_response_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+            f'{prefix}_response_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+            f"# HELP {prefix}_response_cache_entries Cached inputs",
+            f"# TYPE {prefix}_response_cache_entries gauge",
+            f"{prefix}_response_cache_entries {stats['entries']}",
+        ]) + "\n"
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Sentence Stream Chunker
+Cuts a stream of LLM tokens into speakable sentence/clause chunks so TTS can
+start on the first sentence while the rest of the reply is still generating
+"""
+
+import re
+
+# Sentence enders: English punctuation, ellipsis, Hebrew sof pasuq and the
+# full-width forms some providers emit
+SENTENCE_END_CHARS = ".!?…׃。！？"
+
+# Clause breaks: used only once a chunk is long enough to be worth speaking
+CLAUSE_BREAK_CHARS = ",;:־–—"
+
+# Closing quotes/brackets that belong to the sentence they end
+TRAILING_CHARS = "\"')]}»”’״׳"
+
+_SENTENCE_END = re.compile(
+    f"[{re.escape(SENTENCE_END_CHARS)}]+[{re.escape(TRAILING_CHARS)}]*(?=\\s)"
+)
+_CLAUSE_BREAK = re.compile(
+    f"[{re.escape(CLAUSE_BREAK_CHARS)}][{re.escape(TRAILING_CHARS)}]*(?=\\s)"
+)
+
+
+class SentenceChunker:
+    """Incrementally splits streamed text at sentence and clause boundaries"""
+
+    def __init__(self, min_chars=12, max_chars=160):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add streamed text and return any chunks that are now complete"""
+        self._buffer += text
+        chunks = []
+
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:].lstrip()
+            if chunk:
+                chunks.append(chunk)
+
+        return chunks
+
+    def flush(self):
+        """Return whatever is left in the buffer at the end of the stream"""
+        chunk = self._buffer.strip()
+        self._buffer = ""
+        return [chunk] if chunk else []
+
+    def _find_cut(self):
+        """Find the end offset of the next complete chunk, if any"""
+        for match in _SENTENCE_END.finditer(self._buffer):
+            # Short exclamations ("BRO!") are merged into the next sentence
+            if len(self._buffer[:match.end()].strip()) >= self.min_chars:
+                return match.end()
+
+        if len(self._buffer) >= self.min_chars * 2:
+            for match in _CLAUSE_BREAK.finditer(self._buffer):
+                if len(self._buffer[:match.end()].strip()) >= self.min_chars * 2:
+                    return match.end()
+
+        if len(self._buffer) >= self.max_chars:
+            # No punctuation in sight - cut at the last space so TTS never waits forever
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            return space if space > 0 else self.max_chars
+
+        return None
+
+
+def chunk_text_stream(text_stream, min_chars=12, max_chars=160):
+    """Yield speakable chunks from an iterable of streamed text deltas"""
+    chunker = SentenceChunker(min_chars=min_chars, max_chars=max_chars)
+    for delta in text_stream:
+        if delta:
+            yield from chunker.feed(delta)
+    yield from chunker.flush()
+
+
+def split_sentences(text, min_chars=12, max_chars=160):
+    """Split a complete text into the same chunks the streaming path would produce"""
+    return list(chunk_text_stream([text], min_chars=min_chars, max_chars=max_chars))
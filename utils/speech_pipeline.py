@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Speech Pipeline
+Two-stage producer/consumer TTS: a synthesis worker renders sentence chunks
+ahead into a bounded queue while the playback stage plays them back to back
+"""
+
+import queue
+import threading
+import time
+
+_END = object()
+
+
+class SpeechPipeline:
+    """Overlaps synthesis of chunk N+1 with playback of chunk N"""
+
+    def __init__(self, synthesize, play, max_ahead=2, on_error=None, on_event=None, on_chunk=None):
+        """
+        synthesize(text) -> audio, play(audio) blocks until playback ends,
+        on_error(text, exception) handles a chunk whose synthesis or playback failed,
+        on_event(name) is told "tts_first_chunk" and "playback_start" (e.g. a latency tracer),
+        on_chunk(text) is told each chunk as it starts playing (or goes to on_error to be spoken)
+        """
+        self.synthesize = synthesize
+        self.play = play
+        self.max_ahead = max_ahead
+        self.on_error = on_error
+        self.on_event = on_event
+        self.on_chunk = on_chunk
+
+    def _event(self, name):
+        if self.on_event:
+            try:
+                self.on_event(name)
+            except Exception as e:
+                print(f"ERROR: Speech pipeline event error: {e}")
+
+    def run(self, chunks, cancel_event=None):
+        """Speak an iterable of text chunks (may be a live stream); returns timing stats"""
+        cancel_event = cancel_event or threading.Event()
+        finished = threading.Event()
+        rendered = queue.Queue(maxsize=self.max_ahead)
+        stats = {
+            "chunks": 0,
+            "synthesis_time": 0.0,
+            "playback_time": 0.0,
+            "first_audio_latency": None,
+            "wall_time": 0.0,
+            "cancelled": False,
+        }
+        started = time.time()
+
+        def put(item):
+            # Bounded put that gives up once playback is cancelled or over
+            while not (cancel_event.is_set() or finished.is_set()):
+                try:
+                    rendered.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def synthesis_worker():
+            first_chunk = True
+            try:
+                for text in chunks:
+                    if cancel_event.is_set() or finished.is_set():
+                        break
+                    synth_start = time.time()
+                    try:
+                        item = (text, self.synthesize(text), None)
+                        if first_chunk:
+                            first_chunk = False
+                            self._event("tts_first_chunk")
+                    except Exception as e:
+                        item = (text, None, e)
+                    stats["synthesis_time"] += time.time() - synth_start
+                    if not put(item):
+                        break
+            except Exception as e:
+                # The chunk source itself failed (e.g. a provider stream error)
+                put((None, None, e))
+            finally:
+                put(_END)
+
+        worker = threading.Thread(target=synthesis_worker, name="tts-synthesis", daemon=True)
+        worker.start()
+
+        while not cancel_event.is_set():
+            try:
+                item = rendered.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                break
+
+            text, audio, error = item
+            if self.on_chunk and text is not None:
+                self.on_chunk(text)
+            if error is None:
+                if stats["first_audio_latency"] is None:
+                    stats["first_audio_latency"] = time.time() - started
+                    self._event("playback_start")
+                play_start = time.time()
+                try:
+                    self.play(audio)
+                except Exception as e:
+                    error = e
+                stats["playback_time"] += time.time() - play_start
+
+            if error is not None:
+                if self.on_error and text is not None:
+                    self.on_error(text, error)
+                else:
+                    print(f"ERROR: Speech pipeline error: {error}")
+            stats["chunks"] += 1
+
+        stats["cancelled"] = cancel_event.is_set()
+        finished.set()  # Release a synthesis worker still blocked on a full queue
+        stats["wall_time"] = time.time() - started
+        return stats
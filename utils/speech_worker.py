@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Speech Owner Thread
+One long-lived thread owns the TTS engines and the audio mixer; callers
+enqueue utterances and get back a cancellable handle with timing info
+"""
+
+import queue
+import threading
+import time
+
+_SHUTDOWN = object()
+
+
+class SpeechHandle:
+    """Handle for one queued utterance: wait(), cancel() and timings"""
+
+    def __init__(self, text=None, chunks=None):
+        self.text = text
+        self.chunks = chunks
+        self.spoken = []  # Chunks whose playback has begun - what the listener actually heard (so far)
+        self.cancel_event = threading.Event()
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+        self._interrupt = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        """Block until the utterance finished or was cancelled; returns True if it is done"""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Drop the utterance if still queued, or stop it mid-playback"""
+        self.cancel_event.set()
+        with self._lock:
+            interrupt = self._interrupt
+        if interrupt:
+            interrupt()
+
+    def add_done_callback(self, fn):
+        """Call fn(handle) on the speech thread once the utterance is done (immediately if it already is)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    @property
+    def spoken_text(self):
+        return " ".join(self.spoken)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def timings(self):
+        """Queue delay and speaking duration in seconds (None until known)"""
+        return {
+            "queued": (self.started_at or time.time()) - self.enqueued_at,
+            "speaking": (self.finished_at - self.started_at) if self.finished_at and self.started_at else None,
+            "total": (self.finished_at - self.enqueued_at) if self.finished_at else None,
+        }
+
+    def _finish(self):
+        self.finished_at = time.time()
+        with self._lock:
+            self._interrupt = None
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"ERROR: Speech callback error: {e}")
+
+
+class SpeechWorker:
+    """Serializes all speech on a single owner thread"""
+
+    def __init__(self, speak, interrupt=None, name="speech-owner"):
+        """speak(handle) performs the utterance; interrupt() stops whatever is playing right now"""
+        self.speak = speak
+        self.interrupt = interrupt
+        self._queue = queue.Queue()
+        self._pending = {}  # Handles submitted and not finished yet (queued or speaking), in order
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, text=None, chunks=None):
+        """Queue an utterance (full text or an iterable of chunks) and return its handle"""
+        handle = SpeechHandle(text=text, chunks=chunks)
+        with self._lock:
+            self._pending[handle] = None
+        self._queue.put(handle)
+        return handle
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn on the speech thread (e.g. engine setup) and return its result"""
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+
+        outcome = {}
+        finished = threading.Event()
+
+        def task():
+            try:
+                outcome["result"] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+        self._queue.put(task)
+        finished.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    @property
+    def busy(self):
+        """True while something is speaking or queued (also while the thread is taking it off the queue)"""
+        with self._lock:
+            return bool(self._pending)
+
+    def cancel_all(self):
+        """Cancel the current utterance and everything queued behind it"""
+        with self._lock:
+            pending = list(self._pending)
+        # Newest first, so the thread can't start a queued one after the current is interrupted;
+        # cancelled handles still flow through the thread so their waiters are released
+        for handle in reversed(pending):
+            handle.cancel()
+
+    def shutdown(self, timeout=None):
+        """Stop the speech thread after the queued work"""
+        self._queue.put(_SHUTDOWN)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _SHUTDOWN:
+                break
+            if not isinstance(item, SpeechHandle):
+                item()
+                continue
+
+            handle = item
+            handle.started_at = time.time()
+            if not handle.cancelled:
+                with handle._lock:
+                    handle._interrupt = self.interrupt
+                try:
+                    handle.result = self.speak(handle)
+                except Exception as e:
+                    handle.error = e
+                    print(f"ERROR: Error in text-to-speech: {e}")
+            with self._lock:
+                self._pending.pop(handle, None)
+            handle._finish()
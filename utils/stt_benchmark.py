@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Speech Recognition Benchmark
+Replays recorded WAV files through CharacterVoiceChatbot.listen_for_speech via
+a virtual microphone and reports endpoint latency, recognition latency and
+word error rate per file - repeatable on headless CI machines
+
+Usage: python -m utils.stt_benchmark [files or dirs] [--rate 4] [--stt google|vosk]
+Reference transcripts are read from <file>.txt next to each WAV, or from a
+transcripts.json ({"file.wav": "text"}) in the same directory
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+DEFAULT_SEGMENTS_DIR = os.path.join("data", "processed_audio", "segments")
+
+
+def _words(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / float(len(ref))
+
+
+def load_references(paths):
+    """{wav path: reference transcript} from .txt sidecars or per-directory transcripts.json"""
+    references = {}
+    manifests = {}
+    for path in paths:
+        sidecar = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(sidecar):
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                references[path] = f.read().strip()
+            continue
+
+        directory = os.path.dirname(path)
+        if directory not in manifests:
+            manifest = os.path.join(directory, "transcripts.json")
+            try:
+                with open(manifest, 'r', encoding='utf-8') as f:
+                    manifests[directory] = json.load(f)
+            except (OSError, ValueError):
+                manifests[directory] = {}
+        reference = manifests[directory].get(os.path.basename(path))
+        if reference is not None:
+            references[path] = reference
+    return references
+
+
+def collect_paths(inputs):
+    """Expand files and directories into a sorted list of WAV paths"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.wav"))))
+        elif os.path.exists(item):
+            paths.append(item)
+    return paths
+
+
+def run_benchmark(chatbot, microphone, paths, references=None, timeout=5):
+    """Play each file into listen_for_speech and measure one turn per file"""
+    references = references or {}
+    rows = []
+    tracer = chatbot.tracer
+    original_begin, original_mark = tracer.begin_turn, tracer.mark
+    marks = {}
+
+    # Both STT paths report through the tracer: the turn trace opens when listening decides the
+    # user is done (batch recognition and the streaming recognizer alike), stt_result when text is ready
+    def timed_begin(*args, **kwargs):
+        marks.setdefault("endpoint_position", microphone.position)
+        marks.setdefault("endpoint_at", time.perf_counter())
+        return original_begin(*args, **kwargs)
+
+    def timed_mark(name, *args, **kwargs):
+        if name == "stt_result" and "endpoint_at" in marks:
+            marks.setdefault("recognition_latency", time.perf_counter() - marks["endpoint_at"])
+        return original_mark(name, *args, **kwargs)
+
+    tracer.begin_turn, tracer.mark = timed_begin, timed_mark
+    try:
+        for path in paths:
+            marks.clear()
+            microphone.play(path)
+            start = time.perf_counter()
+            text = chatbot.listen_for_speech(timeout=timeout)
+            wall = time.perf_counter() - start
+            tracer.end_turn()
+
+            reference = references.get(path)
+            endpoint_position = marks.get("endpoint_position")
+            rows.append({
+                "file": os.path.basename(path),
+                "transcript": text,
+                "reference": reference,
+                "endpoint_latency": (endpoint_position - microphone.speech_end) if endpoint_position is not None else None,
+                "recognition_latency": marks.get("recognition_latency"),
+                "turn_wall_time": wall,
+                "wer": word_error_rate(reference, text) if reference is not None else None,
+            })
+    finally:
+        tracer.begin_turn, tracer.mark = original_begin, original_mark
+    return rows
+
+
+def summarize(rows):
+    """Mean / p50 / p90 of each metric over the files that produced it"""
+    summary = {}
+    for metric in ("endpoint_latency", "recognition_latency", "wer"):
+        values = sorted(row[metric] for row in rows if row[metric] is not None)
+        if values:
+            summary[metric] = {
+                "mean": sum(values) / len(values),
+                "p50": values[len(values) // 2],
+                "p90": values[min(len(values) - 1, int(0.9 * len(values)))],
+                "count": len(values),
+            }
+    return summary
+
+
+def _fmt(value, scale=1000.0, digits=0):
+    return "-" if value is None else f"{value * scale:.{digits}f}"
+
+
+def main():
+    """Run the STT benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Replay recordings through listen_for_speech")
+    parser.add_argument("inputs", nargs="*", default=[DEFAULT_SEGMENTS_DIR], help="WAV files or directories")
+    parser.add_argument("--rate", type=float, default=1.0, help="Playback speed (1 = real time, 0 = unpaced)")
+    parser.add_argument("--stt", choices=["google", "vosk"], default="google", help="Recognition backend")
+    parser.add_argument("--stt-model", default=None, help="Offline model path for --stt vosk")
+    parser.add_argument("--language", default="en-US", help="Language of the offline model")
+    parser.add_argument("--continuous", action="store_true", help="Use always-on capture instead of per-turn listening")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write per-file results to this file")
+    args = parser.parse_args()
+
+    paths = collect_paths(args.inputs)
+    if not paths:
+        print("ERROR: No WAV files found")
+        return
+
+    from main import CharacterVoiceChatbot
+    from utils.virtual_microphone import FileMicrophone
+
+    microphone = FileMicrophone(rate=args.rate)
+    chatbot = CharacterVoiceChatbot(
+        character_name="Benchmark",
+        use_character_voice=False,
+        phrase_cache_mb=0,
+        stt_backend=args.stt,
+        offline_stt_model=args.stt_model,
+        offline_stt_language=args.language,
+        continuous_listening=args.continuous,
+        audio_source=microphone
+    )
+
+    rows = run_benchmark(chatbot, microphone, paths, load_references(paths))
+
+    print(f"\nSTT benchmark ({args.stt}, {len(rows)} files, rate {args.rate}x)")
+    print("=" * 78)
+    print(f"{'file':<28}{'endpoint (ms)':>15}{'recognize (ms)':>16}{'WER':>8}  transcript")
+    for row in rows:
+        print(f"{row['file'][:27]:<28}{_fmt(row['endpoint_latency']):>15}{_fmt(row['recognition_latency']):>16}"
+              f"{_fmt(row['wer'], 100.0, 1):>8}  {row['transcript'] or ''}")
+
+    print("-" * 78)
+    for metric, stats in summarize(rows).items():
+        scale, unit = (100.0, "%") if metric == "wer" else (1000.0, "ms")
+        print(f"{metric:<22} mean {stats['mean'] * scale:8.1f}{unit}  p50 {stats['p50'] * scale:8.1f}{unit}"
+              f"  p90 {stats['p90'] * scale:8.1f}{unit}  (n={stats['count']})")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"rows": rows, "summary": summarize(rows)}, f, indent=2, ensure_ascii=False)
+        print(f"SUCCESS: Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Lightweight Voice Activity Detection
+Frame energy (RMS) with an adaptive noise floor - cheap enough to run on
+every microphone frame, no extra dependencies
+"""
+
+import math
+from array import array
+
+
+def frame_rms(frame, sample_width=2):
+    """RMS level of a little-endian 16-bit PCM frame (same scale as speech_recognition energy)"""
+    if sample_width != 2:
+        raise ValueError("Only 16-bit PCM frames are supported")
+
+    samples = array('h')
+    samples.frombytes(frame[:len(frame) - (len(frame) % 2)])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVAD:
+    """Speech/non-speech decision per frame against a moving noise floor"""
+
+    def __init__(self, threshold_ratio=3.0, min_threshold=300.0, noise_alpha=0.05,
+                 attack_frames=3, release_frames=10, initial_noise=None):
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.noise_alpha = noise_alpha
+        self.attack_frames = attack_frames
+        self.release_frames = release_frames
+        self.noise_floor = initial_noise
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    @property
+    def threshold(self):
+        """Current speech energy threshold"""
+        if self.noise_floor is None:
+            return self.min_threshold
+        return max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+
+    def observe_noise(self, rms):
+        """Fold a frame known to contain no user speech into the noise floor"""
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        else:
+            self.noise_floor += self.noise_alpha * (rms - self.noise_floor)
+
+    def is_speech_frame(self, rms):
+        """Raw per-frame decision; non-speech frames update the noise floor"""
+        speech = rms > self.threshold
+        if not speech:
+            self.observe_noise(rms)
+        elif self.noise_floor is not None:
+            # Creep up slowly so a lasting louder background eventually becomes the floor
+            self.noise_floor += self.noise_alpha * 0.02 * (rms - self.noise_floor)
+        return speech
+
+    def update(self, frame, sample_width=2):
+        """Feed one frame; returns the debounced in-speech state"""
+        speech = self.is_speech_frame(frame_rms(frame, sample_width))
+
+        if speech:
+            self._speech_run += 1
+            self._silence_run = 0
+            if self._speech_run >= self.attack_frames:
+                self.in_speech = True
+        else:
+            self._silence_run += 1
+            self._speech_run = 0
+            if self._silence_run >= self.release_frames:
+                self.in_speech = False
+        return self.in_speech
+
+    def reset(self):
+        """Forget the speech state but keep the learned noise floor"""
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
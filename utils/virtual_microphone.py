@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Virtual Microphone
+A speech_recognition AudioSource that replays WAV files (e.g. the segments in
+data/processed_audio/segments) at real-time or accelerated rate, so
+listen_for_speech and the conversation loop run without audio hardware
+"""
+
+import random
+import threading
+import time
+import wave
+from array import array
+
+import speech_recognition as sr
+
+from utils.vad import frame_rms
+
+
+def load_wav_pcm(path, sample_rate):
+    """16-bit mono samples of a WAV file at sample_rate (downmixed/resampled as needed)"""
+    with wave.open(str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        channels = wav.getnchannels()
+        source_rate = wav.getframerate()
+        samples = array('h')
+        samples.frombytes(wav.readframes(wav.getnframes()))
+
+    if channels > 1:
+        samples = array('h', (sum(samples[i:i + channels]) // channels for i in range(0, len(samples), channels)))
+
+    if source_rate != sample_rate and len(samples) > 1:
+        # Linear interpolation is plenty for recognition benchmarks
+        ratio = source_rate / float(sample_rate)
+        count = int(len(samples) / ratio)
+        last = len(samples) - 1
+        resampled = array('h')
+        for i in range(count):
+            position = i * ratio
+            left = int(position)
+            right = min(left + 1, last)
+            fraction = position - left
+            resampled.append(int(samples[left] + (samples[right] - samples[left]) * fraction))
+        samples = resampled
+    return samples
+
+
+def speech_bounds(samples, sample_rate, frame_seconds=0.03, ratio=3.0):
+    """(start, end) in seconds of the speech in a recording, judged against its own noise floor"""
+    frame = max(1, int(sample_rate * frame_seconds))
+    levels = [frame_rms(samples[i:i + frame].tobytes()) for i in range(0, len(samples) - frame + 1, frame)]
+    if not levels:
+        return 0.0, 0.0
+    floor = sorted(levels)[len(levels) // 10]
+    threshold = max(100.0, floor * ratio)
+    speech = [i for i, level in enumerate(levels) if level > threshold]
+    if not speech:
+        return 0.0, 0.0
+    return speech[0] * frame_seconds, (speech[-1] + 1) * frame_seconds
+
+
+class _PacedStream:
+    """The `stream` of a FileMicrophone: read(n) hands out queued audio at the configured pace"""
+
+    def __init__(self, microphone):
+        self.microphone = microphone
+
+    def read(self, size):
+        return self.microphone._read(size)
+
+    def close(self):
+        pass
+
+
+class FileMicrophone(sr.AudioSource):
+    """File-backed stand-in for sr.Microphone"""
+
+    def __init__(self, sample_rate=16000, chunk_size=1024, rate=1.0, lead_seconds=0.5, tail_seconds=2.0,
+                 noise_level=30.0, end_of_stream=False, seed=0):
+        """
+        rate: playback speed (1.0 = real time, 4.0 = four times faster, 0 = as fast as possible)
+        lead_seconds / tail_seconds: room noise around each played file
+        noise_level: RMS of the generated room noise between files
+        end_of_stream: return b"" once everything has been played instead of endless room noise
+        """
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.device_index = None
+        self.rate = rate
+        self.lead_seconds = lead_seconds
+        self.tail_seconds = tail_seconds
+        self.noise_level = noise_level
+        self.end_of_stream = end_of_stream
+        self.stream = None
+
+        self.samples_read = 0  # Stream timeline position, in samples
+        self.speech_end = None  # Stream time (s) where the current file's speech ends
+        self.current_path = None
+        self._pending = array('h')
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started_wall = None
+        self._depth = 0
+
+    @property
+    def position(self):
+        """Seconds of audio handed out so far"""
+        return self.samples_read / float(self.SAMPLE_RATE)
+
+    def __enter__(self):
+        with self._lock:
+            self._depth += 1
+            if self.stream is None:
+                self.stream = _PacedStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self.stream = None
+
+    def play(self, path):
+        """Queue a recording (with room noise around it); anything not yet read is discarded"""
+        samples = load_wav_pcm(path, self.SAMPLE_RATE)
+        start, end = speech_bounds(samples, self.SAMPLE_RATE)
+        frame = int(self.SAMPLE_RATE * 0.03)
+        levels = sorted(frame_rms(samples[i:i + frame].tobytes()) for i in range(0, len(samples) - frame + 1, frame))
+        noise_level = levels[len(levels) // 10] if levels else self.noise_level
+
+        with self._lock:
+            self.current_path = str(path)
+            self._pending = self._noise(self.lead_seconds, noise_level)
+            self.speech_end = self.position + self.lead_seconds + end
+            self._pending.extend(samples)
+            self._pending.extend(self._noise(self.tail_seconds, noise_level))
+        return end - start
+
+    def _noise(self, seconds, level):
+        count = int(seconds * self.SAMPLE_RATE)
+        spread = level * 1.7  # Uniform noise with this spread has roughly the requested RMS
+        return array('h', (int(self._random.uniform(-spread, spread)) for _ in range(count)))
+
+    def _read(self, size):
+        with self._lock:
+            if len(self._pending) < size:
+                if self.end_of_stream and not self._pending:
+                    return b""
+                if not self.end_of_stream:
+                    self._pending.extend(self._noise(float(size) / self.SAMPLE_RATE, self.noise_level))
+            chunk = self._pending[:size]
+            del self._pending[:size]
+            self.samples_read += len(chunk)
+            delivered = self.position
+
+        if self.rate:
+            # Hand audio out no faster than it would arrive from a real device
+            if self._started_wall is None:
+                self._started_wall = time.perf_counter() - delivered / self.rate
+            delay = self._started_wall + delivered / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk.tobytes()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+XTTS Runtime Helpers
+Keeps the XTTS model resident per process and caches speaker conditioning
+latents per reference audio so they are computed once, not on every utterance
+"""
+
+import hashlib
+import os
+import threading
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+_models = {}
+_models_lock = threading.Lock()
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def get_xtts_model(model_name=XTTS_MODEL_NAME, device=None):
+    """Load the XTTS model once per process and device and return the shared instance"""
+    import torch
+    from TTS.api import TTS
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    key = (model_name, device)
+    with _models_lock:
+        if key not in _models:
+            _models[key] = TTS(model_name).to(device)
+        return _models[key]
+
+
+def file_sha256(path):
+    """Content hash of a file, memoized on (path, size, mtime) so repeat calls are free"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _hash_lock:
+        if memo_key in _hash_memo:
+            return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    with _hash_lock:
+        _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+
+class SpeakerLatentCache:
+    """Speaker conditioning latents keyed by reference audio content hash (memory + .npz on disk)"""
+
+    def __init__(self, cache_dir=os.path.join("cache", "speaker_latents"), model_id="xtts_v2"):
+        self.cache_dir = cache_dir
+        self.model_id = model_id
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _disk_path(self, audio_hash):
+        return os.path.join(self.cache_dir, f"{self.model_id}_{audio_hash}.npz")
+
+    def get_latents(self, xtts_model, reference_audio_path):
+        """Return (gpt_cond_latent, speaker_embedding) for a reference file, computing them at most once"""
+        audio_hash = file_sha256(reference_audio_path)
+
+        with self._lock:
+            if audio_hash in self._memory:
+                return self._memory[audio_hash]
+
+            latents = self._load_from_disk(xtts_model, audio_hash)
+            if latents is None:
+                print(f"Computing speaker latents for {os.path.basename(reference_audio_path)}...")
+                latents = xtts_model.get_conditioning_latents(audio_path=[reference_audio_path])
+                self._save_to_disk(audio_hash, latents)
+
+            self._memory[audio_hash] = latents
+            return latents
+
+    def _load_from_disk(self, xtts_model, audio_hash):
+        """Load cached latents onto the model's device, or None if not cached"""
+        path = self._disk_path(audio_hash)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            import numpy as np
+            import torch
+
+            device = next(xtts_model.parameters()).device
+            with np.load(path) as data:
+                gpt_cond_latent = torch.from_numpy(data["gpt_cond_latent"]).to(device)
+                speaker_embedding = torch.from_numpy(data["speaker_embedding"]).to(device)
+            return gpt_cond_latent, speaker_embedding
+        except Exception as e:
+            print(f"WARNING: Ignoring unreadable speaker latent cache {path}: {e}")
+            return None
+
+    def _save_to_disk(self, audio_hash, latents):
+        """Persist latents as .npz; failures only cost a recompute next run"""
+        try:
+            import numpy as np
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            gpt_cond_latent, speaker_embedding = latents
+            tmp_path = self._disk_path(audio_hash) + ".tmp.npz"
+            np.savez(
+                tmp_path,
+                gpt_cond_latent=gpt_cond_latent.detach().cpu().numpy(),
+                speaker_embedding=speaker_embedding.detach().cpu().numpy(),
+            )
+            os.replace(tmp_path, self._disk_path(audio_hash))
+        except Exception as e:
+            print(f"WARNING: Could not save speaker latents: {e}")
+
+
+def synthesize_with_latents(tts, latent_cache, text, reference_audio_path, language="en", speed=1.0):
+    """Synthesize text with cached speaker latents; returns (float waveform, sample_rate)"""
+    import numpy as np
+
+    xtts_model = tts.synthesizer.tts_model
+    gpt_cond_latent, speaker_embedding = latent_cache.get_latents(xtts_model, reference_audio_path)
+
+    out = xtts_model.inference(
+        text,
+        language,
+        gpt_cond_latent,
+        speaker_embedding,
+        speed=speed,
+    )
+
+    wav = out["wav"]
+    if hasattr(wav, "detach"):
+        wav = wav.detach().cpu().numpy()
+    sample_rate = xtts_model.config.audio.output_sample_rate
+    return np.asarray(wav, dtype=np.float32).reshape(-1), sample_rate